@@ -0,0 +1,90 @@
+"""Peak RSS of PricingData bar aggregation against the number of input rows.
+
+Builds a synthetic hive-partitioned (``trade_date=``) minute-bar store for each row count and
+aggregates it to the target frequency in a fresh subprocess, once fully in memory through
+``get_aggregated_bars`` and once chunked through ``sink_aggregated_bars``. The peak resident set
+size of each subprocess is reported.
+
+The default sizes of 100M and 1B rows write stores of several and tens of GiB, and the in-memory
+mode of the largest is expected to exceed the RAM of most hosts; pass smaller ``--rows`` to
+compare the two modes on a workstation.
+
+Usage:
+    python benchmarks/aggregation_memory.py --rows 10000000 100000000 1000000000 --freq 5m
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import write_synthetic_store
+
+MODES = ("in_memory", "chunked")
+
+
+def run_worker(mode: str, store: str, freq: str, output: str) -> None:
+    """Aggregate the store in the current process and print the peak RSS in MiB."""
+    from pqf.pricing.core import PricingData
+
+    pricing_data = PricingData.from_parquet(store)
+    start = time.perf_counter()
+    if mode == "in_memory":
+        pricing_data.get_aggregated_bars(freq).lazy().collect()
+    else:
+        pricing_data.sink_aggregated_bars(freq, output)
+    elapsed = time.perf_counter() - start
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{peak_mib:.1f} {elapsed:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000_000, 100_000_000, 1_000_000_000]
+    )
+    parser.add_argument("--instruments", type=int, default=500)
+    parser.add_argument("--freq", default="5m")
+    parser.add_argument(
+        "--worker",
+        nargs=4,
+        metavar=("MODE", "STORE", "FREQ", "OUTPUT"),
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    print(f"{'rows':>14} {'mode':>10} {'peak_rss_mib':>13} {'seconds':>9}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "bars"
+            write_synthetic_store(store, rows, args.instruments)
+            for mode in MODES:
+                result = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--worker",
+                        mode,
+                        str(store),
+                        args.freq,
+                        str(Path(tmp) / mode),
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                peak_mib, seconds = result.stdout.split()
+                print(
+                    f"{rows:>14,} {mode:>10} {float(peak_mib):>13.1f} {float(seconds):>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
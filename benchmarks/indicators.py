@@ -0,0 +1,73 @@
+"""Throughput of the Polars and Numba backends of the pqf.indicator functions.
+
+Each function is timed on a synthetic random-walk price series for every size and backend.
+The Numba kernels are compiled (or loaded from cache) before timing starts.
+
+Usage:
+    python benchmarks/indicators.py --sizes 1000000 10000000 100000000 --repeat 3
+"""
+
+import argparse
+import time
+
+import polars as pl
+from synthetic import random_walk
+
+from pqf.indicator.momentum import macd, rsi
+from pqf.indicator.moving_average import (
+    exponential_moving_average,
+    simple_moving_average,
+)
+
+FUNCTIONS = {
+    "rsi": lambda prices, backend: rsi(prices, 14, backend=backend),
+    "macd": lambda prices, backend: macd(prices, backend=backend),
+    "simple_moving_average": lambda prices, backend: simple_moving_average(
+        prices, 20, backend=backend
+    ),
+    "exponential_moving_average": lambda prices, backend: exponential_moving_average(
+        prices, 20, backend=backend
+    ),
+}
+BACKENDS = ("polars", "numba")
+
+
+def best_time(function, prices: pl.Series, backend: str, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` calls of ``function`` on ``prices``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(prices, backend)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    warm_up = random_walk(1_000)
+    for function in FUNCTIONS.values():
+        function(warm_up, "numba")
+
+    print(
+        f"{'function':>28} {'size':>13} {'polars_s':>10} {'numba_s':>10} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        prices = random_walk(size)
+        for name, function in FUNCTIONS.items():
+            polars_s, numba_s = (
+                best_time(function, prices, backend, args.repeat)
+                for backend in BACKENDS
+            )
+            print(
+                f"{name:>28} {size:>13,} {polars_s:>10.4f} {numba_s:>10.4f} {polars_s / numba_s:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
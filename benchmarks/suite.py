@@ -0,0 +1,651 @@
+"""Benchmark suite for the public pqf API with a JSON history and regression check.
+
+Every case is run for each combination of ``--rows`` and ``--instruments`` on deterministic
+synthetic bars (see ``synthetic.py``), in a fresh subprocess so that the peak resident set size
+belongs to that case alone. A case is warmed up once (compiling Numba kernels), then timed
+``--repeat`` times; the best time is kept and reported as throughput in input rows per second.
+
+Each run is appended to the history file together with the library versions. Throughput and
+peak memory are compared against the median of the last ``--baseline-runs`` runs in the history,
+and the script exits with status 1 when either regresses by more than ``--threshold``.
+
+Usage:
+    python benchmarks/suite.py --rows 100000 1000000 --instruments 1 100
+    python benchmarks/suite.py --cases rsi macd --no-record
+"""
+
+import argparse
+import json
+import operator
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Literal
+
+import numba
+import numpy as np
+import polars as pl
+from synthetic import synthetic_bars
+
+from pqf.cache import ResultCache
+from pqf.indicator.momentum import macd, rsi
+from pqf.indicator.moving_average import (
+    exponential_moving_average,
+    simple_moving_average,
+)
+from pqf.indicator.panel import compute_indicators
+from pqf.indicator.state import EMAState, MACDState, RSIState, SMAState
+from pqf.indicator.sweep import sweep_indicator
+from pqf.order.fill import simulate_fills
+from pqf.pricing.calendar import align_to_calendar, gap_statistics
+from pqf.pricing.core import PricingData
+from pqf.pricing.sharding import run_sharded
+from pqf.research.backtest import backtest
+from pqf.research.factor import (
+    factor_quantile_returns,
+    factor_quantiles,
+    factor_rank_autocorrelation,
+    ic_decay,
+    information_coefficient,
+    mean_factor_returns_by_quantile,
+    point_in_time_factors,
+    quantile_turnover,
+    rolling_ic,
+    simple_factor_long_short_returns,
+)
+from pqf.research.statistics import (
+    annualized_returns,
+    estimate_market_returns,
+    market_returns,
+    rolling_statistics,
+    sharpe_ratio,
+    summary_stats,
+)
+
+DEFAULT_HISTORY = Path(__file__).with_name("history.json")
+METRICS = {"rows_per_second": "higher", "peak_rss_mib": "lower"}
+
+Setup = Callable[[pl.DataFrame], Callable[[], object]]
+
+
+def _indicator(function: Callable, backend: str, *args) -> Setup:
+    def setup(bars):
+        close = bars["close"]
+        return lambda: function(close, *args, backend=backend)
+
+    return setup
+
+
+def _state(state_class: type, *args) -> Setup:
+    def setup(bars):
+        history = (
+            bars.pivot("fid", index="end_dtutc", values="close")
+            .drop("end_dtutc")
+            .to_numpy()
+        )
+        return lambda: state_class.from_history(history, *args)
+
+    return setup
+
+
+def _state_updates(state_class: type, *args) -> Setup:
+    def setup(bars):
+        history = (
+            bars.pivot("fid", index="end_dtutc", values="close")
+            .drop("end_dtutc")
+            .to_numpy()
+        )
+        state = state_class(*args, n_instruments=history.shape[1])
+
+        def run():
+            for row in history:
+                state.update_batch(row)
+
+        return run
+
+    return setup
+
+
+def _pricing(method: Callable[[PricingData], object], **kwargs) -> Setup:
+    def setup(bars):
+        pricing_data = PricingData(bars, lazy=False, **kwargs)
+        return lambda: method(pricing_data)
+
+    return setup
+
+
+def _sink_aggregated_bars(bars):
+    pricing_data = PricingData(bars, lazy=False)
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            pricing_data.sink_aggregated_bars("5m", tmp).collect()
+
+    return run
+
+
+def _compute_indicators(bars):
+    pricing_data = PricingData(bars, lazy=False)
+    indicators = {
+        "rsi": rsi(pl.col("close"), 14),
+        "macd": macd(pl.col("close")),
+        "sma": simple_moving_average(pl.col("close"), 20),
+    }
+    return lambda: compute_indicators(pricing_data, indicators, warmup=26)
+
+
+def _sweep_indicator(bars):
+    pricing_data = PricingData(bars, lazy=False)
+    grid = {
+        "slow_period": [20, 26, 30],
+        "fast_period": [8, 12],
+        "signal_period": [5, 9],
+    }
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            sweep_indicator(pricing_data, "macd", grid, tmp)
+
+    return run
+
+
+def _log_returns(bars: pl.DataFrame) -> pl.Series:
+    return (
+        bars.select(pl.col("close").log().diff().over("fid")).to_series().drop_nulls()
+    )
+
+
+def _sharpe_ratio(bars):
+    returns = _log_returns(bars)
+    return lambda: sharpe_ratio(returns, 0.0)
+
+
+def _sharpe_ratio_expr(bars):
+    frame = bars.select("fid", returns=pl.col("close").log().diff().over("fid"))
+    return lambda: frame.group_by("fid").agg(sharpe_ratio(pl.col("returns"), 0.0))
+
+
+def _annualized_returns(bars):
+    returns = _log_returns(bars)
+    return lambda: annualized_returns(returns)
+
+
+def _annualized_returns_expanding(bars):
+    returns = _log_returns(bars)
+    return lambda: annualized_returns(returns, expanding=True)
+
+
+def _strategy_returns(bars: pl.DataFrame) -> pl.DataFrame:
+    return bars.select(
+        pl.col("fid").alias("strategy_id"),
+        pl.col("end_dtutc").alias("date"),
+        pl.col("close").log().diff().over("fid").alias("return"),
+    )
+
+
+def _rolling_statistics(window_size: int | None) -> Setup:
+    def setup(bars):
+        returns = _strategy_returns(bars)
+        return lambda: rolling_statistics(returns, window_size)
+
+    return setup
+
+
+def _summary_stats(bars):
+    returns = _strategy_returns(bars)
+    return lambda: summary_stats(returns)
+
+
+def _wide_returns(bars: pl.DataFrame) -> pl.DataFrame:
+    returns = bars.select(
+        "end_dtutc",
+        "fid",
+        returns=pl.col("close").log().diff().over("fid").fill_null(0.0),
+    )
+    wide = returns.pivot("fid", index="end_dtutc", values="returns")
+    return wide.rename({column: f"asset_{column}" for column in wide.columns[1:]})
+
+
+def _estimate_market_returns(bars):
+    returns = _wide_returns(bars)
+    return lambda: estimate_market_returns(returns, "end_dtutc")
+
+
+def _market_returns(weighting: Literal["equal", "cap"]) -> Setup:
+    def setup(bars):
+        returns = bars.select(
+            pl.col("end_dtutc").alias("date"),
+            "fid",
+            pl.col("close").pct_change().over("fid").alias("return"),
+            (pl.col("close") * pl.col("volume")).alias("market_cap"),
+        )
+        return lambda: market_returns(returns, weighting=weighting)
+
+    return setup
+
+
+def _factor_frames(bars: pl.DataFrame) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    returns = _wide_returns(bars)
+    factors = returns.select(
+        "end_dtutc",
+        momentum=pl.mean_horizontal(pl.exclude("end_dtutc"))
+        .rolling_sum(20)
+        .fill_null(0.0),
+        reversal=-pl.mean_horizontal(pl.exclude("end_dtutc")),
+    )
+    return factors.lazy(), returns.lazy()
+
+
+def _mean_factor_returns_by_quantile(bars):
+    factors, returns = _factor_frames(bars)
+    return lambda: mean_factor_returns_by_quantile(
+        5, factors, returns, "end_dtutc"
+    ).collect()
+
+
+def _simple_factor_long_short_returns(bars):
+    factors, returns = _factor_frames(bars)
+    return lambda: simple_factor_long_short_returns(
+        factors, returns, "end_dtutc"
+    ).collect()
+
+
+def _long_factors(
+    bars: pl.DataFrame,
+) -> tuple[pl.DataFrame, pl.DataFrame | pl.LazyFrame]:
+    log_close = pl.col("close").log()
+    factors = bars.select(
+        "end_dtutc",
+        "fid",
+        momentum=(log_close - log_close.shift(20)).over("fid"),
+        reversal=-log_close.diff().over("fid"),
+    ).unpivot(index=["end_dtutc", "fid"], variable_name="factor")
+    forward_returns = PricingData(bars, lazy=False).get_forward_returns([1, 5, 30])
+    return factors, forward_returns
+
+
+def _factor_quantiles(bars):
+    factors, _ = _long_factors(bars)
+    return lambda: factor_quantiles(factors, 5, date_column="end_dtutc").collect()
+
+
+def _factor_quantile_returns(bars):
+    factors, forward_returns = _long_factors(bars)
+    return lambda: factor_quantile_returns(
+        factors, forward_returns, 5, date_column="end_dtutc"
+    ).collect()
+
+
+def _information_coefficient(bars):
+    factors, forward_returns = _long_factors(bars)
+    return lambda: information_coefficient(
+        factors, forward_returns, date_column="end_dtutc"
+    ).collect()
+
+
+def _ic_summaries(summary: Callable[[pl.DataFrame], pl.LazyFrame]) -> Setup:
+    def setup(bars):
+        factors, forward_returns = _long_factors(bars)
+        ic = information_coefficient(
+            factors, forward_returns, date_column="end_dtutc"
+        ).collect()
+        return lambda: summary(ic).collect()
+
+    return setup
+
+
+def _quantile_turnover(bars):
+    factors, _ = _long_factors(bars)
+    return lambda: quantile_turnover(
+        factors, 5, lags=[1, 5], date_column="end_dtutc"
+    ).collect()
+
+
+def _factor_rank_autocorrelation(bars):
+    factors, _ = _long_factors(bars)
+    return lambda: factor_rank_autocorrelation(
+        factors, lags=[1, 5], date_column="end_dtutc"
+    ).collect()
+
+
+def _point_in_time_factors(bars):
+    # One factor value per instrument and trade date, known at the next day's open.
+    factors = bars.group_by("trade_date", "fid").agg(
+        pl.col("close").last().alias("last_close"),
+        pl.col("volume").sum().alias("daily_volume"),
+    )
+    pricing_data = PricingData(bars, lazy=False)
+    return lambda: point_in_time_factors(
+        pricing_data.get_bars(),
+        factors,
+        publication_lag="1d14h30m",
+        max_staleness="5d",
+        date_column="trade_date",
+        presorted=True,
+    ).collect()
+
+
+def _cached_forward_returns(bars):
+    pricing_data = PricingData(bars, lazy=False)
+    cache = ResultCache(tempfile.mkdtemp())
+    forward_returns = cache.memoize(PricingData.get_forward_returns)
+    forward_returns(pricing_data, [1, 5, 30])
+    return lambda: forward_returns(pricing_data, [1, 5, 30])
+
+
+def _simulate_fills(bars):
+    pricing_data = PricingData(bars, lazy=False)
+    # One order per instrument every ten bars, alternating between buys and sells.
+    orders = bars.gather_every(10).select(
+        pl.col("end_dtutc").alias("timestamp"),
+        "fid",
+        pl.when(pl.int_range(pl.len()) % 2 == 0)
+        .then(500.0)
+        .otherwise(-500.0)
+        .alias("quantity"),
+    )
+    return lambda: simulate_fills(
+        orders,
+        pricing_data,
+        participation_rate=0.1,
+        spread_bps=5,
+        impact_coefficient=0.1,
+    )
+
+
+def _backtest(bars):
+    pricing_data = PricingData(bars, lazy=False)
+    # Ten strategies rebalancing every 30 bars to random long-only weights over all instruments.
+    rebalances = bars.select(
+        pl.col("end_dtutc").unique().sort().gather_every(30)
+    ).to_series()
+    fids = bars["fid"].unique().sort()
+    grid = pl.DataFrame({"strategy_id": range(10)}).join(
+        rebalances.to_frame("timestamp"), how="cross"
+    )
+    targets = grid.join(fids.to_frame(), how="cross").with_columns(
+        weight=pl.Series(
+            np.random.default_rng(0).random(grid.height * fids.len()) / fids.len()
+        )
+    )
+    return lambda: backtest(
+        targets, pricing_data, cost_bps=5, rebalance_threshold=0.001
+    )
+
+
+def _calendar(function: Callable[..., object]) -> Setup:
+    def setup(bars):
+        # Drop every 50th bar so that there are gaps to fill.
+        pricing_data = PricingData(
+            bars.filter(pl.int_range(pl.len()) % 50 != 7), lazy=False
+        )
+        grain = pricing_data.time_grain
+        return lambda: function(pricing_data, grain=grain)
+
+    return setup
+
+
+CASES: dict[str, Setup] = {
+    "rsi[polars]": _indicator(rsi, "polars", 14),
+    "rsi[numba]": _indicator(rsi, "numba", 14),
+    "macd[polars]": _indicator(macd, "polars"),
+    "macd[numba]": _indicator(macd, "numba"),
+    "simple_moving_average[polars]": _indicator(simple_moving_average, "polars", 20),
+    "simple_moving_average[numba]": _indicator(simple_moving_average, "numba", 20),
+    "exponential_moving_average[polars]": _indicator(
+        exponential_moving_average, "polars", 20
+    ),
+    "exponential_moving_average[numba]": _indicator(
+        exponential_moving_average, "numba", 20
+    ),
+    "compute_indicators": _compute_indicators,
+    "sweep_indicator[macd]": _sweep_indicator,
+    "RSIState.from_history": _state(RSIState, 14),
+    "MACDState.from_history": _state(MACDState),
+    "SMAState.from_history": _state(SMAState, 20),
+    "EMAState.from_history": _state(EMAState, 20),
+    "RSIState.update_batch": _state_updates(RSIState, 14),
+    "MACDState.update_batch": _state_updates(MACDState),
+    "SMAState.update_batch": _state_updates(SMAState, 20),
+    "EMAState.update_batch": _state_updates(EMAState, 20),
+    "sharpe_ratio": _sharpe_ratio,
+    "sharpe_ratio[expr]": _sharpe_ratio_expr,
+    "annualized_returns": _annualized_returns,
+    "annualized_returns[expanding]": _annualized_returns_expanding,
+    "rolling_statistics[63]": _rolling_statistics(63),
+    "rolling_statistics[expanding]": _rolling_statistics(None),
+    "summary_stats": _summary_stats,
+    "estimate_market_returns": _estimate_market_returns,
+    "market_returns[equal]": _market_returns("equal"),
+    "market_returns[cap]": _market_returns("cap"),
+    "mean_factor_returns_by_quantile": _mean_factor_returns_by_quantile,
+    "simple_factor_long_short_returns": _simple_factor_long_short_returns,
+    "factor_quantiles": _factor_quantiles,
+    "factor_quantile_returns": _factor_quantile_returns,
+    "information_coefficient": _information_coefficient,
+    "ic_decay": _ic_summaries(ic_decay),
+    "rolling_ic": _ic_summaries(lambda ic: rolling_ic(ic, 20, date_column="end_dtutc")),
+    "quantile_turnover": _quantile_turnover,
+    "factor_rank_autocorrelation": _factor_rank_autocorrelation,
+    "point_in_time_factors": _point_in_time_factors,
+    "simulate_fills": _simulate_fills,
+    "backtest": _backtest,
+    "align_to_calendar": _calendar(align_to_calendar),
+    "gap_statistics": _calendar(gap_statistics),
+    "PricingData": lambda bars: lambda: PricingData(bars, lazy=False),
+    "PricingData[compact]": lambda bars: (
+        lambda: PricingData(bars, lazy=False, compact=True, volume_dtype=pl.Float32)
+    ),
+    "PricingData.time_grain": lambda bars: (
+        lambda: PricingData(bars, lazy=False).time_grain
+    ),
+    "PricingData.get_bars_by_instrument": _pricing(
+        lambda data: data.get_bars_by_instrument(), sort_cache_bytes=0
+    ),
+    "PricingData.get_aggregated_bars": _pricing(
+        lambda data: data.get_aggregated_bars("5m")
+    ),
+    "PricingData.get_aggregated_bars[compact]": _pricing(
+        lambda data: data.get_aggregated_bars("5m"),
+        compact=True,
+        volume_dtype=pl.Float32,
+    ),
+    "PricingData.get_aggregated_bars_multi": _pricing(
+        lambda data: data.get_aggregated_bars_multi(["5m", "15m", "1h", "1d"])
+    ),
+    "PricingData.sink_aggregated_bars": _sink_aggregated_bars,
+    "run_sharded[get_forward_returns]": _pricing(
+        lambda data: run_sharded(
+            data, operator.methodcaller("get_forward_returns", [1, 5, 30]), shards=4
+        )
+    ),
+    "PricingData.get_forward_returns": _pricing(
+        lambda data: data.get_forward_returns([1, 5, 30])
+    ),
+    "PricingData.get_forward_returns[wall_clock]": _pricing(
+        lambda data: data.get_forward_returns(["5m", "1h"])
+    ),
+    "ResultCache.memoize[hit]": _cached_forward_returns,
+}
+
+
+def run_case(name: str, rows: int, instruments: int, repeat: int) -> dict:
+    """Time one case in the current process and return its metrics."""
+    bars = synthetic_bars(rows, instruments)
+    run = CASES[name](bars)
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    return {
+        "case": name,
+        "rows": bars.height,
+        "instruments": instruments,
+        "seconds": seconds,
+        "rows_per_second": bars.height / seconds if seconds > 0 else float("inf"),
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_in_subprocess(name: str, rows: int, instruments: int, repeat: int) -> dict:
+    """Run one case in a fresh interpreter so that its peak RSS is measured in isolation."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--worker",
+            name,
+            str(rows),
+            str(instruments),
+            str(repeat),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def result_key(result: dict) -> str:
+    return f"{result['case']}/rows={result['rows']}/instruments={result['instruments']}"
+
+
+def find_regressions(
+    results: list[dict], history: list[dict], baseline_runs: int, threshold: float
+) -> list[str]:
+    """Compare results against the median of the last ``baseline_runs`` runs in the history.
+
+    Args:
+        results (list[dict]): Results of the current run.
+        history (list[dict]): Previous runs, oldest first.
+        baseline_runs (int): Number of most recent runs forming the baseline.
+        threshold (float): Tolerated relative regression, e.g. ``0.25`` for 25%.
+
+    Returns:
+        list[str]: A description of every metric that regressed beyond the threshold.
+    """
+    baseline: dict[str, dict[str, list[float]]] = {}
+    for run in history[-baseline_runs:]:
+        for result in run["results"]:
+            metrics = baseline.setdefault(
+                result_key(result), {metric: [] for metric in METRICS}
+            )
+            for metric in METRICS:
+                metrics[metric].append(result[metric])
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            continue
+        for metric, better in METRICS.items():
+            reference = statistics.median(previous[metric])
+            change = (result[metric] - reference) / reference
+            if (better == "higher" and change < -threshold) or (
+                better == "lower" and change > threshold
+            ):
+                regressions.append(
+                    f"{result_key(result)}: {metric} {result[metric]:,.1f} vs baseline {reference:,.1f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def git_commit() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--instruments", type=int, nargs="+", default=[1, 100])
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        help="Run only cases whose name contains one of these strings.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--baseline-runs", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--no-record",
+        action="store_true",
+        help="Do not append this run to the history.",
+    )
+    parser.add_argument(
+        "--worker",
+        nargs=4,
+        metavar=("CASE", "ROWS", "INSTRUMENTS", "REPEAT"),
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.worker:
+        name, rows, instruments, repeat = args.worker
+        print(json.dumps(run_case(name, int(rows), int(instruments), int(repeat))))
+        return
+
+    names = [
+        name
+        for name in CASES
+        if not args.cases or any(pattern in name for pattern in args.cases)
+    ]
+    print(f"{'case':>45} {'rows':>11} {'instr':>6} {'rows/s':>14} {'peak_rss_mib':>13}")
+    results = []
+    for rows in args.rows:
+        for instruments in args.instruments:
+            for name in names:
+                result = run_in_subprocess(name, rows, instruments, args.repeat)
+                results.append(result)
+                print(
+                    f"{name:>45} {result['rows']:>11,} {instruments:>6} "
+                    f"{result['rows_per_second']:>14,.0f} {result['peak_rss_mib']:>13.1f}"
+                )
+
+    history = (
+        json.loads(args.history.read_text())["runs"] if args.history.exists() else []
+    )
+    regressions = find_regressions(results, history, args.baseline_runs, args.threshold)
+
+    if not args.no_record:
+        history.append(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "versions": {
+                    "polars": pl.__version__,
+                    "numpy": np.__version__,
+                    "numba": numba.__version__,
+                },
+                "results": results,
+            }
+        )
+        args.history.write_text(json.dumps({"runs": history}, indent=2))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Deterministic synthetic market data shared by the benchmark scripts.
+
+Bars follow the ``PricingData`` schema: one 390-minute session per trade date with a bar per
+minute and instrument, and close prices following a seeded random walk per instrument. The same
+arguments always produce the same frame, so timings and memory are comparable across runs.
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+MINUTES_PER_SESSION = 390
+FIRST_TRADE_DATE = date(2000, 1, 3)
+
+
+def random_walk(size: int, seed: int = 0) -> pl.Series:
+    """A deterministic random-walk price series of the given size."""
+    rng = np.random.default_rng(seed)
+    return pl.Series("close", 100.0 + rng.standard_normal(size).cumsum())
+
+
+def session_bars(
+    trade_date: date,
+    instruments: int,
+    minutes: int = MINUTES_PER_SESSION,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """One session of one-minute bars for ``instruments`` fids, sorted by timestamp then fid.
+
+    Args:
+        trade_date (date): Trade date of the session; the session opens at 14:30 UTC.
+        instruments (int): Number of instruments, with fids ``0`` to ``instruments - 1``.
+        minutes (int, optional): Number of bars per instrument. Defaults to a full session.
+        seed (int, optional): Seed of the price process, combined with the trade date.
+
+    Returns:
+        pl.DataFrame: The session bars.
+    """
+    rng = np.random.default_rng([seed, trade_date.toordinal()])
+    steps = rng.standard_normal((minutes, instruments)) * 0.05
+    close = 100.0 + np.arange(instruments) + steps.cumsum(axis=0)
+    spread = np.abs(rng.standard_normal((minutes, instruments))) * 0.02
+    session_open = datetime.combine(trade_date, datetime.min.time()) + timedelta(
+        hours=14, minutes=30
+    )
+    bar = pl.int_range(minutes * instruments, dtype=pl.Int64)
+    return pl.select(
+        trade_date=pl.lit(trade_date),
+        end_dtutc=pl.lit(session_open, dtype=pl.Datetime("ns"))
+        + pl.duration(minutes=bar // instruments + 1, time_unit="ns"),
+        fid=bar % instruments,
+        symbol=(bar % instruments).cast(pl.Utf8),
+        open=pl.Series(np.vstack([close[:1], close[:-1]]).ravel()),
+        high=pl.Series((close + spread).ravel()),
+        low=pl.Series((close - spread).ravel()),
+        close=pl.Series(close.ravel()),
+        volume=pl.Series(
+            rng.integers(1, 1_000, minutes * instruments).astype(np.float64)
+        ),
+    )
+
+
+def synthetic_bars(rows: int, instruments: int, seed: int = 0) -> pl.DataFrame:
+    """About ``rows`` one-minute bars for ``instruments`` fids over consecutive sessions.
+
+    The row count is rounded to whole minutes across all instruments; the last session is
+    truncated when ``rows`` is not a multiple of a full session.
+    """
+    minutes = max(1, rows // instruments)
+    sessions = []
+    for day in range(-(-minutes // MINUTES_PER_SESSION)):
+        session_minutes = min(MINUTES_PER_SESSION, minutes - day * MINUTES_PER_SESSION)
+        trade_date = FIRST_TRADE_DATE + timedelta(days=day)
+        sessions.append(session_bars(trade_date, instruments, session_minutes, seed))
+    return pl.concat(sessions)
+
+
+def write_synthetic_store(path, rows: int, instruments: int, seed: int = 0) -> None:
+    """Write ``rows`` synthetic bars as a ``trade_date=`` hive-partitioned store, a session at a time."""
+    n_days = max(1, rows // (instruments * MINUTES_PER_SESSION))
+    for day in range(n_days):
+        trade_date = FIRST_TRADE_DATE + timedelta(days=day)
+        partition = path / f"trade_date={trade_date.isoformat()}"
+        partition.mkdir(parents=True, exist_ok=True)
+        session_bars(trade_date, instruments, seed=seed).drop(
+            "trade_date"
+        ).write_parquet(partition / "0.parquet")
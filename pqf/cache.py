@@ -0,0 +1,311 @@
+"""Persistent, content-addressed cache for the results of research pipelines.
+
+Results are keyed by a hash of the function name and the fingerprints of its arguments, and are
+stored as Arrow IPC files that are memory-mapped when they are read back. The cache is bounded in
+size and evicts the least recently used results first.
+
+Example:
+    cache = ResultCache("~/.cache/pqf", max_bytes=20 * 1024**3)
+    forward_returns = cache.memoize(PricingData.get_forward_returns)
+    forward_returns(pricing_data, [1, 5, 20])  # computed and stored
+    forward_returns(pricing_data, [1, 5, 20])  # memory-mapped from disk
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+from collections.abc import Callable, Mapping
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, NamedTuple, TypeVar, cast
+
+import polars as pl
+
+from pqf.pricing.core import PricingData
+
+Result = TypeVar("Result", bound=pl.DataFrame | pl.LazyFrame)
+
+_SUFFIX = ".arrow"
+_SCALARS = (type(None), bool, int, float, str, bytes, date, datetime, time, timedelta)
+
+
+class CacheStats(NamedTuple):
+    """Hit, miss and eviction counts of a ResultCache since it was created."""
+
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Share of lookups served from the cache, or None before the first lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+class ResultCache:
+    """Size-bounded LRU cache of DataFrame results stored as Arrow IPC files in a directory.
+
+    Attributes:
+        directory (Path): Directory holding the cached results.
+        max_bytes (int): Total size of the cached files above which the least recently used
+            results are evicted.
+
+    Methods:
+        key(name, *parts) -> str:
+            Content hash of a name and the fingerprints of any number of values.
+        get(key) -> pl.DataFrame | pl.LazyFrame | None:
+            Memory-maps a cached result, or returns None on a miss.
+        put(key, frame) -> None:
+            Stores a DataFrame or LazyFrame result, evicting least recently used results.
+        memoize(function) -> Callable:
+            Wraps a function returning a DataFrame or LazyFrame so that its results are cached.
+        clear() -> None:
+            Removes every cached result.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 10 * 1024**3):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counts since the cache was created."""
+        return CacheStats(self._hits, self._misses, self._evictions)
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached results."""
+        return sum(path.stat().st_size for path in self._entries())
+
+    def key(self, name: str, *parts: Any) -> str:
+        """Content hash of a name and the fingerprints of ``parts`` (see ``fingerprint``)."""
+        digest = hashlib.blake2b(name.encode(), digest_size=20)
+        for part in parts:
+            digest.update(fingerprint(part).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> pl.DataFrame | pl.LazyFrame | None:
+        """Memory-map the result stored under ``key``.
+
+        Args:
+            key (str): Key of the result.
+
+        Returns:
+            pl.DataFrame | pl.LazyFrame | None: The cached result, of the type it was stored as,
+                or None if it is not in the cache.
+        """
+        frame = self._read(key)
+        if frame is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return frame
+
+    def put(self, key: str, frame: pl.DataFrame | pl.LazyFrame) -> None:
+        """Store ``frame`` under ``key`` and evict least recently used results beyond ``max_bytes``.
+
+        A LazyFrame is collected before it is stored and read back as a LazyFrame. The file is
+        written under a temporary name and renamed into place, so concurrent readers never see a
+        partially written result.
+
+        Args:
+            key (str): Key of the result.
+            frame (pl.DataFrame | pl.LazyFrame): The result to store.
+        """
+        if isinstance(frame, pl.LazyFrame):
+            self._write(key, frame.collect(), lazy=True)
+        else:
+            self._write(key, frame, lazy=False)
+
+    def memoize(self, function: Callable[..., Result]) -> Callable[..., Result]:
+        """Cache the results of a function returning a DataFrame or LazyFrame.
+
+        The key combines the qualified name of the function with the fingerprints of its bound
+        arguments, defaults included, so equivalent calls share a result. LazyFrame results are
+        collected once when they are stored, and returned as a LazyFrame over the memory-mapped
+        file.
+
+        Every call fingerprints its arguments before the lookup, so a PricingData read with
+        ``from_parquet`` or a ``Path`` costs a listing and a ``stat`` of every file under it per
+        call, hit or miss, which can dominate a hit on a store of many thousands of files.
+
+        Args:
+            function (Callable[..., pl.DataFrame | pl.LazyFrame]): The function to cache.
+
+        Raises:
+            TypeError: If the function returns anything other than a DataFrame or LazyFrame, or
+                an argument cannot be fingerprinted.
+
+        Returns:
+            Callable[..., pl.DataFrame | pl.LazyFrame]: The cached function.
+        """
+        signature = inspect.signature(function)
+        name = f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def cached(*args: Any, **kwargs: Any) -> Result:
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = self.key(name, arguments.arguments)
+
+            # A result is read back as the frame type the function returned when it was stored.
+            frame = self.get(key)
+            if frame is not None:
+                return cast(Result, frame)
+            result = function(*args, **kwargs)
+            if not isinstance(result, (pl.DataFrame, pl.LazyFrame)):
+                raise TypeError(
+                    f"{name} returned {type(result).__name__}; only DataFrame and LazyFrame "
+                    "results can be cached."
+                )
+            lazy = isinstance(result, pl.LazyFrame)
+            collected = result.collect() if lazy else result
+            self._write(key, collected, lazy)
+            # Serve the memory-mapped copy unless the result alone exceeds ``max_bytes``.
+            frame = self._read(key)
+            if frame is None:
+                frame = collected.lazy() if lazy else collected
+            return cast(Result, frame)
+
+        return cached
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def _read(self, key: str) -> pl.DataFrame | pl.LazyFrame | None:
+        for lazy in (False, True):
+            path = self._path(key, lazy)
+            try:
+                frame = pl.read_ipc(path, memory_map=True)
+                # The modification time doubles as the last access time for LRU eviction.
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            return frame.lazy() if lazy else frame
+        return None
+
+    def _write(self, key: str, frame: pl.DataFrame, lazy: bool) -> None:
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(descriptor)
+        try:
+            frame.write_ipc(temporary)
+            os.replace(temporary, self._path(key, lazy))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._evict()
+
+    def _path(self, key: str, lazy: bool = False) -> Path:
+        return self.directory / f"{key}{'.lazy' if lazy else ''}{_SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob(f"*{_SUFFIX}"))
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self._evictions += 1
+
+
+def fingerprint(value: Any) -> str:
+    """A string identifying the content of ``value``, used to build cache keys.
+
+    - DataFrames and Series are hashed row by row together with their schema.
+    - LazyFrames are identified by their serialized query plan, which embeds in-memory data and
+      names scanned files. A file scan does not capture the files' contents; fingerprint the
+      store path alongside the plan to detect modified files.
+    - PricingData built with ``from_parquet`` is identified by the paths, sizes and modification
+      times of its parquet files and by its query plan; otherwise by its data.
+    - Existing files and directories (as ``Path``) by the paths, sizes and modification times
+      of the files they contain.
+    - Expressions by their serialized form, and scalars, enums, sequences and mappings by value.
+
+    Args:
+        value (Any): The value to fingerprint.
+
+    Raises:
+        TypeError: If the value is of a type that cannot be fingerprinted reliably.
+
+    Returns:
+        str: The fingerprint.
+    """
+    if isinstance(value, pl.DataFrame):
+        digest = hashlib.blake2b(str(value.schema).encode(), digest_size=20)
+        digest.update(value.hash_rows(seed=0).to_numpy().tobytes())
+        return f"DataFrame:{digest.hexdigest()}"
+    if isinstance(value, pl.Series):
+        return f"Series:{fingerprint(value.to_frame())}"
+    if isinstance(value, pl.LazyFrame):
+        return f"LazyFrame:{hashlib.blake2b(value.serialize(), digest_size=20).hexdigest()}"
+    if isinstance(value, pl.Expr):
+        return f"Expr:{hashlib.blake2b(value.meta.serialize(), digest_size=20).hexdigest()}"
+    if isinstance(value, PricingData):
+        columns = {
+            name: column
+            for name, column in vars(value).items()
+            if name.endswith("_col")
+        }
+        parts = [fingerprint(columns), fingerprint(value.data)]
+        if value.source is not None:
+            sources = (
+                [value.source]
+                if isinstance(value.source, (str, Path))
+                else value.source
+            )
+            parts.append(
+                fingerprint([_files_fingerprint(Path(source)) for source in sources])
+            )
+        return f"PricingData:{'|'.join(parts)}"
+    if isinstance(value, Path):
+        return f"Path:{_files_fingerprint(value)}"
+    if isinstance(value, Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, _SCALARS):
+        return f"{type(value).__name__}:{value!r}"
+    if isinstance(value, (list, tuple)):
+        return (
+            f"{type(value).__name__}[{','.join(fingerprint(item) for item in value)}]"
+        )
+    if isinstance(value, Mapping):
+        items = sorted((str(key), fingerprint(item)) for key, item in value.items())
+        return f"{{{','.join(f'{key}={item}' for key, item in items)}}}"
+    raise TypeError(f"cannot fingerprint a value of type {type(value).__name__}.")
+
+
+def _files_fingerprint(path: Path) -> str:
+    """Paths, sizes and modification times of a file, a directory tree or a glob."""
+    path = path.expanduser()
+    if path.is_dir():
+        files = sorted(file for file in path.rglob("*") if file.is_file())
+    elif path.exists():
+        files = [path]
+    elif path.is_absolute():
+        files = sorted(Path(path.anchor).glob(str(path.relative_to(path.anchor))))
+    else:
+        files = sorted(Path().glob(str(path)))
+    digest = hashlib.blake2b(digest_size=20)
+    for file in files:
+        stat = file.stat()
+        digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
@@ -0,0 +1,200 @@
+"""Numba kernels backing the ``backend="numba"`` option of the indicator functions.
+
+Each kernel makes a single pass over a float64 buffer and mirrors the semantics of the
+corresponding Polars expression. Missing values are passed in as NaN, so nulls and NaNs are
+both treated as missing. Kernels return the values together with a validity mask, so that
+NaNs produced by the computation itself (e.g. 0 / 0) are not mistaken for missing values.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+import polars as pl
+from numba import njit
+
+BACKENDS = ("polars", "numba")
+
+
+def check_backend(backend: str) -> None:
+    """Raise if the backend is not one of the supported indicator backends."""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}.")
+
+
+def apply_kernel(
+    data: pl.Series | pl.Expr,
+    kernel: Callable[..., tuple[np.ndarray, np.ndarray]],
+    *args: float,
+) -> pl.Series | pl.Expr:
+    """Run a kernel over a Series, or wrap it in an expression evaluated batch by batch.
+
+    Args:
+        data (pl.Series | pl.Expr): The input values.
+        kernel (Callable[..., tuple[np.ndarray, np.ndarray]]): Kernel returning values and a validity mask.
+        *args (float): Additional arguments passed to the kernel.
+
+    Returns:
+        pl.Series | pl.Expr: The kernel output, null where the mask is False.
+    """
+    if isinstance(data, pl.Expr):
+        return data.map_batches(
+            lambda series: _run_kernel(series, kernel, *args), return_dtype=pl.Float64
+        )
+    return _run_kernel(data, kernel, *args)
+
+
+def _run_kernel(
+    series: pl.Series,
+    kernel: Callable[..., tuple[np.ndarray, np.ndarray]],
+    *args: float,
+) -> pl.Series:
+    # Zero-copy for float64 data without nulls; otherwise a single conversion.
+    values = series.cast(pl.Float64).to_numpy()
+    out, valid = kernel(values, *args)
+    result = pl.Series(series.name, out, dtype=pl.Float64, nan_to_null=False)
+    if not valid.all():
+        result = result.scatter(np.flatnonzero(~valid), None)
+    return result
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def ewm_mean_kernel(values: np.ndarray, span: float) -> tuple[np.ndarray, np.ndarray]:
+    """Exponentially weighted mean matching ``ewm_mean(span=span, adjust=False)``."""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    weighted = np.nan
+    old_weight = 1.0
+    for i in range(n):
+        value = values[i]
+        observed = not np.isnan(value)
+        if np.isnan(weighted):
+            if observed:
+                weighted = value
+                old_weight = 1.0
+        else:
+            old_weight *= decay
+            if observed:
+                weighted = (old_weight * weighted + alpha * value) / (
+                    old_weight + alpha
+                )
+                old_weight = 1.0
+        out[i] = weighted
+        valid[i] = observed
+    return out, valid
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def rolling_mean_kernel(
+    values: np.ndarray, window_size: int, min_periods: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rolling mean over a fixed window, matching ``rolling_mean(window_size, min_periods)``."""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+    total = 0.0
+    count = 0
+    for i in range(n):
+        value = values[i]
+        if not np.isnan(value):
+            total += value
+            count += 1
+        if i >= window_size:
+            dropped = values[i - window_size]
+            if not np.isnan(dropped):
+                total -= dropped
+                count -= 1
+        if count >= min_periods and count > 0:
+            out[i] = total / count
+            valid[i] = True
+        else:
+            out[i] = np.nan
+    return out, valid
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def rsi_kernel(values: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray]:
+    """Fused RSI: price change, gain/loss split and both rolling means in one pass."""
+    n = values.shape[0]
+    gains = np.empty(n, dtype=np.float64)
+    losses = np.empty(n, dtype=np.float64)
+    out = np.empty(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+    gain_total = 0.0
+    loss_total = 0.0
+    for i in range(n):
+        delta = values[i] - values[i - 1] if i > 0 else np.nan
+        # A missing change counts as neither a gain nor a loss, like the Polars path.
+        gains[i] = delta if delta >= 0 else 0.0
+        losses[i] = -delta if delta < 0 else 0.0
+        gain_total += gains[i]
+        loss_total += losses[i]
+        if i >= period:
+            gain_total -= gains[i - period]
+            loss_total -= losses[i - period]
+        count = min(i + 1, period)
+        if count >= 3:
+            rsi = 100.0 - 100.0 / (1.0 + (gain_total / count) / (loss_total / count))
+            out[i] = rsi
+            valid[i] = rsi != 0.0
+        else:
+            out[i] = np.nan
+    return out, valid
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def macd_kernel(
+    values: np.ndarray, slow_period: int, fast_period: int, signal_period: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fused MACD histogram: fast, slow and signal EMAs advanced together in one pass."""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+    fast_alpha = 2.0 / (fast_period + 1.0)
+    slow_alpha = 2.0 / (slow_period + 1.0)
+    signal_alpha = 2.0 / (signal_period + 1.0)
+    fast = np.nan
+    slow = np.nan
+    signal = np.nan
+    fast_weight = 1.0
+    slow_weight = 1.0
+    signal_weight = 1.0
+    for i in range(n):
+        value = values[i]
+        observed = not np.isnan(value)
+        if np.isnan(fast):
+            if observed:
+                fast = value
+                slow = value
+                fast_weight = 1.0
+                slow_weight = 1.0
+        else:
+            fast_weight *= 1.0 - fast_alpha
+            slow_weight *= 1.0 - slow_alpha
+            if observed:
+                fast = (fast_weight * fast + fast_alpha * value) / (
+                    fast_weight + fast_alpha
+                )
+                slow = (slow_weight * slow + slow_alpha * value) / (
+                    slow_weight + slow_alpha
+                )
+                fast_weight = 1.0
+                slow_weight = 1.0
+
+        line = fast - slow
+        if np.isnan(signal):
+            if observed:
+                signal = line
+                signal_weight = 1.0
+        else:
+            signal_weight *= 1.0 - signal_alpha
+            if observed:
+                signal = (signal_weight * signal + signal_alpha * line) / (
+                    signal_weight + signal_alpha
+                )
+                signal_weight = 1.0
+        out[i] = line - signal
+        valid[i] = observed
+    return out, valid
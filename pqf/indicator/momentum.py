@@ -1,44 +1,49 @@
 import polars as pl
 
+from pqf.indicator._numba import apply_kernel, check_backend, macd_kernel, rsi_kernel
 from pqf.indicator.moving_average import exponential_moving_average
 
 
-def rsi(data: pl.Series | pl.Expr, period: int) -> pl.Series | pl.Expr:
+def rsi(
+    data: pl.Series | pl.Expr, period: int, backend: str = "polars"
+) -> pl.Series | pl.Expr:
     """Calculate the Relative Strength Index (RSI) for the given data series over a specified period.
 
     Args:
         data(pl.Series | pl.Expr): A Polars Series or Expression containing the data for which RSI needs to be calculated.
         period (int): An integer specifying the period for RSI calculation.
+        backend (str, optional): "polars" for a Polars expression, or "numba" for a fused single-pass
+            kernel over the underlying buffer. Defaults to "polars".
 
     Returns:
         pl.Series | pl.Expr: A Polars Series or Expression representing the RSI values calculated based on the input data and period.
     """
-    rsi_expr = (
-        pl.lit(100)
-        - (
-            100
-            / (
-                1
-                + (
-                    pl.when(data.diff() >= 0)
-                    .then(data.diff())
-                    .otherwise(0)
-                    .rolling_mean(window_size=period, min_periods=3)
-                    / pl.when(data.diff() < 0)
-                    .then(data.diff())
-                    .otherwise(0)
-                    .abs()
-                    .rolling_mean(window_size=period, min_periods=3)
-                )
-            )
-        )
-    ).replace(0, None)
+    check_backend(backend)
+    if backend == "numba":
+        return apply_kernel(data, rsi_kernel, period)
+
+    delta = pl.col(data.name) if isinstance(data, pl.Series) else data
+    delta = delta.diff()
+    average_gain = (
+        pl.when(delta >= 0)
+        .then(delta)
+        .otherwise(0)
+        .rolling_mean(window_size=period, min_periods=3)
+    )
+    average_loss = (
+        pl.when(delta < 0)
+        .then(delta)
+        .otherwise(0)
+        .abs()
+        .rolling_mean(window_size=period, min_periods=3)
+    )
+    rsi_expr = (pl.lit(100) - (100 / (1 + average_gain / average_loss))).replace(
+        0, None
+    )
 
     if isinstance(data, pl.Expr):
         return rsi_expr.name.keep()
-    price_data = pl.LazyFrame(data)
-    rsi_data = price_data.select(rsi_expr.alias(data.name))
-    return rsi_data.collect().to_series()
+    return data.to_frame().select(rsi_expr.alias(data.name)).to_series()
 
 
 def macd(
@@ -46,6 +51,7 @@ def macd(
     slow_period: int = 26,
     fast_period: int = 12,
     signal_period: int = 9,
+    backend: str = "polars",
 ) -> pl.Series | pl.Expr:
     """Calculate the Moving Average Convergence Divergence (MACD) indicator.
 
@@ -54,10 +60,16 @@ def macd(
         slow_period (int, optional): Number of periods for the slow EMA. Defaults to 26.
         fast_period (int, optional): Number of periods for the fast EMA. Defaults to 12.
         signal_period (int, optional): Number of periods for the signal line. Defaults to 9.
+        backend (str, optional): "polars" for Polars expressions, or "numba" for a fused kernel
+            advancing the fast, slow and signal EMAs in one pass. Defaults to "polars".
 
     Returns:
         pl.Series | pl.Expr: The MACD histogram values.
     """
+    check_backend(backend)
+    if backend == "numba":
+        return apply_kernel(data, macd_kernel, slow_period, fast_period, signal_period)
+
     fast_ema = exponential_moving_average(data, fast_period)
     slow_ema = exponential_moving_average(data, slow_period)
 
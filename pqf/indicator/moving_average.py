@@ -1,31 +1,48 @@
 import polars as pl
 
+from pqf.indicator._numba import (
+    apply_kernel,
+    check_backend,
+    ewm_mean_kernel,
+    rolling_mean_kernel,
+)
+
 
 def simple_moving_average(
-    prices: pl.Expr | pl.Series, window_size: int
+    prices: pl.Expr | pl.Series, window_size: int, backend: str = "polars"
 ) -> pl.Expr | pl.Series:
     """Calculate the simple moving average of prices over a specified window size.
 
     Args:
         prices (pl.Expr | pl.Series): The input prices data as a Polars expression or series.
         window_size (int): The size of the window for calculating the moving average.
+        backend (str, optional): "polars" for a Polars expression, or "numba" for a compiled
+            single-pass kernel over the underlying buffer. Defaults to "polars".
 
     Returns:
         pl.Expr | pl.Series: The simple moving average values.
     """
+    check_backend(backend)
+    if backend == "numba":
+        return apply_kernel(prices, rolling_mean_kernel, window_size, window_size)
     return prices.rolling_mean(window_size)
 
 
 def exponential_moving_average(
-    prices: pl.Series | pl.Expr, window_size: int
+    prices: pl.Series | pl.Expr, window_size: int, backend: str = "polars"
 ) -> pl.Series | pl.Expr:
     """Calculate the exponential moving average of prices.
 
     Args:
         prices (pl.Series | pl.Expr): Series or Expression containing the prices.
         window_size (int): Number of periods to consider in the moving average calculation.
+        backend (str, optional): "polars" for a Polars expression, or "numba" for a compiled
+            single-pass kernel over the underlying buffer. Defaults to "polars".
 
     Returns:
         pl.Series | pl.Expr: Series or Expression with the exponential moving average values.
     """
+    check_backend(backend)
+    if backend == "numba":
+        return apply_kernel(prices, ewm_mean_kernel, window_size)
     return prices.ewm_mean(span=window_size, adjust=False)
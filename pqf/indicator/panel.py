@@ -0,0 +1,60 @@
+from collections.abc import Mapping
+
+import polars as pl
+
+from pqf.pricing.core import PricingData
+
+
+def compute_indicators(
+    pricing_data: PricingData,
+    indicators: Mapping[str, pl.Expr],
+    warmup: int | Mapping[str, int] = 0,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Evaluate many indicators for every financial instrument in a single query.
+
+    Each indicator expression is evaluated per financial instrument, so no state leaks across
+    instrument boundaries. The bars are ordered by instrument and timestamp first, which keeps
+    every instrument's bars contiguous and lets Polars evaluate the instrument groups in
+    parallel.
+
+    Expected output takes the form of
+        trade_date_col | timestamp_col | financial_inst_id_col | rsi_14 | macd | ...
+
+    Example:
+        >>> compute_indicators(
+        ...     pricing_data,
+        ...     {"rsi_14": rsi(pl.col("close"), 14), "macd": macd(pl.col("close"))},
+        ...     warmup={"macd": 26},
+        ... )
+
+    Args:
+        pricing_data (PricingData): The pricing bars to compute indicators over.
+        indicators (Mapping[str, pl.Expr]): Indicator expressions keyed by output column name.
+        warmup (int | Mapping[str, int], optional): Number of leading bars of each instrument
+            for which an indicator is set to null, either for all indicators or per indicator
+            name. Defaults to 0.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: The indicator values, ordered by instrument and timestamp.
+    """
+    fid = pricing_data.financial_inst_id_col
+    bar_index = pl.col("_bar_index")
+
+    indicator_exprs = []
+    for name, expr in indicators.items():
+        warmup_bars = warmup if isinstance(warmup, int) else warmup.get(name, 0)
+        indicator = expr.over(fid)
+        if warmup_bars > 0:
+            indicator = pl.when(bar_index >= warmup_bars).then(indicator)
+        indicator_exprs.append(indicator.alias(name))
+
+    return (
+        pricing_data.get_bars_by_instrument()
+        .with_columns(pl.int_range(pl.len()).over(fid).alias("_bar_index"))
+        .select(
+            pricing_data.trade_date_col,
+            pricing_data.timestamp_col,
+            fid,
+            *indicator_exprs,
+        )
+    )
@@ -0,0 +1,426 @@
+"""Incremental indicator state for live bar updates.
+
+Each state holds only what the next update needs (O(window) per instrument) and advances every
+instrument by one bar per call, so a live update costs O(instruments) instead of O(history).
+The update arithmetic is the same as the ``backend="numba"`` kernels, so replaying a history
+bar by bar produces bit-for-bit the values of the corresponding batch function.
+
+States are vectorized across instruments: ``update_batch`` takes one value per instrument, with
+NaN for an instrument that has no bar, and returns one value per instrument, with NaN where the
+batch function would return null. ``update`` is the single-instrument shorthand.
+"""
+
+import numpy as np
+import polars as pl
+from numba import njit
+
+
+def _as_history(history: pl.Series | np.ndarray) -> np.ndarray:
+    """Convert a history to a float64 array of shape (bars, instruments)."""
+    if isinstance(history, pl.Series):
+        history = history.cast(pl.Float64).to_numpy()
+    values = np.asarray(history, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    if values.ndim != 2:
+        raise ValueError(
+            "history must be one value per bar, or a (bars, instruments) array."
+        )
+    return np.ascontiguousarray(values)
+
+
+def _as_batch(values: np.ndarray, n_instruments: int) -> np.ndarray:
+    """Convert one bar of values to a float64 array with one value per instrument."""
+    batch = np.asarray(values, dtype=np.float64).reshape(-1)
+    if batch.shape[0] != n_instruments:
+        raise ValueError(f"Expected {n_instruments} values, got {batch.shape[0]}.")
+    return batch
+
+
+def _scalar(value: float, valid: bool) -> float | None:
+    return float(value) if valid else None
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def _ema_step(values, weighted, old_weight, alpha, out, valid):
+    decay = 1.0 - alpha
+    for j in range(values.shape[0]):
+        value = values[j]
+        observed = not np.isnan(value)
+        if np.isnan(weighted[j]):
+            if observed:
+                weighted[j] = value
+                old_weight[j] = 1.0
+        else:
+            old_weight[j] *= decay
+            if observed:
+                weighted[j] = (old_weight[j] * weighted[j] + alpha * value) / (
+                    old_weight[j] + alpha
+                )
+                old_weight[j] = 1.0
+        out[j] = weighted[j]
+        valid[j] = observed
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def _rolling_mean_step(values, buffer, totals, counts, step, min_periods, out, valid):
+    window_size = buffer.shape[0]
+    slot = step % window_size
+    for j in range(values.shape[0]):
+        value = values[j]
+        if not np.isnan(value):
+            totals[j] += value
+            counts[j] += 1
+        if step >= window_size:
+            dropped = buffer[slot, j]
+            if not np.isnan(dropped):
+                totals[j] -= dropped
+                counts[j] -= 1
+        buffer[slot, j] = value
+        if counts[j] >= min_periods and counts[j] > 0:
+            out[j] = totals[j] / counts[j]
+            valid[j] = True
+        else:
+            out[j] = np.nan
+            valid[j] = False
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def _rsi_step(
+    values, previous, gains, losses, gain_totals, loss_totals, step, out, valid
+):
+    period = gains.shape[0]
+    slot = step % period
+    count = min(step + 1, period)
+    for j in range(values.shape[0]):
+        delta = values[j] - previous[j] if step > 0 else np.nan
+        gain = delta if delta >= 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        gain_totals[j] += gain
+        loss_totals[j] += loss
+        if step >= period:
+            gain_totals[j] -= gains[slot, j]
+            loss_totals[j] -= losses[slot, j]
+        gains[slot, j] = gain
+        losses[slot, j] = loss
+        previous[j] = values[j]
+        if count >= 3:
+            rsi = 100.0 - 100.0 / (
+                1.0 + (gain_totals[j] / count) / (loss_totals[j] / count)
+            )
+            out[j] = rsi
+            valid[j] = rsi != 0.0
+        else:
+            out[j] = np.nan
+            valid[j] = False
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def _macd_step(values, emas, weights, alphas, out, valid):
+    # emas and weights hold the fast, slow and signal EMAs in rows 0, 1 and 2.
+    for j in range(values.shape[0]):
+        value = values[j]
+        observed = not np.isnan(value)
+        if np.isnan(emas[0, j]):
+            if observed:
+                emas[0, j] = value
+                emas[1, j] = value
+                weights[0, j] = 1.0
+                weights[1, j] = 1.0
+        else:
+            weights[0, j] *= 1.0 - alphas[0]
+            weights[1, j] *= 1.0 - alphas[1]
+            if observed:
+                emas[0, j] = (weights[0, j] * emas[0, j] + alphas[0] * value) / (
+                    weights[0, j] + alphas[0]
+                )
+                emas[1, j] = (weights[1, j] * emas[1, j] + alphas[1] * value) / (
+                    weights[1, j] + alphas[1]
+                )
+                weights[0, j] = 1.0
+                weights[1, j] = 1.0
+
+        line = emas[0, j] - emas[1, j]
+        if np.isnan(emas[2, j]):
+            if observed:
+                emas[2, j] = line
+                weights[2, j] = 1.0
+        else:
+            weights[2, j] *= 1.0 - alphas[2]
+            if observed:
+                emas[2, j] = (weights[2, j] * emas[2, j] + alphas[2] * line) / (
+                    weights[2, j] + alphas[2]
+                )
+                weights[2, j] = 1.0
+        out[j] = line - emas[2, j]
+        valid[j] = observed
+
+
+@njit(nogil=True, cache=True)
+def _ema_replay(history, weighted, old_weight, alpha):
+    out = np.empty(history.shape[1])
+    valid = np.empty(history.shape[1], dtype=np.bool_)
+    for i in range(history.shape[0]):
+        _ema_step(history[i], weighted, old_weight, alpha, out, valid)
+
+
+@njit(nogil=True, cache=True)
+def _rolling_mean_replay(history, buffer, totals, counts, min_periods):
+    out = np.empty(history.shape[1])
+    valid = np.empty(history.shape[1], dtype=np.bool_)
+    for i in range(history.shape[0]):
+        _rolling_mean_step(
+            history[i], buffer, totals, counts, i, min_periods, out, valid
+        )
+
+
+@njit(nogil=True, cache=True)
+def _rsi_replay(history, previous, gains, losses, gain_totals, loss_totals, valid):
+    out = np.empty(history.shape[1])
+    for i in range(history.shape[0]):
+        _rsi_step(
+            history[i], previous, gains, losses, gain_totals, loss_totals, i, out, valid
+        )
+
+
+@njit(nogil=True, cache=True)
+def _macd_replay(history, emas, weights, alphas):
+    out = np.empty(history.shape[1])
+    valid = np.empty(history.shape[1], dtype=np.bool_)
+    for i in range(history.shape[0]):
+        _macd_step(history[i], emas, weights, alphas, out, valid)
+
+
+class EMAState:
+    """Incremental exponential moving average, matching ``exponential_moving_average``."""
+
+    __slots__ = ("_alpha", "_old_weight", "_weighted", "n_instruments", "window_size")
+
+    def __init__(self, window_size: int, n_instruments: int = 1):
+        self.window_size = window_size
+        self.n_instruments = n_instruments
+        self._alpha = 2.0 / (window_size + 1.0)
+        self._weighted = np.full(n_instruments, np.nan)
+        self._old_weight = np.ones(n_instruments)
+
+    @classmethod
+    def from_history(
+        cls, history: pl.Series | np.ndarray, window_size: int
+    ) -> "EMAState":
+        """Seed the state by replaying a history of shape (bars,) or (bars, instruments)."""
+        values = _as_history(history)
+        state = cls(window_size, values.shape[1])
+        _ema_replay(values, state._weighted, state._old_weight, state._alpha)
+        return state
+
+    def update_batch(self, values: np.ndarray) -> np.ndarray:
+        """Advance every instrument by one bar and return the new values."""
+        out = np.empty(self.n_instruments)
+        valid = np.empty(self.n_instruments, dtype=np.bool_)
+        _ema_step(
+            _as_batch(values, self.n_instruments),
+            self._weighted,
+            self._old_weight,
+            self._alpha,
+            out,
+            valid,
+        )
+        return np.where(valid, out, np.nan)
+
+    def update(self, value: float) -> float | None:
+        """Advance a single-instrument state by one bar and return the new value."""
+        out = self.update_batch(np.array([value]))
+        return _scalar(out[0], not np.isnan(out[0]))
+
+
+class SMAState:
+    """Incremental simple moving average, matching ``simple_moving_average``."""
+
+    __slots__ = (
+        "_buffer",
+        "_counts",
+        "_step",
+        "_totals",
+        "n_instruments",
+        "window_size",
+    )
+
+    def __init__(self, window_size: int, n_instruments: int = 1):
+        self.window_size = window_size
+        self.n_instruments = n_instruments
+        self._buffer = np.full((window_size, n_instruments), np.nan)
+        self._totals = np.zeros(n_instruments)
+        self._counts = np.zeros(n_instruments, dtype=np.int64)
+        self._step = 0
+
+    @classmethod
+    def from_history(
+        cls, history: pl.Series | np.ndarray, window_size: int
+    ) -> "SMAState":
+        """Seed the state by replaying a history of shape (bars,) or (bars, instruments)."""
+        values = _as_history(history)
+        state = cls(window_size, values.shape[1])
+        _rolling_mean_replay(
+            values, state._buffer, state._totals, state._counts, window_size
+        )
+        state._step = values.shape[0]
+        return state
+
+    def update_batch(self, values: np.ndarray) -> np.ndarray:
+        """Advance every instrument by one bar and return the new values."""
+        out = np.empty(self.n_instruments)
+        valid = np.empty(self.n_instruments, dtype=np.bool_)
+        _rolling_mean_step(
+            _as_batch(values, self.n_instruments),
+            self._buffer,
+            self._totals,
+            self._counts,
+            self._step,
+            self.window_size,
+            out,
+            valid,
+        )
+        self._step += 1
+        return np.where(valid, out, np.nan)
+
+    def update(self, value: float) -> float | None:
+        """Advance a single-instrument state by one bar and return the new value."""
+        out = self.update_batch(np.array([value]))
+        return _scalar(out[0], not np.isnan(out[0]))
+
+
+class RSIState:
+    """Incremental relative strength index, matching ``rsi``."""
+
+    __slots__ = (
+        "_gain_totals",
+        "_gains",
+        "_last_valid",
+        "_loss_totals",
+        "_losses",
+        "_previous",
+        "_step",
+        "n_instruments",
+        "period",
+    )
+
+    def __init__(self, period: int, n_instruments: int = 1):
+        self.period = period
+        self.n_instruments = n_instruments
+        self._previous = np.full(n_instruments, np.nan)
+        self._gains = np.zeros((period, n_instruments))
+        self._losses = np.zeros((period, n_instruments))
+        self._gain_totals = np.zeros(n_instruments)
+        self._loss_totals = np.zeros(n_instruments)
+        self._step = 0
+        self._last_valid = np.zeros(n_instruments, dtype=np.bool_)
+
+    @classmethod
+    def from_history(cls, history: pl.Series | np.ndarray, period: int) -> "RSIState":
+        """Seed the state by replaying a history of shape (bars,) or (bars, instruments)."""
+        values = _as_history(history)
+        state = cls(period, values.shape[1])
+        _rsi_replay(
+            values,
+            state._previous,
+            state._gains,
+            state._losses,
+            state._gain_totals,
+            state._loss_totals,
+            state._last_valid,
+        )
+        state._step = values.shape[0]
+        return state
+
+    def update_batch(self, values: np.ndarray) -> np.ndarray:
+        """Advance every instrument by one bar and return the new values.
+
+        A flat window yields NaN, as in ``rsi``; use ``update`` to tell it apart from a null.
+        """
+        out = np.empty(self.n_instruments)
+        _rsi_step(
+            _as_batch(values, self.n_instruments),
+            self._previous,
+            self._gains,
+            self._losses,
+            self._gain_totals,
+            self._loss_totals,
+            self._step,
+            out,
+            self._last_valid,
+        )
+        self._step += 1
+        return np.where(self._last_valid, out, np.nan)
+
+    def update(self, value: float) -> float | None:
+        """Advance a single-instrument state by one bar and return the new value."""
+        out = self.update_batch(np.array([value]))
+        return _scalar(out[0], bool(self._last_valid[0]))
+
+
+class MACDState:
+    """Incremental MACD histogram, matching ``macd``."""
+
+    __slots__ = (
+        "_alphas",
+        "_emas",
+        "_weights",
+        "fast_period",
+        "n_instruments",
+        "signal_period",
+        "slow_period",
+    )
+
+    def __init__(
+        self,
+        slow_period: int = 26,
+        fast_period: int = 12,
+        signal_period: int = 9,
+        n_instruments: int = 1,
+    ):
+        self.slow_period = slow_period
+        self.fast_period = fast_period
+        self.signal_period = signal_period
+        self.n_instruments = n_instruments
+        self._alphas = np.array(
+            [
+                2.0 / (fast_period + 1.0),
+                2.0 / (slow_period + 1.0),
+                2.0 / (signal_period + 1.0),
+            ]
+        )
+        self._emas = np.full((3, n_instruments), np.nan)
+        self._weights = np.ones((3, n_instruments))
+
+    @classmethod
+    def from_history(
+        cls,
+        history: pl.Series | np.ndarray,
+        slow_period: int = 26,
+        fast_period: int = 12,
+        signal_period: int = 9,
+    ) -> "MACDState":
+        """Seed the state by replaying a history of shape (bars,) or (bars, instruments)."""
+        values = _as_history(history)
+        state = cls(slow_period, fast_period, signal_period, values.shape[1])
+        _macd_replay(values, state._emas, state._weights, state._alphas)
+        return state
+
+    def update_batch(self, values: np.ndarray) -> np.ndarray:
+        """Advance every instrument by one bar and return the new values."""
+        out = np.empty(self.n_instruments)
+        valid = np.empty(self.n_instruments, dtype=np.bool_)
+        _macd_step(
+            _as_batch(values, self.n_instruments),
+            self._emas,
+            self._weights,
+            self._alphas,
+            out,
+            valid,
+        )
+        return np.where(valid, out, np.nan)
+
+    def update(self, value: float) -> float | None:
+        """Advance a single-instrument state by one bar and return the new value."""
+        out = self.update_batch(np.array([value]))
+        return _scalar(out[0], not np.isnan(out[0]))
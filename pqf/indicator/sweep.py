@@ -0,0 +1,231 @@
+import itertools
+import multiprocessing
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numba
+import numpy as np
+import polars as pl
+
+from pqf.indicator._numba import ewm_mean_kernel, rolling_mean_kernel, rsi_kernel
+from pqf.pricing.core import PricingData
+
+# Parameters of every indicator that can be swept, in the order of the indicator's arguments.
+SWEEP_PARAMETERS: dict[str, tuple[str, ...]] = {
+    "rsi": ("period",),
+    "macd": ("slow_period", "fast_period", "signal_period"),
+    "simple_moving_average": ("window_size",),
+    "exponential_moving_average": ("window_size",),
+}
+
+_BARS_FILE = "_bars.arrow"
+
+# Bars of the current process: timestamp, instrument and price columns memory-mapped from the
+# Arrow IPC file written by ``sweep_indicator``, and the offsets of each instrument's bars.
+_bars: pl.DataFrame | None = None
+_offsets: np.ndarray | None = None
+
+
+def sweep_indicator(
+    pricing_data: PricingData,
+    indicator: str,
+    grid: Mapping[str, Sequence[int]],
+    output: str | Path,
+    processes: int = 1,
+    chunk_size: int = 16,
+    price_column: str | None = None,
+) -> pl.DataFrame:
+    """Evaluate an indicator for every point of a parameter grid and write the results to disk.
+
+    The bars are loaded once and written, ordered by instrument and timestamp, to an
+    uncompressed Arrow IPC file in ``output`` that every worker memory-maps. The price column is
+    read without copying, so the operating system shares a single copy of the bars between the
+    workers and their memory does not grow with the number of workers.
+
+    The grid is the Cartesian product of the parameter values; duplicate points are evaluated
+    once. Points are sorted and split into chunks of ``chunk_size``, one task per chunk. Within
+    a task, exponential moving averages are computed once per span and reused, e.g. by MACD
+    configurations sharing a fast or slow period, and sorting keeps those configurations in the
+    same chunk. Each task writes its results as soon as they are computed, so results never
+    accumulate in memory:
+        output/part-00000.parquet: timestamp_col | financial_inst_id_col | macd_26_12_9 | ...
+
+    Indicators are evaluated per instrument with the same kernels as ``backend="numba"``.
+
+    Example:
+        >>> sweep_indicator(
+        ...     pricing_data,
+        ...     "macd",
+        ...     {"slow_period": [20, 26, 30], "fast_period": [8, 12], "signal_period": [9]},
+        ...     "sweeps/macd",
+        ...     processes=8,
+        ... )
+
+    Args:
+        pricing_data (PricingData): The bars to evaluate the indicator over.
+        indicator (str): Name of the indicator, one of ``SWEEP_PARAMETERS``.
+        grid (Mapping[str, Sequence[int]]): Values of every parameter of the indicator.
+        output (str | Path): Directory the results are written to.
+        processes (int, optional): Number of worker processes. Defaults to 1, which evaluates the
+            grid in the calling process.
+        chunk_size (int, optional): Number of grid points per task. Defaults to 16.
+        price_column (str | None, optional): Column the indicator is evaluated on. Defaults to the
+            close column.
+
+    Raises:
+        ValueError: If the indicator is not supported, the grid does not match its parameters,
+            or processes or chunk_size is not positive.
+
+    Returns:
+        pl.DataFrame: One row per grid point with its parameters, the name of its output column
+            and the path of the file holding it.
+    """
+    if indicator not in SWEEP_PARAMETERS:
+        raise ValueError(
+            f"indicator must be one of {tuple(SWEEP_PARAMETERS)}, got {indicator!r}."
+        )
+    parameters = SWEEP_PARAMETERS[indicator]
+    if set(grid) != set(parameters):
+        raise ValueError(
+            f"grid for {indicator} must give values for {parameters}, got {tuple(grid)}."
+        )
+    if processes < 1 or chunk_size < 1:
+        raise ValueError("processes and chunk_size must be at least 1.")
+
+    points = sorted(set(itertools.product(*(grid[name] for name in parameters))))
+    chunks = [
+        points[start : start + chunk_size]
+        for start in range(0, len(points), chunk_size)
+    ]
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = [output / f"part-{index:05d}.parquet" for index in range(len(chunks))]
+
+    fid = pricing_data.financial_inst_id_col
+    timestamp = pricing_data.timestamp_col
+    bars_path = output / _BARS_FILE
+    (
+        pricing_data.get_bars_by_instrument()
+        .lazy()
+        .select(
+            timestamp,
+            fid,
+            # NaN instead of null keeps the column free of a validity mask, and so zero-copy.
+            pl.col(price_column or pricing_data.close_col)
+            .cast(pl.Float64)
+            .fill_null(np.nan)
+            .alias("_price"),
+        )
+        .collect()
+        .write_ipc(bars_path, compression="uncompressed")
+    )
+    try:
+        tasks = [
+            (indicator, chunk, str(path))
+            for chunk, path in zip(chunks, paths, strict=True)
+        ]
+        if processes == 1 or len(tasks) < 2:
+            _load_bars(str(bars_path), fid)
+            for task in tasks:
+                _run_task(*task)
+        else:
+            with ProcessPoolExecutor(
+                processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+                initargs=(str(bars_path), fid),
+            ) as pool:
+                list(pool.map(_run_task, *zip(*tasks, strict=True)))
+    finally:
+        _release_bars()
+        bars_path.unlink(missing_ok=True)
+
+    manifest = pl.DataFrame(points, schema=list(parameters), orient="row")
+    return manifest.with_columns(
+        column=pl.Series(
+            [_column_name(indicator, point) for point in points], dtype=pl.Utf8
+        ),
+        path=pl.Series(
+            [
+                str(path)
+                for path, chunk in zip(paths, chunks, strict=True)
+                for _ in chunk
+            ]
+        ),
+    )
+
+
+def _column_name(indicator: str, point: tuple[int, ...]) -> str:
+    return "_".join([indicator, *map(str, point)])
+
+
+def _initialize_worker(bars_path: str, fid: str) -> None:
+    # Parallelism comes from the processes; keep each one to a single thread.
+    numba.set_num_threads(1)
+    _load_bars(bars_path, fid)
+
+
+def _load_bars(bars_path: str, fid: str) -> None:
+    global _bars, _offsets
+    _bars = pl.read_ipc(bars_path, memory_map=True)
+    lengths = _bars.group_by(fid, maintain_order=True).len()["len"]
+    _offsets = np.zeros(lengths.len() + 1, dtype=np.int64)
+    _offsets[1:] = lengths.cum_sum().to_numpy()
+
+
+def _release_bars() -> None:
+    # Drop the memory map so that the bars file can be removed.
+    global _bars, _offsets
+    _bars = None
+    _offsets = None
+
+
+def _run_task(indicator: str, points: list[tuple[int, ...]], path: str) -> None:
+    assert _bars is not None and _offsets is not None
+    prices = _bars["_price"].to_numpy()
+    observed = ~np.isnan(prices)
+    emas: dict[int, np.ndarray] = {}
+
+    def ema(span: int) -> np.ndarray:
+        if span not in emas:
+            emas[span] = _per_instrument(ewm_mean_kernel, prices, span)[0]
+        return emas[span]
+
+    columns = {}
+    for point in points:
+        if indicator == "rsi":
+            values, valid = _per_instrument(rsi_kernel, prices, *point)
+        elif indicator == "simple_moving_average":
+            values, valid = _per_instrument(
+                rolling_mean_kernel, prices, point[0], point[0]
+            )
+        elif indicator == "exponential_moving_average":
+            values, valid = ema(point[0]), observed
+        else:
+            slow_period, fast_period, signal_period = point
+            line = ema(fast_period) - ema(slow_period)
+            # The signal line only advances on observed prices, as in the fused MACD kernel.
+            signal = _per_instrument(
+                ewm_mean_kernel, np.where(observed, line, np.nan), signal_period
+            )[0]
+            values, valid = line - signal, observed
+        column = pl.Series(
+            _column_name(indicator, point), values, dtype=pl.Float64, nan_to_null=False
+        )
+        if not valid.all():
+            column = column.scatter(np.flatnonzero(~valid), None)
+        columns[column.name] = column
+
+    _bars.drop("_price").with_columns(**columns).write_parquet(path)
+
+
+def _per_instrument(
+    kernel, values: np.ndarray, *args: float
+) -> tuple[np.ndarray, np.ndarray]:
+    assert _offsets is not None
+    out = np.empty(values.shape[0], dtype=np.float64)
+    valid = np.empty(values.shape[0], dtype=np.bool_)
+    for start, end in itertools.pairwise(_offsets):
+        out[start:end], valid[start:end] = kernel(values[start:end], *args)
+    return out, valid
@@ -0,0 +1,183 @@
+from typing import Literal
+
+import polars as pl
+
+from pqf.order.slippage import spread_slippage, square_root_impact
+from pqf.pricing.core import PricingData
+
+FILL_PRICES = ("next_open", "vwap")
+
+
+def simulate_fills(
+    orders: pl.LazyFrame | pl.DataFrame,
+    pricing_data: PricingData,
+    fill_price: Literal["next_open", "vwap"] = "next_open",
+    participation_rate: float | None = None,
+    spread_bps: float = 0.0,
+    impact_coefficient: float = 0.0,
+    impact_window: int = 20,
+    timestamp_column: str = "timestamp",
+    quantity_column: str = "quantity",
+) -> pl.LazyFrame | pl.DataFrame:
+    """Simulate the execution of orders against the pricing bars.
+
+    Every order is filled in the first bar of its instrument strictly after the order timestamp,
+    found for all orders at once with a forward as-of join, so an order never trades on the bar
+    it was generated from. Orders are given as:
+        timestamp_column | financial_inst_id_col | quantity_column | ...
+
+    The reference price is the open of the fill bar (``"next_open"``) or, as bars carry no
+    intrabar trades, the typical price ``(high + low + close) / 3`` as an approximation of the
+    bar's VWAP (``"vwap"``). With a ``participation_rate``, fills are capped at that share of
+    the bar's volume, nothing fills in a bar with a null volume, and the rest is reported as
+    unfilled. The execution price adds half the bid-ask spread and square-root market impact
+    (see ``pqf.order.slippage``), where the impact uses the volatility of log returns and the
+    mean volume over the ``impact_window`` bars before the fill bar. The window needs at least
+    two bars, and two log returns for the volatility, so fills in the first three bars of an
+    instrument have no impact estimate; they are charged the spread only.
+
+    The output adds ``fill_timestamp``, ``reference_price``, ``filled_quantity``,
+    ``unfilled_quantity``, ``execution_price`` and ``slippage_cost`` (the cost of the execution
+    price over the reference price, positive when paid) to the orders, in their original order,
+    and with an ``impact_coefficient`` also ``impact_estimated``, which is False where no impact
+    was charged for lack of an estimate. Orders without a later bar are not filled and have no
+    execution price.
+
+    Args:
+        orders (pl.LazyFrame | pl.DataFrame): Orders with a timestamp, instrument and signed quantity.
+        pricing_data (PricingData): The bars to fill against.
+        fill_price (Literal["next_open", "vwap"], optional): Reference price of a fill. Defaults
+            to "next_open".
+        participation_rate (float | None, optional): Maximum share of a bar's volume an order can
+            fill. Defaults to no cap.
+        spread_bps (float, optional): Full bid-ask spread in basis points. Defaults to 0.0.
+        impact_coefficient (float, optional): Scale of the square-root impact. Defaults to 0.0.
+        impact_window (int, optional): Number of bars for the impact volatility and volume.
+            Defaults to 20.
+        timestamp_column (str, optional): Name of the order timestamp column. Defaults to "timestamp".
+        quantity_column (str, optional): Name of the order quantity column. Defaults to "quantity".
+
+    Raises:
+        ValueError: If fill_price is not "next_open" or "vwap", or participation_rate is not
+            positive.
+
+    Returns:
+        pl.LazyFrame | pl.DataFrame: The orders with their fills, a DataFrame if both the orders
+            and the pricing data are eager.
+    """
+    if fill_price not in FILL_PRICES:
+        raise ValueError(
+            f"fill_price must be one of {FILL_PRICES}, got {fill_price!r}."
+        )
+    if participation_rate is not None and participation_rate <= 0:
+        raise ValueError(
+            f"participation_rate must be positive, got {participation_rate}."
+        )
+
+    fid = pricing_data.financial_inst_id_col
+    timestamp = pricing_data.timestamp_col
+    volume = pl.col(pricing_data.volume_col)
+    if fill_price == "next_open":
+        reference = pl.col(pricing_data.open_col)
+    else:
+        reference = (
+            pl.col(pricing_data.high_col)
+            + pl.col(pricing_data.low_col)
+            + pl.col(pricing_data.close_col)
+        ) / 3
+
+    bar_columns = [
+        # Key the bars by the orders' instrument ID type, e.g. Int64 orders against compact bars.
+        pl.col(fid).cast(orders.lazy().collect_schema()[fid]),
+        pl.col(timestamp).alias("fill_timestamp"),
+        reference.alias("reference_price"),
+        volume.alias("_bar_volume"),
+    ]
+    if impact_coefficient:
+        # Only bars before the fill bar are known when the order is sent.
+        log_return = pl.col(pricing_data.close_col).log().diff()
+        bar_columns += [
+            log_return.rolling_std(impact_window, min_samples=2)
+            .shift(1)
+            .over(fid)
+            .alias("_volatility"),
+            volume.rolling_mean(impact_window, min_samples=2)
+            .shift(1)
+            .over(fid)
+            .alias("_average_volume"),
+        ]
+    bars = pricing_data.get_bars_by_instrument().lazy().select(bar_columns)
+
+    quantity = pl.col(quantity_column)
+    filled = pl.col("filled_quantity")
+    if participation_rate is None:
+        fillable = quantity
+    else:
+        # A bar without a reported volume has no capacity rather than an unlimited one.
+        capacity = (pl.col("_bar_volume") * participation_rate).fill_null(0)
+        fillable = quantity.sign() * pl.min_horizontal(quantity.abs(), capacity)
+    slippage = spread_slippage(pl.col("reference_price"), filled.sign(), spread_bps)
+    impact_columns = []
+    if impact_coefficient:
+        # Fills during an instrument's warm-up are charged no impact rather than a null price.
+        impact_estimated = (
+            pl.col("_volatility").is_not_null()
+            & pl.col("_average_volume").is_not_null()
+        )
+        impact = square_root_impact(
+            pl.col("reference_price"),
+            filled,
+            pl.col("_average_volume"),
+            pl.col("_volatility"),
+            impact_coefficient,
+        )
+        slippage = slippage + pl.when(impact_estimated).then(impact).otherwise(0.0)
+        impact_columns.append(impact_estimated.alias("impact_estimated"))
+
+    timestamp_dtype = pricing_data.output_schema[timestamp]
+    fills = (
+        orders.lazy()
+        .with_row_index("_order")
+        .with_columns(
+            pl.col(timestamp_column).cast(timestamp_dtype).alias("_order_timestamp")
+        )
+        .sort("_order_timestamp")
+        .join_asof(
+            bars,
+            left_on="_order_timestamp",
+            right_on="fill_timestamp",
+            by=fid,
+            strategy="forward",
+            allow_exact_matches=False,
+            check_sortedness=False,
+        )
+        .with_columns(
+            pl.when(pl.col("fill_timestamp").is_not_null())
+            .then(fillable)
+            .otherwise(0.0)
+            .cast(pl.Float64)
+            .alias("filled_quantity")
+        )
+        .with_columns(
+            (quantity - filled).alias("unfilled_quantity"),
+            (pl.col("reference_price") + slippage).alias("execution_price"),
+        )
+        .with_columns(
+            ((pl.col("execution_price") - pl.col("reference_price")) * filled).alias(
+                "slippage_cost"
+            ),
+            *impact_columns,
+        )
+        .sort("_order")
+        .drop(
+            "_order",
+            "_order_timestamp",
+            "_bar_volume",
+            "_volatility",
+            "_average_volume",
+            strict=False,
+        )
+    )
+    if isinstance(orders, pl.DataFrame) and isinstance(pricing_data.data, pl.DataFrame):
+        return fills.collect()
+    return fills
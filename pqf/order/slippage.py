@@ -14,3 +14,51 @@ def simple_slippage(
         pl.Series | pl.Expr: Series or expression with slippage applied.
     """
     return prices * slippage_rate
+
+
+def spread_slippage(
+    prices: pl.Series | pl.Expr, side: pl.Series | pl.Expr, spread_bps: float
+) -> pl.Series | pl.Expr:
+    """Calculate the per-share cost of crossing half of the bid-ask spread.
+
+    Args:
+        prices (pl.Series | pl.Expr): Series or expression representing mid prices.
+        side (pl.Series | pl.Expr): Series or expression of 1 for buys and -1 for sells.
+        spread_bps (float): Full bid-ask spread in basis points.
+
+    Returns:
+        pl.Series | pl.Expr: Series or expression with the signed price adjustment, positive for
+            buys and negative for sells.
+    """
+    return prices * side * (spread_bps / 2 / 10_000)
+
+
+def square_root_impact(
+    prices: pl.Series | pl.Expr,
+    quantity: pl.Series | pl.Expr,
+    volume: pl.Series | pl.Expr,
+    volatility: pl.Series | pl.Expr,
+    impact_coefficient: float = 1.0,
+) -> pl.Series | pl.Expr:
+    """Calculate the per-share market impact of an order with the square-root law.
+
+    The impact is ``impact_coefficient * volatility * sqrt(|quantity| / volume)`` as a fraction
+    of the price, in the direction of the order.
+
+    Args:
+        prices (pl.Series | pl.Expr): Series or expression representing prices.
+        quantity (pl.Series | pl.Expr): Signed order quantity, positive for buys.
+        volume (pl.Series | pl.Expr): Reference volume, e.g. the average volume per bar.
+        volatility (pl.Series | pl.Expr): Volatility of returns over the same period as the volume.
+        impact_coefficient (float, optional): Scale of the impact. Defaults to 1.0.
+
+    Returns:
+        pl.Series | pl.Expr: Series or expression with the signed price adjustment.
+    """
+    return (
+        prices
+        * quantity.sign()
+        * impact_coefficient
+        * volatility
+        * (quantity.abs() / volume).sqrt()
+    )
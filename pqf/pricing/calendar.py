@@ -0,0 +1,411 @@
+from collections.abc import Sequence
+from datetime import date, time, timedelta
+from pathlib import Path
+from typing import Literal
+
+import polars as pl
+
+from pqf.pricing.core import PricingData
+from pqf.pricing.utils import require_empty_directory
+
+FILL_METHODS = ("forward", "null")
+
+
+def session_calendar(
+    trade_dates: Sequence[date] | pl.Series,
+    open_time: time,
+    close_time: time,
+    time_zone: str | None = None,
+) -> pl.DataFrame:
+    """Build a trading-session calendar with the same session hours on every trade date.
+
+    Expected output takes the form of
+        trade_date | session_open | session_close
+
+    Args:
+        trade_dates (Sequence[date] | pl.Series): The trade dates of the calendar.
+        open_time (time): Local time the sessions open.
+        close_time (time): Local time the sessions close.
+        time_zone (str | None, optional): Time zone of the session hours, e.g. "America/New_York".
+            The session bounds are converted to naive UTC timestamps, following daylight saving
+            time. Defaults to UTC.
+
+    Returns:
+        pl.DataFrame: One row per trade date with its session bounds.
+    """
+    trade_date = pl.Series("trade_date", trade_dates, dtype=pl.Date)
+
+    def bound(session_time: time) -> pl.Expr:
+        timestamp = pl.col("trade_date").dt.combine(session_time, time_unit="ns")
+        if time_zone is not None:
+            timestamp = timestamp.dt.replace_time_zone(time_zone).dt.convert_time_zone(
+                "UTC"
+            )
+            timestamp = timestamp.dt.replace_time_zone(None)
+        return timestamp
+
+    return trade_date.to_frame().select(
+        "trade_date",
+        bound(open_time).alias("session_open"),
+        bound(close_time).alias("session_close"),
+    )
+
+
+def sessions_from_bars(
+    pricing_data: PricingData, grain: timedelta | None = None
+) -> pl.LazyFrame:
+    """Derive a session calendar from the bars themselves.
+
+    A session opens one grain before the first bar of its trade date, over all instruments,
+    and closes at the last bar, so that its grid reproduces the end timestamps of the bars.
+
+    Args:
+        pricing_data (PricingData): The bars.
+        grain (timedelta | None, optional): Spacing of the bars. Defaults to the estimated time
+            grain of the bars.
+
+    Returns:
+        pl.LazyFrame: One row per trade date with its session bounds.
+    """
+    grain = grain or pricing_data.time_grain
+    timestamp = pl.col(pricing_data.timestamp_col)
+    return (
+        pricing_data.get_bars()
+        .lazy()
+        .group_by(pl.col(pricing_data.trade_date_col).alias("trade_date"))
+        .agg(
+            (timestamp.min() - grain).alias("session_open"),
+            timestamp.max().alias("session_close"),
+        )
+        .sort("trade_date")
+    )
+
+
+def align_to_calendar(
+    pricing_data: PricingData,
+    sessions: pl.LazyFrame | pl.DataFrame | None = None,
+    fill: Literal["forward", "null"] = "forward",
+    grain: timedelta | None = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Reindex every instrument onto the expected bar grid of a session calendar.
+
+    The grid holds the end timestamps ``session_open + grain``, ``session_open + 2 * grain``, ...
+    up to ``session_close`` of every session. It is crossed once with the instruments, each
+    restricted to the trade dates between its first and last bar, and the bars are left joined
+    onto it, so no instrument is processed on its own. Missing bars are flagged by ``is_gap``
+    and are either flat bars at the last close with zero volume (``"forward"``) or null
+    (``"null"``). Bars off the grid are dropped; ``gap_statistics`` counts them.
+
+    Once aligned, positional horizons such as ``get_forward_returns([5])`` span exactly five
+    grain lengths within a session.
+
+    Expected output takes the form of
+        trade_date_col | timestamp_col | financial_inst_id_col | symbol_col | open_col | ... | is_gap
+
+    Args:
+        pricing_data (PricingData): The bars to align.
+        sessions (pl.LazyFrame | pl.DataFrame | None, optional): Session calendar with
+            ``trade_date``, ``session_open`` and ``session_close`` columns (see
+            ``session_calendar``). Defaults to the sessions of the bars (see
+            ``sessions_from_bars``).
+        fill (Literal["forward", "null"], optional): How missing bars are filled. Defaults to
+            "forward".
+        grain (timedelta | None, optional): Spacing of the grid. Defaults to the estimated time
+            grain of the bars.
+
+    Raises:
+        ValueError: If fill is not "forward" or "null".
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: The aligned bars in trade date, timestamp and instrument
+            order, lazy if the bars are lazy.
+    """
+    if fill not in FILL_METHODS:
+        raise ValueError(f"fill must be one of {FILL_METHODS}, got {fill!r}.")
+    grain = grain or pricing_data.time_grain
+    if sessions is None:
+        sessions = sessions_from_bars(pricing_data, grain)
+
+    bars = pricing_data.get_bars().lazy()
+    aligned = _align(
+        pricing_data, bars, _grid(pricing_data, bars, sessions, grain), fill
+    )
+    if isinstance(pricing_data.data, pl.DataFrame):
+        return aligned.collect()
+    return aligned
+
+
+def gap_statistics(
+    pricing_data: PricingData,
+    sessions: pl.LazyFrame | pl.DataFrame | None = None,
+    grain: timedelta | None = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Report how far every instrument's bars are from the expected bar grid.
+
+    The missing bars are the grid rows without a bar, found with an anti join of the grid and
+    the bars; off-grid bars are the bars that no grid row matches, found with the reverse anti
+    join. The grid is built as in ``align_to_calendar``.
+
+    Expected output takes the form of
+        financial_inst_id_col | expected_bars | missing_bars | off_grid_bars | coverage | longest_gap
+
+    where ``coverage`` is the share of expected bars present and ``longest_gap`` the largest
+    number of consecutive missing bars within a session.
+
+    Args:
+        pricing_data (PricingData): The bars to check.
+        sessions (pl.LazyFrame | pl.DataFrame | None, optional): Session calendar (see
+            ``align_to_calendar``). Defaults to the sessions of the bars.
+        grain (timedelta | None, optional): Spacing of the grid. Defaults to the estimated time
+            grain of the bars.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: One row per instrument, lazy if the bars are lazy.
+    """
+    grain = grain or pricing_data.time_grain
+    if sessions is None:
+        sessions = sessions_from_bars(pricing_data, grain)
+
+    fid = pricing_data.financial_inst_id_col
+    keys = [pricing_data.trade_date_col, pricing_data.timestamp_col, fid]
+    bars = pricing_data.get_bars().lazy()
+    # The grid feeds three branches of the plan; caching it evaluates it once.
+    grid = _grid(pricing_data, bars, sessions, grain).cache()
+
+    expected = grid.group_by(fid).agg(pl.len().alias("expected_bars"))
+    missing = (
+        grid.join(bars, on=keys, how="anti")
+        .sort(fid, "_slot")
+        .with_columns(
+            (pl.col("_slot").diff().fill_null(0) != 1).cum_sum().over(fid).alias("_run")
+        )
+        .group_by(fid, "_run")
+        .agg(pl.len().alias("_run_length"))
+        .group_by(fid)
+        .agg(
+            pl.col("_run_length").sum().alias("missing_bars"),
+            pl.col("_run_length").max().alias("longest_gap"),
+        )
+    )
+    off_grid = (
+        bars.join(grid, on=keys, how="anti")
+        .group_by(fid)
+        .agg(pl.len().alias("off_grid_bars"))
+    )
+
+    statistics = (
+        expected.join(missing, on=fid, how="left")
+        .join(off_grid, on=fid, how="left")
+        .select(
+            fid,
+            pl.col("expected_bars").cast(pl.UInt32),
+            pl.col("missing_bars").fill_null(0).cast(pl.UInt32),
+            pl.col("off_grid_bars").fill_null(0).cast(pl.UInt32),
+            (1 - pl.col("missing_bars").fill_null(0) / pl.col("expected_bars")).alias(
+                "coverage"
+            ),
+            pl.col("longest_gap").fill_null(0).cast(pl.UInt32),
+        )
+        .sort(fid)
+    )
+    if isinstance(pricing_data.data, pl.DataFrame):
+        return statistics.collect()
+    return statistics
+
+
+def sink_aligned_bars(
+    pricing_data: PricingData,
+    path: str | Path,
+    sessions: pl.LazyFrame | pl.DataFrame | None = None,
+    fill: Literal["forward", "null"] = "forward",
+    grain: timedelta | None = None,
+    trade_dates_per_chunk: int = 20,
+) -> pl.LazyFrame:
+    """Align the bars to a session calendar chunk by chunk of trade dates and write them to parquet.
+
+    Each chunk of trade dates is aligned as in ``align_to_calendar`` and written to its own
+    ``part-XXXXX.parquet`` file, so peak memory is bounded by one chunk of the grid instead of
+    the whole history. With forward filling, the last close of every instrument is carried
+    from one chunk into the next, so the result equals ``align_to_calendar``. ``path`` must be
+    empty or not exist yet, so that no part of an earlier run is mixed into the result; without
+    any session, a single empty part with the output schema is written.
+
+    Args:
+        pricing_data (PricingData): The bars to align.
+        path (str | Path): Empty directory to write the aligned parquet files to.
+        sessions (pl.LazyFrame | pl.DataFrame | None, optional): Session calendar (see
+            ``align_to_calendar``). Defaults to the sessions of the bars.
+        fill (Literal["forward", "null"], optional): How missing bars are filled. Defaults to
+            "forward".
+        grain (timedelta | None, optional): Spacing of the grid. Defaults to the estimated time
+            grain of the bars.
+        trade_dates_per_chunk (int, optional): Number of trade dates aligned per chunk.
+            Defaults to 20.
+
+    Raises:
+        ValueError: If fill is not "forward" or "null", trade_dates_per_chunk is not positive,
+            or path is not empty.
+
+    Returns:
+        pl.LazyFrame: A scan over the written aligned bars.
+    """
+    if fill not in FILL_METHODS:
+        raise ValueError(f"fill must be one of {FILL_METHODS}, got {fill!r}.")
+    if trade_dates_per_chunk < 1:
+        raise ValueError("trade_dates_per_chunk must be a positive integer.")
+    output_dir = Path(path)
+    require_empty_directory(output_dir, "path")
+    grain = grain or pricing_data.time_grain
+    if sessions is None:
+        sessions = sessions_from_bars(pricing_data, grain)
+
+    fid = pricing_data.financial_inst_id_col
+    trade_date = pl.col(pricing_data.trade_date_col)
+    bars = pricing_data.get_bars().lazy()
+    sessions = sessions.lazy().collect()
+    # Instruments are listed between their first and last trade dates over the whole history,
+    # not just within a chunk.
+    listings = _listings(pricing_data, bars).collect()
+    trade_dates = sessions["trade_date"].sort()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if trade_dates.is_empty():
+        grid = _grid(
+            pricing_data, bars.clear(), sessions.lazy(), grain, listings.lazy()
+        )
+        empty = _align(pricing_data, bars.clear(), grid, fill, None).collect()
+        empty.write_parquet(output_dir / "part-00000.parquet")
+    carry = None
+    for chunk_index, offset in enumerate(
+        range(0, trade_dates.len(), trade_dates_per_chunk)
+    ):
+        chunk_dates = trade_dates.slice(offset, trade_dates_per_chunk)
+        chunk_sessions = sessions.lazy().filter(
+            pl.col("trade_date").is_between(chunk_dates.first(), chunk_dates.last())
+        )
+        chunk_bars = bars.filter(
+            trade_date.is_between(chunk_dates.first(), chunk_dates.last())
+        )
+        grid = _grid(pricing_data, chunk_bars, chunk_sessions, grain, listings.lazy())
+        aligned = _align(pricing_data, chunk_bars, grid, fill, carry).collect(
+            engine="streaming"
+        )
+        aligned.write_parquet(output_dir / f"part-{chunk_index:05d}.parquet")
+        # Every listed instrument is on the grid of every chunk, and its gaps are already
+        # filled from the previous carry, so the last values of the chunk carry everything.
+        carry = aligned.group_by(fid).agg(
+            pl.col(pricing_data.close_col).drop_nulls().last().alias("_carry_close"),
+            pl.col(pricing_data.symbol_col).drop_nulls().last().alias("_carry_symbol"),
+        )
+    return pl.scan_parquet(output_dir / "*.parquet")
+
+
+def _listings(pricing_data: PricingData, bars: pl.LazyFrame) -> pl.LazyFrame:
+    """First and last trade date of every instrument."""
+    trade_date = pl.col(pricing_data.trade_date_col)
+    return bars.group_by(pricing_data.financial_inst_id_col).agg(
+        trade_date.min().alias("_first_trade_date"),
+        trade_date.max().alias("_last_trade_date"),
+    )
+
+
+def _grid(
+    pricing_data: PricingData,
+    bars: pl.LazyFrame,
+    sessions: pl.LazyFrame | pl.DataFrame,
+    grain: timedelta,
+    listings: pl.LazyFrame | None = None,
+) -> pl.LazyFrame:
+    """Expected bars of every listed instrument, with ``_slot`` numbering the bars of the calendar."""
+    trade_date = pricing_data.trade_date_col
+    timestamp = pricing_data.timestamp_col
+    session_bars = (
+        sessions.lazy()
+        .select(
+            pl.col("trade_date").alias(trade_date),
+            pl.datetime_ranges(
+                pl.col("session_open").cast(pl.Datetime("ns")) + grain,
+                pl.col("session_close").cast(pl.Datetime("ns")),
+                interval=grain,
+                time_unit="ns",
+            ).alias(timestamp),
+        )
+        .explode(timestamp)
+        .drop_nulls(timestamp)
+        .sort(timestamp)
+        # Slots are consecutive within a session and jump between sessions, so runs of
+        # missing bars never span a session break.
+        .with_columns(
+            (pl.int_range(pl.len()) + pl.col(trade_date).rank("dense")).alias("_slot")
+        )
+    )
+    listings = _listings(pricing_data, bars) if listings is None else listings
+    return (
+        session_bars.join(listings, how="cross")
+        .filter(
+            pl.col(trade_date).is_between(
+                pl.col("_first_trade_date"), pl.col("_last_trade_date")
+            )
+        )
+        .select(trade_date, timestamp, pricing_data.financial_inst_id_col, "_slot")
+    )
+
+
+def _align(
+    pricing_data: PricingData,
+    bars: pl.LazyFrame,
+    grid: pl.LazyFrame,
+    fill: str,
+    carry: pl.DataFrame | None = None,
+) -> pl.LazyFrame:
+    """Left join the bars onto the grid and fill the missing bars."""
+    fid = pricing_data.financial_inst_id_col
+    keys = [pricing_data.trade_date_col, pricing_data.timestamp_col, fid]
+    close = pl.col(pricing_data.close_col)
+    symbol = pl.col(pricing_data.symbol_col)
+    is_gap = pl.col("is_gap")
+
+    aligned = (
+        grid.join(bars.with_columns(pl.lit(False).alias("is_gap")), on=keys, how="left")
+        .with_columns(is_gap.fill_null(True))
+        .sort(fid, pricing_data.timestamp_col)
+    )
+    last_close = close.forward_fill()
+    last_symbol = symbol.forward_fill()
+    if carry is not None:
+        aligned = aligned.join(carry.lazy(), on=fid, how="left")
+        last_close = last_close.fill_null(pl.col("_carry_close"))
+        last_symbol = last_symbol.fill_null(pl.col("_carry_symbol"))
+    last_close = last_close.over(fid)
+    # The symbol identifies the instrument, so it is filled in both directions whatever the fill.
+    aligned = aligned.with_columns(
+        last_symbol.fill_null(symbol.backward_fill())
+        .over(fid)
+        .alias(pricing_data.symbol_col)
+    )
+    if fill == "forward":
+        aligned = aligned.with_columns(
+            *[
+                pl.when(is_gap).then(last_close).otherwise(pl.col(column)).alias(column)
+                for column in (
+                    pricing_data.open_col,
+                    pricing_data.high_col,
+                    pricing_data.low_col,
+                    pricing_data.close_col,
+                )
+            ],
+            pl.when(is_gap)
+            .then(0)
+            .otherwise(pl.col(pricing_data.volume_col))
+            .alias(pricing_data.volume_col),
+        )
+    return aligned.select(
+        *keys,
+        pricing_data.symbol_col,
+        pricing_data.open_col,
+        pricing_data.high_col,
+        pricing_data.low_col,
+        pricing_data.close_col,
+        pricing_data.volume_col,
+        "is_gap",
+    ).sort(keys)
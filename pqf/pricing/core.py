@@ -1,12 +1,34 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Literal
+
 import pandas as pd
 import polars as pl
 
-from pqf.pricing.utils import estimate_time_grain
+from pqf.pricing.utils import (
+    TimeGrain,
+    frequency_nests,
+    infer_time_grain,
+    parquet_time_grain,
+    parse_frequency,
+    require_empty_directory,
+)
+
+# Number of bars read to check a time grain taken from parquet metadata.
+_GRAIN_CHECK_SAMPLE_SIZE = 1_000
 
 
 class PricingData:
     """PricingData provides a structured interface for handling and aggregating pricing bar data using Polars DataFrames.
 
+    With ``compact=True`` the symbol column is held as a ``pl.Categorical``, whose strings are
+    stored once in Polars' process-wide dictionary of categories, and the financial instrument
+    ID as a ``pl.UInt32``; ``volume_dtype`` narrows the volume column, e.g. to ``pl.Float32`` or
+    ``pl.UInt64``. The casts are strict, so an ID outside the ``UInt32`` range raises (on collect
+    for lazy data) rather than wraps.
+
     Attributes:
         trade_date_col (str): Column name for trade date.
         timestamp_col (str): Column name for timestamp.
@@ -17,14 +39,30 @@ class PricingData:
         volume_col (str): Column name for volume.
         financial_inst_id_col (str): Column name for financial instrument ID.
         output_schema (pl.Schema): Schema used to validate and cast the input data.
+        compact (bool): Whether the symbol and financial instrument ID columns use the compact
+            ``pl.Categorical`` and ``pl.UInt32`` types rather than ``pl.Utf8`` and ``pl.Int64``.
         data (pl.DataFrame | pl.LazyFrame): The processed pricing data.
-        time_grain (str): Estimated time grain of the data.
+        time_grain (timedelta): Estimated time grain of the data, computed on first access.
+        time_grain_estimate (TimeGrain): The time grain with its confidence, per-instrument grains
+            and irregularity flag.
+        time_grain_sample_size (int): Number of bars sampled when estimating the time grain.
+        sort_cache_bytes (int): Memory budget for cached alternative orderings of eager data.
+        source (str | Path | Sequence[str | Path] | None): Parquet store the bars were scanned from
+            by ``from_parquet``, used to fingerprint the data for ``pqf.cache``. None otherwise.
 
     Methods:
+        from_parquet(source, fids, start, end) -> PricingData:
+            Builds PricingData from a (hive-partitioned) parquet store, pruning by fid and trade date.
         get_bars() -> pl.DataFrame | pl.LazyFrame:
             Returns the processed pricing bars data.
+        get_bars_by_instrument() -> pl.DataFrame | pl.LazyFrame:
+            Returns the pricing bars ordered by financial instrument ID and timestamp.
         get_aggregated_bars(freq: str) -> pl.DataFrame | pl.LazyFrame:
             Returns the pricing bars data aggregated to the specified frequency.
+        get_aggregated_bars_multi(freqs: Sequence[str]) -> dict[str, pl.DataFrame | pl.LazyFrame]:
+            Returns the pricing bars aggregated to several frequencies, cascading coarse from fine.
+        sink_aggregated_bars(freq: str, path: str | Path) -> pl.LazyFrame:
+            Aggregates the bars in trade-date chunks with bounded memory and writes them to parquet.
     Raises:
         Any exceptions raised by Polars during schema matching or data processing."""
 
@@ -41,7 +79,10 @@ class PricingData:
         low_col: str = "low",
         close_col: str = "close",
         volume_col: str = "volume",
-
+        time_grain_sample_size: int = 100_000,
+        sort_cache_bytes: int = 1024**3,
+        compact: bool = False,
+        volume_dtype: pl.DataType | type[pl.DataType] = pl.Float64,
     ):
         self.symbol_col = symbol_col
         self.trade_date_col = trade_date_col
@@ -52,35 +93,253 @@ class PricingData:
         self.close_col = close_col
         self.volume_col = volume_col
         self.financial_inst_id_col = financial_inst_id_col
+        self.time_grain_sample_size = time_grain_sample_size
+        self.sort_cache_bytes = sort_cache_bytes
+        self.source: str | Path | Sequence[str | Path] | None = None
 
-        self.output_schema = pl.Schema({
-            self.trade_date_col: pl.Date,
-            self.timestamp_col: pl.Datetime(time_unit="ns"),
-            self.financial_inst_id_col: pl.Int64,
-            self.symbol_col: pl.Utf8,
-            self.open_col: pl.Float64,
-            self.high_col: pl.Float64,
-            self.low_col: pl.Float64,
-            self.close_col: pl.Float64,
-            self.volume_col: pl.Float64,
-        })
-
-        if lazy:
-            self.data = data_source.lazy().match_to_schema(self.output_schema)
-        else:
-            self.data = data_source.match_to_schema(self.output_schema)
+        # Cross-sectional ordering used for storage, and per-instrument ordering used for
+        # windowed operations such as forward returns.
+        self._time_order = (
+            self.trade_date_col,
+            self.timestamp_col,
+            self.financial_inst_id_col,
+        )
+        self._instrument_order = (self.financial_inst_id_col, self.timestamp_col)
+
+        self.compact = compact
+        self.output_schema = pl.Schema(
+            {
+                self.trade_date_col: pl.Date,
+                self.timestamp_col: pl.Datetime(time_unit="ns"),
+                self.financial_inst_id_col: pl.UInt32 if compact else pl.Int64,
+                self.symbol_col: pl.Categorical() if compact else pl.Utf8,
+                self.open_col: pl.Float64,
+                self.high_col: pl.Float64,
+                self.low_col: pl.Float64,
+                self.close_col: pl.Float64,
+                self.volume_col: volume_dtype,
+            }
+        )
+
+        # Only the columns whose type was chosen are cast; everything else must already match.
+        cast_columns = [self.financial_inst_id_col, self.symbol_col] if compact else []
+        if volume_dtype != pl.Float64:
+            cast_columns.append(self.volume_col)
+        data = data_source.lazy() if lazy else data_source
+        if cast_columns:
+            data = data.with_columns(
+                pl.col(name).cast(self.output_schema[name]) for name in cast_columns
+            )
+        self.data = data.match_to_schema(self.output_schema)
 
-        self.time_grain = estimate_time_grain(
-            self.data.select(self.timestamp_col).lazy().collect().to_series())
-        self._sorted = False
         self._ensure_sort()
 
+    @property
+    def data(self) -> pl.DataFrame | pl.LazyFrame:
+        """The processed pricing data."""
+        return self._data
+
+    @data.setter
+    def data(self, data: pl.DataFrame | pl.LazyFrame):
+        """Replace the pricing data, invalidating the sort state and everything derived from it."""
+        self._data = data
+        self._sort_keys: tuple[str, ...] | None = None
+        self._sort_cache: OrderedDict[tuple[str, ...], pl.DataFrame] = OrderedDict()
+        # Keep the unsorted plan around so the time grain sample is a cheap head of the
+        # source rather than a head of the full sort.
+        self._unsorted_data = data if isinstance(data, pl.LazyFrame) else None
+        self._time_grain: timedelta | None = None
+        self._time_grain_estimate: TimeGrain | None = None
+
+    @property
+    def time_grain(self) -> timedelta:
+        """Estimated time grain of the bars.
+
+        The estimate is computed on first access and cached afterwards, so constructing
+        PricingData never scans the timestamp column (see ``time_grain_estimate``).
+
+        Returns:
+            timedelta: The estimated time grain.
+        """
+        if self._time_grain is None:
+            self._time_grain = self.time_grain_estimate.grain
+        return self._time_grain
+
+    @property
+    def time_grain_estimate(self) -> TimeGrain:
+        """Estimated time grain of the bars with its confidence and per-instrument grains.
+
+        For data scanned by ``from_parquet`` the grain is first read from the parquet metadata,
+        which needs no data at all, and kept only if the first ``_GRAIN_CHECK_SAMPLE_SIZE`` bars
+        agree with it, as the metadata overstates the grain of sessions with gaps. Otherwise it
+        is inferred from the per-instrument runs of the first ``time_grain_sample_size`` bars of
+        the source, a cheap head of the source rather than of the full sort.
+
+        Returns:
+            TimeGrain: The grain, its confidence, per-instrument grains and irregularity flag.
+        """
+        if self._time_grain_estimate is None:
+            source = (
+                self._unsorted_data
+                if self._unsorted_data is not None
+                else self.data.lazy()
+            )
+            estimate = None
+            if self.source is not None:
+                try:
+                    estimate = parquet_time_grain(
+                        self.source,
+                        self.timestamp_col,
+                        self.financial_inst_id_col,
+                        self.trade_date_col,
+                    )
+                except ImportError:
+                    estimate = None
+            if estimate is not None and not estimate.irregular:
+                check = infer_time_grain(
+                    source,
+                    self.timestamp_col,
+                    self.financial_inst_id_col,
+                    sample_size=min(
+                        self.time_grain_sample_size, _GRAIN_CHECK_SAMPLE_SIZE
+                    ),
+                )
+                if check.grain != estimate.grain:
+                    estimate = None
+            if estimate is None or estimate.irregular:
+                estimate = infer_time_grain(
+                    source,
+                    self.timestamp_col,
+                    self.financial_inst_id_col,
+                    sample_size=self.time_grain_sample_size,
+                )
+            self._time_grain_estimate = estimate
+        return self._time_grain_estimate
+
+    @classmethod
+    def from_parquet(
+        cls,
+        source: str | Path | Sequence[str | Path],
+        fids: Sequence[int] | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        hive_partitioning: bool | None = None,
+        lazy: bool = True,
+        trade_date_col: str = "trade_date",
+        timestamp_col: str = "end_dtutc",
+        financial_inst_id_col: str = "fid",
+        symbol_col: str = "symbol",
+        open_col: str = "open",
+        high_col: str = "high",
+        low_col: str = "low",
+        close_col: str = "close",
+        volume_col: str = "volume",
+        **kwargs: Any,
+    ) -> "PricingData":
+        """Build PricingData from a parquet store, pruning instruments and trade dates in the scan.
+
+        The store may be a single file, a directory, a glob or a list of files. Hive-partitioned
+        layouts such as ``root/trade_date=2025-01-01/fid=1/0.parquet`` are detected automatically,
+        in which case the fid and trade date filters prune whole partitions before any file is
+        opened. Only the columns of the output schema are read.
+
+        Args:
+            source (str | Path | Sequence[str | Path]): Path, directory or glob of the parquet store.
+            fids (Sequence[int] | None): Financial instrument IDs to load. Defaults to all instruments.
+            start (date | None): First trade date to load (inclusive). Defaults to the start of the store.
+            end (date | None): Last trade date to load (inclusive). Defaults to the end of the store.
+            hive_partitioning (bool | None): Whether to parse hive partitions from the paths. Defaults to
+                auto-detection.
+            lazy (bool): Whether to keep the data as a LazyFrame. Defaults to True.
+            **kwargs: Additional keyword arguments passed to the constructor.
+
+        Returns:
+            PricingData: The pricing data restricted to the requested instruments and dates.
+        """
+        if isinstance(source, (str, Path)):
+            scan_source = str(source)
+        else:
+            scan_source = [str(path) for path in source]
+
+        scan = pl.scan_parquet(scan_source, hive_partitioning=hive_partitioning)
+
+        predicates = []
+        if fids is not None:
+            predicates.append(pl.col(financial_inst_id_col).is_in(list(fids)))
+        if start is not None:
+            predicates.append(pl.col(trade_date_col) >= start)
+        if end is not None:
+            predicates.append(pl.col(trade_date_col) <= end)
+        if predicates:
+            scan = scan.filter(*predicates)
+
+        scan = scan.select(
+            trade_date_col,
+            timestamp_col,
+            financial_inst_id_col,
+            symbol_col,
+            open_col,
+            high_col,
+            low_col,
+            close_col,
+            volume_col,
+        )
+        pricing_data = cls(
+            scan if lazy else scan.collect(),
+            lazy=lazy,
+            trade_date_col=trade_date_col,
+            timestamp_col=timestamp_col,
+            financial_inst_id_col=financial_inst_id_col,
+            symbol_col=symbol_col,
+            open_col=open_col,
+            high_col=high_col,
+            low_col=low_col,
+            close_col=close_col,
+            volume_col=volume_col,
+            **kwargs,
+        )
+        pricing_data.source = source
+        return pricing_data
+
     def _ensure_sort(self):
         """Ensure the data is sorted by trade date, timestamp, and financial instrument ID."""
-        if not self._sorted:
-            self.data = self.data.sort(
-                [self.trade_date_col, self.timestamp_col, self.financial_inst_id_col])
-        self._sorted = True
+        if self._sort_keys != self._time_order:
+            self._data = self._sort(self._data, self._time_order)
+            self._sort_keys = self._time_order
+
+    def _sort(
+        self, data: pl.DataFrame | pl.LazyFrame, keys: tuple[str, ...]
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """Sort the data by the given keys and flag the leading key as sorted."""
+        return data.sort(list(keys)).with_columns(pl.col(keys[0]).set_sorted())
+
+    def _sorted_by(self, keys: tuple[str, ...]) -> pl.DataFrame | pl.LazyFrame:
+        """Get the data sorted by the given keys, reusing cached orderings of eager data.
+
+        Alternative orderings of eager data are kept in a least-recently-used cache bounded by
+        ``sort_cache_bytes``, so repeated calls only pay for the sort once. Lazy data is sorted
+        in the query plan and not cached.
+        """
+        if keys == self._sort_keys:
+            return self._data
+
+        cached = self._sort_cache.get(keys)
+        if cached is not None:
+            self._sort_cache.move_to_end(keys)
+            return cached
+
+        sorted_data = self._sort(self._data, keys)
+        if (
+            isinstance(sorted_data, pl.DataFrame)
+            and sorted_data.estimated_size() <= self.sort_cache_bytes
+        ):
+            self._sort_cache[keys] = sorted_data
+            while (
+                sum(frame.estimated_size() for frame in self._sort_cache.values())
+                > self.sort_cache_bytes
+            ):
+                self._sort_cache.popitem(last=False)
+        return sorted_data
 
     def get_bars(self) -> pl.DataFrame | pl.LazyFrame:
         """Get the pricing bars data.
@@ -90,6 +349,17 @@ class PricingData:
         """
         return self.data
 
+    def get_bars_by_instrument(self) -> pl.DataFrame | pl.LazyFrame:
+        """Get the pricing bars ordered by financial instrument ID and timestamp.
+
+        This ordering keeps each instrument's bars contiguous, which is what per-instrument
+        windowed computations need. The ordering is cached for eager data.
+
+        Returns:
+            pl.DataFrame | pl.LazyFrame: The pricing bars data sorted by instrument and timestamp.
+        """
+        return self._sorted_by(self._instrument_order)
+
     def get_aggregated_bars(
         self,
         freq: str
@@ -101,57 +371,238 @@ class PricingData:
 
 
         Returns:
-            pl.DataFrame | pl.LazyFrame: The aggregated pricing bars data.
+            pl.DataFrame | pl.LazyFrame: The aggregated pricing bars data, lazy if the bars are lazy.
         """
+        self._ensure_sort()
+        return self._aggregate(self.data, freq)
 
-        if isinstance(self.data, pl.LazyFrame):
-            df = self.data.collect()
-        else:
-            df = self.data
-        df_out = df.sort(
-            [self.trade_date_col, self.timestamp_col, self.financial_inst_id_col]).group_by_dynamic(
-            index_column=self.timestamp_col,
-            group_by=[self.financial_inst_id_col, self.trade_date_col],
-            closed="left",
-            label="left",
-            every=freq,
-        ).agg([
-            pl.col(self.open_col).first().alias(self.open_col),
-            pl.col(self.high_col).max().alias(self.high_col),
-            pl.col(self.low_col).min().alias(self.low_col),
-            pl.col(self.close_col).last().alias(self.close_col),
-            pl.col(self.volume_col).sum().alias(self.volume_col)
-        ])
-        return df_out
+    def get_aggregated_bars_multi(
+        self,
+        freqs: Sequence[str],
+    ) -> dict[str, pl.DataFrame | pl.LazyFrame]:
+        """Get aggregated pricing bars for several frequencies in one pass.
+
+        Frequencies are computed from finest to coarsest and each one is cascaded from the
+        coarsest already-computed frequency whose windows nest inside it (e.g. '1h' from '15m',
+        '1d' from '1h'), so only the finest frequency touches the raw bars. Frequencies that do
+        not nest in any finer one are aggregated from the raw bars.
+
+        When the bars are lazy the returned LazyFrames share cached sub-plans; collect them
+        together with ``pl.collect_all`` so the shared aggregations are only computed once.
+
+        Args:
+            freqs (Sequence[str]): The frequencies to aggregate to (e.g., ['5m', '15m', '1h', '1d']).
+
+        Returns:
+            dict[str, pl.DataFrame | pl.LazyFrame]: The aggregated bars keyed by frequency, in the
+                order the frequencies were requested.
+        """
+        self._ensure_sort()
+        ordered = sorted(
+            dict.fromkeys(freqs),
+            key=lambda freq: parse_frequency(freq).approximate_nanoseconds,
+        )
+
+        aggregated: dict[str, pl.DataFrame | pl.LazyFrame] = {}
+        for freq in ordered:
+            source_freq = next(
+                (
+                    finer
+                    for finer in reversed(aggregated)
+                    if frequency_nests(finer, freq)
+                ),
+                None,
+            )
+            source = self.data if source_freq is None else aggregated[source_freq]
+            bars = self._aggregate(source, freq)
+            # Cache lazy results so coarser frequencies reuse them instead of re-running the chain.
+            aggregated[freq] = bars.cache() if isinstance(bars, pl.LazyFrame) else bars
+        return {freq: aggregated[freq] for freq in freqs}
+
+    def sink_aggregated_bars(
+        self,
+        freq: str,
+        path: str | Path,
+        trade_dates_per_chunk: int = 20,
+    ) -> pl.LazyFrame:
+        """Aggregate the pricing bars chunk by chunk of trade dates and sink the result to parquet.
+
+        Bars never cross a trade date, so each chunk of trade dates is aggregated independently
+        under the streaming engine and written to its own ``part-XXXXX.parquet`` file. Peak memory
+        is bounded by the size of one chunk instead of the whole history. ``path`` must be empty
+        or not exist yet, so that no part of an earlier run is mixed into the result; without any
+        bars, a single empty part with the output schema is written.
+
+        Args:
+            freq (str): The frequency to aggregate to (e.g., '1h', '1d').
+            path (str | Path): Empty directory to write the aggregated parquet files to.
+            trade_dates_per_chunk (int): Number of trade dates aggregated per chunk. Defaults to 20.
+
+        Raises:
+            ValueError: If trade_dates_per_chunk is not positive or path is not empty.
+
+        Returns:
+            pl.LazyFrame: A scan over the written aggregated bars.
+        """
+        if trade_dates_per_chunk < 1:
+            raise ValueError("trade_dates_per_chunk must be a positive integer.")
+
+        source = (
+            self._unsorted_data if self._unsorted_data is not None else self.data.lazy()
+        )
+        trade_dates = (
+            source.select(pl.col(self.trade_date_col).unique())
+            .collect(engine="streaming")
+            .to_series()
+            .sort()
+        )
+
+        output_dir = Path(path)
+        require_empty_directory(output_dir, "path")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if trade_dates.is_empty():
+            self._aggregate(source.clear(), freq).lazy().sink_parquet(
+                output_dir / "part-00000.parquet"
+            )
+        for chunk_index, offset in enumerate(
+            range(0, trade_dates.len(), trade_dates_per_chunk)
+        ):
+            chunk_dates = trade_dates.slice(offset, trade_dates_per_chunk)
+            chunk = source.filter(
+                pl.col(self.trade_date_col).is_between(
+                    chunk_dates.first(), chunk_dates.last()
+                )
+            ).sort(
+                [self.trade_date_col, self.timestamp_col, self.financial_inst_id_col]
+            )
+            self._aggregate(chunk, freq).lazy().sink_parquet(
+                output_dir / f"part-{chunk_index:05d}.parquet", engine="streaming"
+            )
+        return pl.scan_parquet(output_dir / "*.parquet")
+
+    def _aggregate(
+        self, bars: pl.DataFrame | pl.LazyFrame, freq: str
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """Aggregate bars sorted by trade date and timestamp into bars of the given frequency.
+
+        Uses a plain group by on the truncated timestamp rather than ``group_by_dynamic`` so the
+        plan can run under the streaming engine. Windows are left-closed and left-labelled.
+        """
+        return bars.group_by(
+            self.financial_inst_id_col,
+            self.trade_date_col,
+            pl.col(self.timestamp_col).dt.truncate(freq),
+            maintain_order=True,
+        ).agg(
+            [
+                pl.col(self.open_col).first().alias(self.open_col),
+                pl.col(self.high_col).max().alias(self.high_col),
+                pl.col(self.low_col).min().alias(self.low_col),
+                pl.col(self.close_col).last().alias(self.close_col),
+                pl.col(self.volume_col).sum().alias(self.volume_col),
+            ]
+        )
 
     def get_forward_returns(
         self,
-        periods: list[int],
+        periods: Sequence[int | str],
         log: bool = True,
+        layout: Literal["wide", "long"] = "wide",
     ) -> pl.DataFrame | pl.LazyFrame:
         """Calculate forward returns for each financial instrument.
 
         Expected output takes the form of
             trade_date_col | timestamp_col | financial_inst_id_col | forward_return_1 | forward_return_5 | ...
 
+        or, with ``layout="long"``,
+            trade_date_col | timestamp_col | financial_inst_id_col | horizon | return
+
+        Rows are ordered by financial instrument ID and timestamp. Every horizon is a difference
+        of the same per-instrument log price (the running sum of log returns), so adding horizons
+        only adds a shift and a subtraction rather than another windowed pass. Integer periods are
+        counted in bars. Duration strings such as '30m' are wall-clock horizons, matched with an
+        as-of join to the last bar at or before ``timestamp + horizon``; they are null when that
+        time is past the instrument's last bar.
+
         Args:
-            periods (list[int]): List of periods to calculate forward returns for.
+            periods (Sequence[int | str]): Bar counts and/or durations to calculate forward returns for.
             log (bool): Whether to calculate log returns. Defaults to True.
+            layout (Literal["wide", "long"]): One column per horizon, or one row per bar and horizon.
+                Defaults to "wide".
 
         Returns:
             pl.DataFrame | pl.LazyFrame: DataFrame containing forward returns.
         """
-        self._ensure_sort()
-        df = self.data
-
-        forward_return_exprs = [
-            (
-                (pl.col(self.close_col).pct_change(n=period).shift(-period).add(1).log()
-                 if log else
-                 pl.col(self.close_col).pct_change(n=period).shift(-period))
-                .alias(f"forward_return_{period}")
-                .over(self.financial_inst_id_col)
-            )
+        if layout not in ("wide", "long"):
+            raise ValueError(f"layout must be 'wide' or 'long', got {layout!r}.")
+
+        key_columns = [
+            self.trade_date_col,
+            self.timestamp_col,
+            self.financial_inst_id_col,
+        ]
+        fid = pl.col(self.financial_inst_id_col)
+        timestamp = pl.col(self.timestamp_col)
+        log_price = pl.col("_log_price")
+
+        df = self.get_bars_by_instrument().select(
+            *key_columns, pl.col(self.close_col).log().alias("_log_price")
+        )
+
+        bar_horizon_exprs = [
+            pl.when(fid.shift(-period) == fid)
+            .then(log_price.shift(-period) - log_price)
+            .alias(f"forward_return_{period}")
             for period in periods
+            if not isinstance(period, str)
         ]
-        return df.select([self.trade_date_col, self.timestamp_col, self.financial_inst_id_col] + forward_return_exprs)
+        if bar_horizon_exprs:
+            df = df.with_columns(bar_horizon_exprs)
+
+        clock_periods = [period for period in periods if isinstance(period, str)]
+        if clock_periods:
+            df = df.with_columns(timestamp.max().over(fid).alias("_last_timestamp"))
+        for period in clock_periods:
+            # The join is planned lazily so that both sides share a frame type.
+            bars = df.lazy()
+            future = bars.select(
+                fid,
+                timestamp.alias("_future_timestamp"),
+                log_price.alias("_future_log_price"),
+            )
+            joined = (
+                bars.with_columns(
+                    timestamp.dt.offset_by(period).alias("_future_timestamp")
+                )
+                .join_asof(
+                    future,
+                    on="_future_timestamp",
+                    by=self.financial_inst_id_col,
+                    strategy="backward",
+                    check_sortedness=False,
+                )
+                .with_columns(
+                    pl.when(pl.col("_future_timestamp") <= pl.col("_last_timestamp"))
+                    .then(pl.col("_future_log_price") - log_price)
+                    .alias(f"forward_return_{period}")
+                )
+                .drop("_future_timestamp", "_future_log_price")
+            )
+            df = joined.collect() if isinstance(df, pl.DataFrame) else joined
+
+        return_columns = [f"forward_return_{period}" for period in periods]
+        df = df.select(
+            *key_columns,
+            *[
+                pl.col(name) if log else pl.col(name).exp() - 1
+                for name in return_columns
+            ],
+        )
+        if layout == "long":
+            df = df.unpivot(
+                on=return_columns,
+                index=key_columns,
+                variable_name="horizon",
+                value_name="return",
+            ).with_columns(pl.col("horizon").str.strip_prefix("forward_return_"))
+        return df
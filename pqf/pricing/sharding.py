@@ -0,0 +1,233 @@
+import multiprocessing
+import tempfile
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numba
+import polars as pl
+
+from pqf.pricing.core import PricingData
+from pqf.pricing.utils import require_empty_directory
+
+Pipeline = Callable[[PricingData], pl.DataFrame | pl.LazyFrame]
+
+
+def write_shards(
+    pricing_data: PricingData,
+    path: str | Path,
+    shards: int,
+    seed: int = 0,
+    trade_dates_per_chunk: int = 20,
+) -> list[Path]:
+    """Partition the bars into shards of instruments on disk.
+
+    Every instrument is assigned to shard ``hash(financial_inst_id_col, seed) % shards``, so all
+    bars of an instrument land in the same shard. Lazy bars are read chunk by chunk of trade
+    dates, as in ``PricingData.sink_aggregated_bars``, and every chunk is split into its shards
+    in one pass, so peak memory is bounded by one chunk:
+        path/shard-00000/part-00000.parquet, path/shard-00000/part-00001.parquet, ...
+
+    The assignment is deterministic for a given seed, Polars version and instrument ID type.
+    ``path`` must be empty or not exist yet, so that no stale shard is mixed into the new ones.
+
+    Args:
+        pricing_data (PricingData): The bars to partition.
+        path (str | Path): Directory to write the shards to.
+        shards (int): Number of shards.
+        seed (int, optional): Seed of the instrument ID hash. Defaults to 0.
+        trade_dates_per_chunk (int, optional): Number of trade dates read per chunk of lazy
+            bars. Defaults to 20.
+
+    Raises:
+        ValueError: If shards or trade_dates_per_chunk is not positive, or path is not empty.
+
+    Returns:
+        list[Path]: The directories of the shards holding bars, in shard order.
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be at least 1, got {shards}.")
+    if trade_dates_per_chunk < 1:
+        raise ValueError("trade_dates_per_chunk must be a positive integer.")
+    output_dir = Path(path)
+    require_empty_directory(output_dir, "path")
+
+    shard = (pl.col(pricing_data.financial_inst_id_col).hash(seed) % shards).alias(
+        "_shard"
+    )
+    shard_dirs = {}
+    for chunk_index, chunk in enumerate(_chunks(pricing_data, trade_dates_per_chunk)):
+        for (shard_index,), shard_bars in (
+            chunk.with_columns(shard)
+            .partition_by("_shard", as_dict=True, include_key=False)
+            .items()
+        ):
+            shard_dir = shard_dirs.setdefault(
+                shard_index, output_dir / f"shard-{shard_index:05d}"
+            )
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            shard_bars.write_parquet(shard_dir / f"part-{chunk_index:05d}.parquet")
+    return [shard_dirs[shard_index] for shard_index in sorted(shard_dirs)]
+
+
+def run_sharded(
+    pricing_data: PricingData,
+    pipeline: Pipeline,
+    shards: int | None = None,
+    processes: int = 1,
+    output: str | Path | None = None,
+    sort_by: Sequence[str] | None = None,
+    seed: int = 0,
+    shard_path: str | Path | None = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Run a per-instrument pipeline on shards of the bars in a pool of worker processes.
+
+    The bars are partitioned into shards of instruments on disk (see ``write_shards``), and
+    every worker loads one shard at a time as eager PricingData with the same columns and
+    schema and applies ``pipeline`` to it. The pipeline must only combine bars of the same
+    instrument, e.g. forward returns, indicators or aggregated bars, and must be picklable,
+    e.g. a module-level function or ``operator.methodcaller("get_forward_returns", [1, 5])``.
+
+    The results are concatenated in shard order, so the output does not depend on the number
+    of processes or on the order the workers finish in. With ``output``, every worker writes
+    its result to ``output/part-XXXXX.parquet`` instead of sending it back, and the results
+    are returned as a scan over the written files. Without any bars, the pipeline runs once on
+    an empty shard, so the result is empty but has the pipeline's schema.
+
+    Each worker keeps Numba to a single thread; set ``POLARS_MAX_THREADS`` to bound the Polars
+    thread pool of the workers as well.
+
+    Example:
+        >>> run_sharded(
+        ...     pricing_data,
+        ...     operator.methodcaller("get_forward_returns", [1, 5, 30]),
+        ...     shards=32,
+        ...     processes=8,
+        ...     sort_by=["end_dtutc", "fid"],
+        ... )
+
+    Args:
+        pricing_data (PricingData): The bars to process.
+        pipeline (Callable[[PricingData], pl.DataFrame | pl.LazyFrame]): The computation applied
+            to the PricingData of every shard.
+        shards (int | None, optional): Number of shards. Defaults to the number of processes.
+        processes (int, optional): Number of worker processes. Defaults to 1, which runs every
+            shard in the calling process.
+        output (str | Path | None, optional): Empty directory to write the results to. Defaults
+            to returning them in memory.
+        sort_by (Sequence[str] | None, optional): Columns to sort the concatenated results by.
+            Defaults to shard order.
+        seed (int, optional): Seed of the instrument ID hash. Defaults to 0.
+        shard_path (str | Path | None, optional): Empty directory to write the shards to, which
+            is kept afterwards. Defaults to a temporary directory.
+
+    Raises:
+        ValueError: If shards or processes is not positive, or output or shard_path is not
+            empty.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: The concatenated results, or a scan over them with
+            ``output``.
+    """
+    if processes < 1:
+        raise ValueError(f"processes must be at least 1, got {processes}.")
+    shards = processes if shards is None else shards
+    output_dir = None if output is None else Path(output)
+    if output_dir is not None:
+        require_empty_directory(output_dir, "output")
+
+    with tempfile.TemporaryDirectory() as temporary:
+        shard_dirs = write_shards(pricing_data, shard_path or temporary, shards, seed)
+        if not shard_dirs:
+            empty_dir = Path(shard_path or temporary) / "shard-00000"
+            empty_dir.mkdir(parents=True, exist_ok=True)
+            empty_bars = pricing_data.get_bars().lazy().clear().collect()
+            empty_bars.write_parquet(empty_dir / "part-00000.parquet")
+            shard_dirs = [empty_dir]
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        tasks = [
+            (
+                str(shard_dir),
+                pipeline,
+                _options(pricing_data),
+                None
+                if output_dir is None
+                else str(output_dir / f"part-{shard_index:05d}.parquet"),
+            )
+            for shard_index, shard_dir in enumerate(shard_dirs)
+        ]
+        if processes == 1 or len(tasks) < 2:
+            results = [_run_shard(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+            ) as pool:
+                results = list(pool.map(_run_shard, *zip(*tasks, strict=True)))
+
+    if output_dir is not None:
+        scan = pl.scan_parquet(output_dir / "*.parquet")
+        return scan if sort_by is None else scan.sort(list(sort_by))
+    combined = pl.concat([result for result in results if result is not None])
+    return combined if sort_by is None else combined.sort(list(sort_by))
+
+
+def _chunks(
+    pricing_data: PricingData, trade_dates_per_chunk: int
+) -> Iterator[pl.DataFrame]:
+    """The bars in chunks of trade dates, or all at once if they are already in memory."""
+    bars = pricing_data.get_bars()
+    if isinstance(bars, pl.DataFrame):
+        yield bars
+        return
+    trade_date = pl.col(pricing_data.trade_date_col)
+    trade_dates = (
+        bars.select(trade_date.unique()).collect(engine="streaming").to_series().sort()
+    )
+    for offset in range(0, trade_dates.len(), trade_dates_per_chunk):
+        chunk_dates = trade_dates.slice(offset, trade_dates_per_chunk)
+        yield bars.filter(
+            trade_date.is_between(chunk_dates.first(), chunk_dates.last())
+        ).collect(engine="streaming")
+
+
+def _options(pricing_data: PricingData) -> dict[str, Any]:
+    """Constructor arguments reproducing the columns and schema of the PricingData."""
+    return {
+        "trade_date_col": pricing_data.trade_date_col,
+        "timestamp_col": pricing_data.timestamp_col,
+        "financial_inst_id_col": pricing_data.financial_inst_id_col,
+        "symbol_col": pricing_data.symbol_col,
+        "open_col": pricing_data.open_col,
+        "high_col": pricing_data.high_col,
+        "low_col": pricing_data.low_col,
+        "close_col": pricing_data.close_col,
+        "volume_col": pricing_data.volume_col,
+        "time_grain_sample_size": pricing_data.time_grain_sample_size,
+        "sort_cache_bytes": pricing_data.sort_cache_bytes,
+        "compact": pricing_data.compact,
+        "volume_dtype": pricing_data.output_schema[pricing_data.volume_col],
+    }
+
+
+def _initialize_worker() -> None:
+    # Parallelism comes from the processes; keep each one to a single thread.
+    numba.set_num_threads(1)
+
+
+def _run_shard(
+    shard_dir: str, pipeline: Pipeline, options: dict[str, Any], output_file: str | None
+) -> pl.DataFrame | None:
+    pricing_data = PricingData.from_parquet(
+        shard_dir, hive_partitioning=False, lazy=False, **options
+    )
+    result = pipeline(pricing_data)
+    if isinstance(result, pl.LazyFrame):
+        result = result.collect()
+    if output_file is None:
+        return result
+    result.write_parquet(output_file)
+    return None
@@ -1,28 +1,374 @@
-import polars as pl
+import itertools
+import os
+import re
+from collections.abc import Iterator, Sequence
 from datetime import timedelta
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import pandas as pd
+import polars as pl
 
 
 def estimate_time_grain(date_series: pl.Series) -> timedelta:
     """Estimate the time grain of a datetime series.
 
+    The grain is the most common positive difference between consecutive timestamps. When
+    several differences are equally common, the smallest is returned, as larger ones are
+    usually gaps such as session breaks.
+
     Args:
         date_series (pl.Series): A polars Series of datetime type.
 
+    Raises:
+        TypeError: If the input is not a Series.
+        ValueError: If the series is not of date or datetime type, or has fewer than two
+            distinct timestamps.
+
     Returns:
-        str: The estimated time grain as a string (e.g., '1d', '1h', '1min').
+        timedelta: The estimated time grain.
     """
     if not isinstance(date_series, pl.Series):
         raise TypeError("Input must be a polars Series.")
     if date_series.dtype != pl.Datetime and date_series.dtype != pl.Date:
         raise ValueError("Series must be of date or datetime type.")
 
-    sorted_dates = date_series.unique().sort()
-    diffs = sorted_dates.diff().drop_nulls()
+    # Repeated timestamps give zero differences, which are dropped instead of deduplicating.
+    diffs = date_series.sort().diff()
+    grain, _ = _modal_diff(diffs.filter(diffs > timedelta(0)))
+    return grain
+
+
+class TimeGrain(NamedTuple):
+    """Time grain of a set of bars together with how well it describes them.
+
+    Attributes:
+        grain (timedelta): The most common spacing of consecutive bars of an instrument.
+        confidence (float): Share of the consecutive bar spacings equal to ``grain``. Session
+            breaks lower it slightly; mixed or irregular bars lower it substantially.
+        by_instrument (dict[Any, timedelta]): The grain of every instrument in the sample.
+        irregular (bool): Whether instruments have different grains or the confidence is below
+            the required minimum.
+    """
+
+    grain: timedelta
+    confidence: float
+    by_instrument: dict[Any, timedelta]
+    irregular: bool
+
+
+def infer_time_grain(
+    bars: pl.DataFrame | pl.LazyFrame,
+    timestamp_col: str = "end_dtutc",
+    financial_inst_id_col: str = "fid",
+    sample_size: int | None = 100_000,
+    min_confidence: float = 0.5,
+) -> TimeGrain:
+    """Infer the time grain of multi-instrument bars from per-instrument runs of a bounded sample.
+
+    Only the first ``sample_size`` bars are read, so a lazy source is never scanned in full.
+    The sample is sorted by instrument and timestamp, and spacings are taken within each
+    instrument's run, so interleaved instruments and repeated timestamps across instruments do
+    not distort the estimate. Ties are resolved towards the smallest spacing.
+
+    Args:
+        bars (pl.DataFrame | pl.LazyFrame): The bars.
+        timestamp_col (str, optional): Name of the timestamp column. Defaults to "end_dtutc".
+        financial_inst_id_col (str, optional): Name of the instrument column. Defaults to "fid".
+        sample_size (int | None, optional): Number of leading bars to sample, or None for all.
+            Defaults to 100,000.
+        min_confidence (float, optional): Confidence below which the bars are flagged as
+            irregular. Defaults to 0.5.
+
+    Raises:
+        ValueError: If no instrument in the sample has two distinct timestamps.
+
+    Returns:
+        TimeGrain: The grain, its confidence, the grain of every sampled instrument and whether
+            the bars are irregular.
+    """
+    sample = bars.lazy().select(timestamp_col, financial_inst_id_col)
+    if sample_size is not None:
+        sample = sample.head(sample_size)
+    diffs = (
+        sample.sort(financial_inst_id_col, timestamp_col)
+        .select(
+            financial_inst_id_col,
+            pl.col(timestamp_col).diff().over(financial_inst_id_col).alias("diff"),
+        )
+        .filter(pl.col("diff") > timedelta(0))
+        .collect()
+    )
+    grain, confidence = _modal_diff(diffs["diff"])
+    by_instrument = dict(
+        diffs.group_by(financial_inst_id_col)
+        .agg(pl.col("diff").mode().min())
+        .sort(financial_inst_id_col)
+        .iter_rows()
+    )
+    irregular = len(set(by_instrument.values())) > 1 or confidence < min_confidence
+    return TimeGrain(grain, confidence, by_instrument, irregular)
+
+
+def parquet_time_grain(
+    source: str | Path | Sequence[str | Path],
+    timestamp_col: str = "end_dtutc",
+    financial_inst_id_col: str = "fid",
+    trade_date_col: str = "trade_date",
+    max_files: int = 64,
+    min_confidence: float = 0.5,
+) -> TimeGrain | None:
+    """Estimate the time grain of a parquet store from file metadata, without reading any data.
+
+    Only row groups holding a single instrument on a single trade date are used, identified by
+    equal minimum and maximum statistics of the instrument and trade date columns or by hive
+    ``financial_inst_id_col=`` and ``trade_date_col=`` partitions. The spacing of such a row
+    group is its timestamp range divided by the number of rows less one, which is exact for a
+    gap-free session; a session with gaps, e.g. a lunch break or missing bars, overstates it,
+    so callers should check the estimate against a sample of the bars. Row groups spanning
+    several trade dates are skipped, as their overnight gaps would give the same wrong spacing
+    in every file of a one-file-per-instrument store.
+
+    Files are listed lazily and only the first ``max_files`` are opened, so a large store is
+    never walked in full. Hive instrument values that are integers are returned as ``int``, as
+    the statistics of an integer column are. Requires pyarrow.
+
+    Args:
+        source (str | Path | Sequence[str | Path]): Path, directory or glob of the parquet store.
+        timestamp_col (str, optional): Name of the timestamp column. Defaults to "end_dtutc".
+        financial_inst_id_col (str, optional): Name of the instrument column. Defaults to "fid".
+        trade_date_col (str, optional): Name of the trade date column. Defaults to "trade_date".
+        max_files (int, optional): Maximum number of files whose metadata is read. Defaults to 64.
+        min_confidence (float, optional): Confidence below which the store is flagged as
+            irregular. Defaults to 0.5.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+
+    Returns:
+        TimeGrain | None: The estimated grain, or None if no row group holds a single instrument
+            on a single trade date with timestamp statistics.
+    """
+    import pyarrow.parquet as pq
+
+    instrument_partition = re.compile(rf"{re.escape(financial_inst_id_col)}=([^/\\]+)")
+    trade_date_partition = re.compile(rf"{re.escape(trade_date_col)}=([^/\\]+)")
+    instruments = []
+    spacings = []
+    for path in itertools.islice(_parquet_files(source), max_files):
+        metadata = pq.ParquetFile(path).metadata
+        names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+        if timestamp_col not in names:
+            continue
+        hive_instrument = instrument_partition.search(str(path))
+        hive_trade_date = trade_date_partition.search(str(path))
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            timestamps = row_group.column(names.index(timestamp_col)).statistics
+            if (
+                row_group.num_rows < 2
+                or timestamps is None
+                or not timestamps.has_min_max
+            ):
+                continue
+            if trade_date_col in names:
+                if not _single_valued(row_group, names.index(trade_date_col)):
+                    continue
+            elif hive_trade_date is None:
+                continue
+            if financial_inst_id_col in names:
+                column = names.index(financial_inst_id_col)
+                if not _single_valued(row_group, column):
+                    continue
+                instrument = row_group.column(column).statistics.min
+            elif hive_instrument is not None:
+                instrument = _hive_value(hive_instrument.group(1))
+            else:
+                continue
+            span = pd.Timestamp(timestamps.max) - pd.Timestamp(timestamps.min)
+            instruments.append(instrument)
+            spacings.append(span.value // (row_group.num_rows - 1))
+
+    if not spacings:
+        return None
+    diffs = pl.DataFrame(
+        {"instrument": instruments, "diff": spacings},
+        schema_overrides={"diff": pl.Int64},
+    ).with_columns(pl.col("diff").cast(pl.Duration("ns")))
+    grain, confidence = _modal_diff(diffs["diff"])
+    by_instrument = dict(
+        diffs.group_by("instrument")
+        .agg(pl.col("diff").mode().min())
+        .sort("instrument")
+        .iter_rows()
+    )
+    irregular = len(set(by_instrument.values())) > 1 or confidence < min_confidence
+    return TimeGrain(grain, confidence, by_instrument, irregular)
+
+
+def _single_valued(row_group: Any, column: int) -> bool:
+    """Whether the statistics of a row group's column show a single value."""
+    statistics = row_group.column(column).statistics
+    return (
+        statistics is not None
+        and statistics.has_min_max
+        and statistics.min == statistics.max
+    )
+
+
+def _hive_value(value: str) -> int | str:
+    """A hive partition value as an integer where it is one, like integer column statistics."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _modal_diff(diffs: pl.Series) -> tuple[timedelta, float]:
+    """Most common difference, the smallest on ties, and the share of differences equal to it."""
     if diffs.is_empty():
         raise ValueError("Not enough data to estimate time grain.")
+    counts = diffs.value_counts(name="count").sort(
+        ["count", diffs.name], descending=[True, False]
+    )
+    grain, count = counts.row(0)
+    return grain, count / diffs.len()
+
+
+def _parquet_files(source: str | Path | Sequence[str | Path]) -> Iterator[Path]:
+    """The parquet files of a file, directory, glob or list of paths, listed lazily.
+
+    Directories are walked top-down in name order, so the first files are found without
+    listing the rest of the store.
+    """
+    if not isinstance(source, (str, Path)):
+        for path in source:
+            yield from _parquet_files(path)
+        return
+    path = Path(source).expanduser()
+    if path.is_dir():
+        for root, directories, files in os.walk(path):
+            directories.sort()
+            for name in sorted(files):
+                if name.endswith(".parquet"):
+                    yield Path(root) / name
+    elif path.exists():
+        yield path
+    elif path.is_absolute():
+        yield from Path(path.anchor).glob(str(path.relative_to(path.anchor)))
+    else:
+        yield from Path().glob(str(path))
+
+
+def require_empty_directory(directory: Path, name: str) -> None:
+    """Refuse a directory with files in it, which would be mixed into the files written to it.
+
+    Args:
+        directory (Path): The output directory, which may not exist yet.
+        name (str): Name of the argument the directory was given as, for the error message.
+
+    Raises:
+        ValueError: If the directory exists and is not empty.
+    """
+    if directory.is_dir() and any(directory.iterdir()):
+        raise ValueError(
+            f"{name} must be an empty directory, got {directory} with files in it."
+        )
+
+
+class Frequency(NamedTuple):
+    """A Polars duration string split into its calendar and fixed-length parts."""
+
+    months: int
+    weeks: int
+    nanoseconds: int
+
+    @property
+    def approximate_nanoseconds(self) -> float:
+        """Approximate length of the frequency, used only for ordering."""
+        return (
+            self.months * _NANOSECONDS_PER_MONTH
+            + self.weeks * 7 * _NANOSECONDS_PER_DAY
+            + self.nanoseconds
+        )
+
+
+_NANOSECONDS_PER_DAY = 86_400 * 10**9
+_NANOSECONDS_PER_MONTH = 30.436875 * _NANOSECONDS_PER_DAY
+_FREQUENCY_UNITS = {
+    "ns": (0, 0, 1),
+    "us": (0, 0, 10**3),
+    "ms": (0, 0, 10**6),
+    "s": (0, 0, 10**9),
+    "m": (0, 0, 60 * 10**9),
+    "h": (0, 0, 3_600 * 10**9),
+    "d": (0, 0, _NANOSECONDS_PER_DAY),
+    "w": (0, 1, 0),
+    "mo": (1, 0, 0),
+    "q": (3, 0, 0),
+    "y": (12, 0, 0),
+}
+_FREQUENCY_PATTERN = re.compile(r"(\d+)(ns|us|ms|mo|s|m|h|d|w|q|y)")
+
+
+def parse_frequency(freq: str) -> Frequency:
+    """Parse a Polars duration string such as '5m', '1h30m' or '1mo'.
+
+    Args:
+        freq (str): The duration string.
+
+    Raises:
+        ValueError: If the string is not a valid duration.
+
+    Returns:
+        Frequency: The months, weeks and fixed nanoseconds making up the duration.
+    """
+    parts = _FREQUENCY_PATTERN.findall(freq)
+    if not parts or "".join(count + unit for count, unit in parts) != freq:
+        raise ValueError(f"Invalid frequency: {freq!r}.")
+
+    months = weeks = nanoseconds = 0
+    for count, unit in parts:
+        unit_months, unit_weeks, unit_nanoseconds = _FREQUENCY_UNITS[unit]
+        months += int(count) * unit_months
+        weeks += int(count) * unit_weeks
+        nanoseconds += int(count) * unit_nanoseconds
+    if months == weeks == nanoseconds == 0:
+        raise ValueError(f"Frequency must be positive: {freq!r}.")
+    return Frequency(months, weeks, nanoseconds)
+
+
+def frequency_nests(fine: str, coarse: str) -> bool:
+    """Check whether every window of the coarse frequency is a union of fine windows.
+
+    When this holds, bars at the coarse frequency can be aggregated from bars at the fine
+    frequency instead of from the raw bars.
+
+    Args:
+        fine (str): The finer frequency.
+        coarse (str): The coarser frequency.
+
+    Returns:
+        bool: True if the coarse windows are made up of whole fine windows.
+    """
+    fine_freq = parse_frequency(fine)
+    coarse_freq = parse_frequency(coarse)
 
-    common_diff = diffs.mode()
-    if common_diff.is_empty() or common_diff.len() > 1:
-        raise ValueError("Could not determine a common time difference.")
+    if fine_freq.months == 0 and fine_freq.weeks == 0:
+        if coarse_freq.months == 0 and coarse_freq.weeks == 0:
+            return coarse_freq.nanoseconds % fine_freq.nanoseconds == 0
+        if coarse_freq.nanoseconds == 0 and (
+            coarse_freq.months == 0 or coarse_freq.weeks == 0
+        ):
+            return _NANOSECONDS_PER_DAY % fine_freq.nanoseconds == 0
+        return False
 
-    return common_diff.item()
+    if fine_freq.weeks == 0 and fine_freq.nanoseconds == 0:
+        if coarse_freq.weeks != 0 or coarse_freq.nanoseconds != 0:
+            return False
+        return (
+            coarse_freq.months % fine_freq.months == 0
+            and 12 % fine_freq.months == 0
+            and (12 % coarse_freq.months == 0 or coarse_freq.months % 12 == 0)
+        )
+    return False
@@ -0,0 +1,288 @@
+"""Numba kernels backing pqf.research.statistics and pqf.research.backtest.
+
+The statistics kernels work on a float64 buffer holding several return streams one after
+another, delimited by ``offsets`` (stream ``g`` spans ``offsets[g]:offsets[g + 1]``), and process
+the streams in parallel. Missing returns are passed in as NaN and are skipped.
+
+The backtest kernels simulate the path of one portfolio over a dense bar by asset price matrix.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+ROLLING_STATISTICS = (
+    "annualized_return",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "calmar_ratio",
+)
+
+
+@njit(nogil=True, cache=True, error_model="numpy", parallel=True)
+def rolling_statistics_kernel(
+    returns: np.ndarray,
+    offsets: np.ndarray,
+    window_size: int,
+    min_periods: int,
+    periods_per_year: float,
+    risk_free_rate: float,
+) -> np.ndarray:
+    """Rolling statistics of log returns, one row per entry of ``ROLLING_STATISTICS``.
+
+    The mean and variance are updated in a single pass with Welford's algorithm, adding the
+    newest and removing the oldest return of the window, which stays accurate for long series
+    where the naive sum of squares loses precision. Entries are NaN until ``min_periods``
+    returns are in the window.
+    """
+    out = np.full((len(ROLLING_STATISTICS), returns.shape[0]), np.nan)
+    for group in prange(offsets.shape[0] - 1):
+        _rolling_statistics_group(
+            returns,
+            offsets[group],
+            offsets[group + 1],
+            window_size,
+            min_periods,
+            periods_per_year,
+            risk_free_rate,
+            out,
+        )
+    return out
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def _rolling_statistics_group(
+    returns, start, end, window_size, min_periods, periods_per_year, risk_free_rate, out
+):
+    n = end - start
+    # Log wealth before each return of the stream, so that the drawdown of a window is measured
+    # from the wealth at its start.
+    wealth = np.zeros(n + 1)
+    # The window's wealth points ``first..k + 1`` are held as a two-stack queue of
+    # drawdown summaries (peak, trough, max drawdown), which combine associatively: the
+    # front ``first..split - 1`` as suffix summaries, the back ``split..k + 1`` as one
+    # running summary. When the front runs empty the back is turned into suffix
+    # summaries, so every point is summarised once and the max drawdown costs O(1)
+    # amortized per step whatever the window.
+    front_peak = np.empty(n + 1)
+    front_trough = np.empty(n + 1)
+    front_drawdown = np.empty(n + 1)
+    split = 0
+    back_peak = -np.inf
+    back_trough = np.inf
+    back_drawdown = 0.0
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    downside = 0.0
+    negatives = 0
+    annualization = np.sqrt(periods_per_year)
+    for k in range(n):
+        value = returns[start + k]
+        if not np.isnan(value):
+            excess = value - risk_free_rate
+            count += 1
+            delta = excess - mean
+            mean += delta / count
+            m2 += delta * (excess - mean)
+            if excess < 0:
+                downside += excess * excess
+                negatives += 1
+            wealth[k + 1] = wealth[k] + value
+        else:
+            wealth[k + 1] = wealth[k]
+        if k >= window_size:
+            dropped = returns[start + k - window_size]
+            if not np.isnan(dropped):
+                excess = dropped - risk_free_rate
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = excess - mean
+                    mean -= delta / count
+                    m2 -= delta * (excess - mean)
+                if excess < 0:
+                    negatives -= 1
+                    # Reset rather than accumulate rounding error once no loss is left.
+                    downside = downside - excess * excess if negatives > 0 else 0.0
+
+        first = max(0, k - window_size + 1)
+        if first >= split:
+            peak = -np.inf
+            trough = np.inf
+            drawdown = 0.0
+            for j in range(k + 1, first - 1, -1):
+                drawdown = max(drawdown, wealth[j] - trough)
+                peak = max(peak, wealth[j])
+                trough = min(trough, wealth[j])
+                front_peak[j] = peak
+                front_trough[j] = trough
+                front_drawdown[j] = drawdown
+            split = k + 2
+            back_peak = -np.inf
+            back_trough = np.inf
+            back_drawdown = 0.0
+        else:
+            back_drawdown = max(back_drawdown, back_peak - wealth[k + 1])
+            back_peak = max(back_peak, wealth[k + 1])
+            back_trough = min(back_trough, wealth[k + 1])
+        max_drawdown = max(
+            front_drawdown[first], back_drawdown, front_peak[first] - back_trough
+        )
+
+        if count < min_periods or count == 0:
+            continue
+        annualized_return = np.exp((mean + risk_free_rate) * periods_per_year) - 1.0
+        drawdown = 1.0 - np.exp(-max_drawdown)
+        out[0, start + k] = annualized_return
+        out[4, start + k] = drawdown
+        out[5, start + k] = annualized_return / drawdown if drawdown > 0 else np.nan
+        if count > 1:
+            std = np.sqrt(max(m2, 0.0) / (count - 1))
+            out[1, start + k] = std * annualization
+            out[2, start + k] = mean / std * annualization if std > 0 else np.nan
+        semi_deviation = np.sqrt(max(downside, 0.0) / count)
+        out[3, start + k] = (
+            mean / semi_deviation * annualization if semi_deviation > 0 else np.nan
+        )
+
+
+# Columns of the trade records returned by ``portfolio_path_kernel``.
+TRADE_FIELDS = ("bar", "asset", "quantity", "price", "cost")
+
+
+@njit(nogil=True, cache=True)
+def forward_fill_columns(values: np.ndarray) -> None:
+    """Replace NaN entries of a 2D array in place with the last value above them in the column."""
+    for column in range(values.shape[1]):
+        last = np.nan
+        for row in range(values.shape[0]):
+            if np.isnan(values[row, column]):
+                values[row, column] = last
+            else:
+                last = values[row, column]
+
+
+@njit(nogil=True, cache=True, error_model="numpy")
+def portfolio_path_kernel(
+    prices: np.ndarray,
+    rebalance_bars: np.ndarray,
+    rebalance_offsets: np.ndarray,
+    assets: np.ndarray,
+    weights: np.ndarray,
+    initial_capital: float,
+    rebalance_threshold: float,
+    cost_rate: float,
+    allow_borrowing: bool,
+):
+    """Simulate a portfolio trading to target weights at the close of the rebalance bars.
+
+    Rebalance ``r`` happens at bar ``rebalance_bars[r]`` with target weights
+    ``weights[rebalance_offsets[r]:rebalance_offsets[r + 1]]`` for the matching ``assets``; every
+    other asset is targeted at zero. Between rebalances the share counts are held, so weights
+    drift with prices. An asset is only traded when its weight deviates from the target by more
+    than ``rebalance_threshold``. Sells are executed first; without borrowing, buys are scaled
+    down so that cash covers them and their costs.
+
+    Returns:
+        The equity, cash, costs and turnover (traded value over equity) per bar, and the trades
+        as rows of ``TRADE_FIELDS``.
+    """
+    n_bars, n_assets = prices.shape
+    equity = np.empty(n_bars)
+    cash_path = np.empty(n_bars)
+    costs = np.zeros(n_bars)
+    turnover = np.zeros(n_bars)
+    trades = np.empty((max(16, weights.shape[0]), len(TRADE_FIELDS)))
+    n_trades = 0
+
+    shares = np.zeros(n_assets)
+    target = np.zeros(n_assets)
+    delta = np.zeros(n_assets)
+    cash = initial_capital
+    rebalance = 0
+    for bar in range(n_bars):
+        value = cash
+        for asset in range(n_assets):
+            if shares[asset] != 0.0:
+                value += shares[asset] * prices[bar, asset]
+
+        while rebalance < rebalance_bars.shape[0] and rebalance_bars[rebalance] == bar:
+            target[:] = 0.0
+            for k in range(
+                rebalance_offsets[rebalance], rebalance_offsets[rebalance + 1]
+            ):
+                target[assets[k]] = weights[k]
+            rebalance += 1
+            if value <= 0.0:
+                continue
+
+            buy_value = 0.0
+            for asset in range(n_assets):
+                delta[asset] = 0.0
+                price = prices[bar, asset]
+                if not price > 0.0:
+                    continue
+                weight = shares[asset] * price / value
+                if abs(target[asset] - weight) > rebalance_threshold:
+                    delta[asset] = target[asset] * value / price - shares[asset]
+                    if delta[asset] > 0.0:
+                        buy_value += delta[asset] * price
+
+            # Turnover is measured against the value before the rebalance.
+            pre_trade_value = value
+            traded = 0.0
+            for asset in range(n_assets):
+                if delta[asset] < 0.0:
+                    price = prices[bar, asset]
+                    cost = -delta[asset] * price * cost_rate
+                    cash += -delta[asset] * price - cost
+                    shares[asset] += delta[asset]
+                    costs[bar] += cost
+                    value -= cost
+                    traded -= delta[asset] * price
+                    trades = _record(
+                        trades, n_trades, bar, asset, delta[asset], price, cost
+                    )
+                    n_trades += 1
+
+            scale = 1.0
+            if not allow_borrowing and buy_value * (1.0 + cost_rate) > cash:
+                scale = max(cash, 0.0) / (buy_value * (1.0 + cost_rate))
+            for asset in range(n_assets):
+                if delta[asset] > 0.0 and scale > 0.0:
+                    price = prices[bar, asset]
+                    quantity = delta[asset] * scale
+                    cost = quantity * price * cost_rate
+                    cash -= quantity * price + cost
+                    shares[asset] += quantity
+                    costs[bar] += cost
+                    value -= cost
+                    traded += quantity * price
+                    trades = _record(
+                        trades, n_trades, bar, asset, quantity, price, cost
+                    )
+                    n_trades += 1
+            turnover[bar] += traded / pre_trade_value
+
+        # Trades exchange shares for cash at the bar's price, so only their costs change equity.
+        equity[bar] = value
+        cash_path[bar] = cash
+    return equity, cash_path, costs, turnover, trades[:n_trades]
+
+
+@njit(nogil=True, cache=True)
+def _record(trades, n_trades, bar, asset, quantity, price, cost):
+    if n_trades == trades.shape[0]:
+        grown = np.empty((2 * trades.shape[0], trades.shape[1]))
+        grown[:n_trades] = trades
+        trades = grown
+    trades[n_trades, 0] = bar
+    trades[n_trades, 1] = asset
+    trades[n_trades, 2] = quantity
+    trades[n_trades, 3] = price
+    trades[n_trades, 4] = cost
+    return trades
@@ -0,0 +1,270 @@
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numba
+import numpy as np
+import polars as pl
+
+from pqf.pricing.core import PricingData
+from pqf.research._numba import (
+    TRADE_FIELDS,
+    forward_fill_columns,
+    portfolio_path_kernel,
+)
+
+# Targets of one strategy: rebalance bars, offsets of each rebalance, asset indices and weights.
+_Targets = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+_Path = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+# Price matrix of a worker process, sent once when the worker starts.
+_worker_prices: np.ndarray | None = None
+
+
+class BacktestResult(NamedTuple):
+    """Outcome of ``backtest`` for every strategy, in long format.
+
+    Attributes:
+        equity (pl.DataFrame): One row per strategy and bar with the ``equity``, ``cash``,
+            ``cost`` and ``turnover`` (traded value over equity) at the close.
+        trades (pl.DataFrame): One row per trade with the signed ``quantity``, ``price`` and
+            ``cost``.
+        positions (pl.DataFrame): The ``position`` in shares after every trade, held until the
+            next trade of the same strategy and instrument.
+    """
+
+    equity: pl.DataFrame
+    trades: pl.DataFrame
+    positions: pl.DataFrame
+
+
+def backtest(
+    target_weights: pl.LazyFrame | pl.DataFrame,
+    pricing_data: PricingData,
+    initial_capital: float = 1_000_000.0,
+    rebalance_threshold: float = 0.0,
+    cost_bps: float = 0.0,
+    allow_borrowing: bool = False,
+    processes: int = 1,
+    strategy_column: str = "strategy_id",
+    timestamp_column: str = "timestamp",
+    weight_column: str = "weight",
+) -> BacktestResult:
+    """Simulate portfolios that trade to target weights at the close of the pricing bars.
+
+    Target weights are given in long format, one row per strategy, rebalance time and
+    instrument; instruments missing from a rebalance are targeted at zero:
+        strategy_column | timestamp_column | financial_inst_id_col | weight_column
+
+    A rebalance is executed at the close of the first bar at or after its timestamp, and only the
+    latest rebalance of a strategy is kept when several fall on the same bar. Lag the targets to
+    trade on the bar after the signal. Between rebalances the share counts are held, so weights
+    drift with prices, and instruments without a bar keep their last close. An instrument is only
+    traded when its weight is more than ``rebalance_threshold`` away from its target, and trades
+    pay ``cost_bps`` on their value. Without borrowing, buys are scaled down to the cash left
+    after the sells and costs.
+
+    The bars are held as a dense bar by instrument matrix of closes, shared by all strategies.
+    The path of each strategy is simulated in a Numba kernel; with ``processes`` above one the
+    strategies are split across a pool of worker processes and the results are assembled in
+    strategy order, so they do not depend on the number of processes.
+
+    Args:
+        target_weights (pl.LazyFrame | pl.DataFrame): Target weights of each strategy.
+        pricing_data (PricingData): The bars to trade on.
+        initial_capital (float, optional): Starting cash of each strategy. Defaults to 1,000,000.
+        rebalance_threshold (float, optional): Weight deviation below which an instrument is not
+            traded. Defaults to 0.0.
+        cost_bps (float, optional): Transaction costs in basis points of the traded value.
+            Defaults to 0.0.
+        allow_borrowing (bool, optional): Whether cash may go negative to fund buys. Defaults to
+            False.
+        processes (int, optional): Number of worker processes. Defaults to 1, which simulates
+            every strategy in the calling process.
+        strategy_column (str, optional): Name of the strategy column. Defaults to "strategy_id".
+        timestamp_column (str, optional): Name of the rebalance time column. Defaults to "timestamp".
+        weight_column (str, optional): Name of the target weight column. Defaults to "weight".
+
+    Raises:
+        ValueError: If initial_capital or processes is not positive, or rebalance_threshold or
+            cost_bps is negative.
+
+    Returns:
+        BacktestResult: The equity, trades and positions of every strategy.
+    """
+    if initial_capital <= 0:
+        raise ValueError(f"initial_capital must be positive, got {initial_capital}.")
+    if rebalance_threshold < 0 or cost_bps < 0:
+        raise ValueError("rebalance_threshold and cost_bps must not be negative.")
+    if processes < 1:
+        raise ValueError(f"processes must be at least 1, got {processes}.")
+
+    fid = pricing_data.financial_inst_id_col
+    timestamp = pricing_data.timestamp_col
+    bars = pricing_data.get_bars().lazy().select(timestamp, fid, pricing_data.close_col)
+    timestamps = bars.select(pl.col(timestamp).unique().sort()).collect().to_series()
+    fids = bars.select(pl.col(fid).unique().sort()).collect().to_series()
+    bar_index = timestamps.to_frame().lazy().with_row_index("_bar")
+    asset_index = fids.to_frame().lazy().with_row_index("_asset")
+
+    closes = bars.join(bar_index, on=timestamp).join(asset_index, on=fid).collect()
+    prices = np.full((timestamps.len(), fids.len()), np.nan)
+    prices[closes["_bar"].to_numpy(), closes["_asset"].to_numpy()] = closes[
+        pricing_data.close_col
+    ].to_numpy()
+    forward_fill_columns(prices)
+
+    targets = (
+        target_weights.lazy()
+        .select(
+            strategy_column,
+            pl.col(timestamp_column).cast(timestamps.dtype),
+            fid,
+            weight_column,
+        )
+        .sort(timestamp_column)
+        .join_asof(
+            bar_index,
+            left_on=timestamp_column,
+            right_on=timestamp,
+            strategy="forward",
+            check_sortedness=False,
+        )
+        .drop_nulls("_bar")
+        .filter(
+            pl.col(timestamp_column)
+            == pl.col(timestamp_column).max().over(strategy_column, "_bar")
+        )
+        .join(asset_index, on=fid)
+        .sort(strategy_column, "_bar", "_asset")
+        .collect()
+    )
+    first_rows = targets.select(pl.col(strategy_column).is_first_distinct()).to_series()
+    strategies = targets.get_column(strategy_column).filter(first_rows)
+    strategy_bounds = np.append(np.flatnonzero(first_rows.to_numpy()), targets.height)
+    rebalance_bars = targets["_bar"].cast(pl.Int64).to_numpy()
+    assets = targets["_asset"].cast(pl.Int64).to_numpy()
+    weights = targets[weight_column].cast(pl.Float64).to_numpy()
+    strategy_targets = [
+        _strategy_targets(
+            rebalance_bars[start:end], assets[start:end], weights[start:end]
+        )
+        for start, end in itertools.pairwise(strategy_bounds)
+    ]
+
+    parameters = (
+        initial_capital,
+        rebalance_threshold,
+        cost_bps / 10_000,
+        allow_borrowing,
+    )
+    if processes == 1 or len(strategy_targets) < 2:
+        paths = _simulate(prices, strategy_targets, parameters)
+    else:
+        chunks = np.array_split(
+            np.arange(len(strategy_targets)), min(processes * 4, len(strategy_targets))
+        )
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(prices,),
+        ) as pool:
+            chunk_paths = pool.map(
+                _simulate_in_worker,
+                [[strategy_targets[k] for k in chunk] for chunk in chunks],
+                [parameters] * len(chunks),
+            )
+            paths = [path for chunk in chunk_paths for path in chunk]
+    return _assemble(
+        paths, strategies, timestamps, fids, strategy_column, timestamp, fid
+    )
+
+
+def _strategy_targets(
+    rebalance_bars: np.ndarray, assets: np.ndarray, weights: np.ndarray
+) -> _Targets:
+    starts = np.flatnonzero(np.diff(rebalance_bars, prepend=-1))
+    offsets = np.append(starts, rebalance_bars.shape[0]).astype(np.int64)
+    return rebalance_bars[starts], offsets, assets, weights
+
+
+def _simulate(
+    prices: np.ndarray,
+    strategy_targets: list[_Targets],
+    parameters: tuple[float, float, float, bool],
+) -> list[_Path]:
+    return [
+        portfolio_path_kernel(prices, *targets, *parameters)
+        for targets in strategy_targets
+    ]
+
+
+def _initialize_worker(prices: np.ndarray) -> None:
+    global _worker_prices
+    _worker_prices = prices
+    # Parallelism comes from the processes; keep each one to a single thread.
+    numba.set_num_threads(1)
+
+
+def _simulate_in_worker(
+    strategy_targets: list[_Targets], parameters: tuple[float, float, float, bool]
+) -> list[_Path]:
+    assert _worker_prices is not None
+    return _simulate(_worker_prices, strategy_targets, parameters)
+
+
+def _assemble(
+    paths: list[_Path],
+    strategies: pl.Series,
+    timestamps: pl.Series,
+    fids: pl.Series,
+    strategy_column: str,
+    timestamp: str,
+    fid: str,
+) -> BacktestResult:
+    def stack(field: int, empty_shape: tuple[int, ...] = (0,)) -> np.ndarray:
+        return (
+            np.concatenate([path[field] for path in paths])
+            if paths
+            else np.empty(empty_shape)
+        )
+
+    bar_strategies = pl.Series(
+        np.repeat(np.arange(len(paths), dtype=np.int64), timestamps.len())
+    )
+    bars = pl.Series(np.tile(np.arange(timestamps.len(), dtype=np.int64), len(paths)))
+    equity = pl.DataFrame(
+        {
+            strategy_column: strategies.gather(bar_strategies),
+            timestamp: timestamps.gather(bars),
+            "equity": stack(0),
+            "cash": stack(1),
+            "cost": stack(2),
+            "turnover": stack(3),
+        }
+    )
+
+    records = dict(zip(TRADE_FIELDS, stack(4, (0, len(TRADE_FIELDS))).T, strict=True))
+    trade_counts = [path[4].shape[0] for path in paths]
+    trade_strategies = pl.Series(
+        np.repeat(np.arange(len(paths), dtype=np.int64), trade_counts)
+    )
+    trades = pl.DataFrame(
+        {
+            strategy_column: strategies.gather(trade_strategies),
+            timestamp: timestamps.gather(pl.Series(records["bar"].astype(np.int64))),
+            fid: fids.gather(pl.Series(records["asset"].astype(np.int64))),
+            "quantity": records["quantity"],
+            "price": records["price"],
+            "cost": records["cost"],
+        }
+    )
+    positions = trades.select(
+        strategy_column,
+        timestamp,
+        fid,
+        pl.col("quantity").cum_sum().over(strategy_column, fid).alias("position"),
+    )
+    return BacktestResult(equity, trades, positions)
@@ -1,5 +1,7 @@
 import itertools
-from typing import NamedTuple
+from collections.abc import Sequence
+from datetime import date
+from typing import Literal, NamedTuple
 
 import polars as pl
 import polars.selectors as cs
@@ -76,6 +78,548 @@ def simple_factor_long_short_returns(
     return factor_return_df
 
 
+def factor_quantiles(
+    factors: pl.LazyFrame | pl.DataFrame,
+    quantiles: int,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_column: str = "factor",
+    value_column: str = "value",
+) -> pl.LazyFrame:
+    """Assign every factor value to a quantile of its date's cross-section.
+
+    Factors are in long format, one row per date, instrument and factor:
+        date_column | fid_column | factor_column | value_column
+
+    Each (date, factor) cross-section is ranked once and bucketed as
+    ``floor((rank - 1) * quantiles / count)``, so quantile ``0`` holds the lowest values. Tied
+    values share their average rank and therefore their quantile. Null values are dropped.
+
+    Args:
+        factors (pl.LazyFrame | pl.DataFrame): Long-format factor values.
+        quantiles (int): Number of quantiles per cross-section.
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column. Defaults to "fid".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+        value_column (str, optional): Name of the factor value column. Defaults to "value".
+
+    Raises:
+        ValueError: If quantiles is smaller than 1.
+
+    Returns:
+        pl.LazyFrame: The factors with an additional UInt32 ``quantile`` column.
+    """
+    if quantiles < 1:
+        raise ValueError(f"quantiles must be at least 1, got {quantiles}.")
+
+    value = pl.col(value_column)
+    cross_section = [date_column, factor_column]
+    return (
+        factors.lazy()
+        .select(date_column, fid_column, factor_column, value_column)
+        .drop_nulls(value_column)
+        .with_columns(
+            (value.rank("average").sub(1).mul(quantiles) / value.count())
+            .floor()
+            .cast(pl.UInt32)
+            .over(cross_section)
+            .alias("quantile")
+        )
+    )
+
+
+def factor_quantile_returns(
+    factors: pl.LazyFrame | pl.DataFrame,
+    forward_returns: pl.LazyFrame | pl.DataFrame,
+    quantiles: int,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_column: str = "factor",
+    value_column: str = "value",
+    return_columns: Sequence[str] | None = None,
+    by_date: bool = False,
+) -> pl.LazyFrame:
+    """Mean forward returns of the instruments in each factor quantile.
+
+    This is the long-format counterpart of ``mean_factor_returns_by_quantile``. Quantiles are
+    assigned per date cross-section (see ``factor_quantiles``) and the forward returns are joined
+    once on ``[date_column, fid_column]``, so the work grows with the number of factor values
+    rather than with the number of factor and asset columns.
+
+    ``forward_returns`` has one row per date and instrument with one column per horizon, such as
+    the wide output of ``PricingData.get_forward_returns`` keyed on its timestamp or trade date.
+
+    Args:
+        factors (pl.LazyFrame | pl.DataFrame): Long-format factor values.
+        forward_returns (pl.LazyFrame | pl.DataFrame): Forward returns per date and instrument.
+        quantiles (int): Number of quantiles per cross-section.
+        date_column (str, optional): Name of the date column in both frames. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column in both frames.
+            Defaults to "fid".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+        value_column (str, optional): Name of the factor value column. Defaults to "value".
+        return_columns (Sequence[str] | None, optional): Forward return columns to average.
+            Defaults to every column starting with "forward_return_".
+        by_date (bool, optional): Average per date as well, giving a return series per factor
+            quantile. Defaults to False.
+
+    Returns:
+        pl.LazyFrame: One row per factor and quantile (and date if ``by_date``) with the mean of
+            each return column and the number of instruments ``count``, sorted by the keys.
+    """
+    forward_returns = forward_returns.lazy()
+    if return_columns is None:
+        return_columns = [
+            column
+            for column in forward_returns.collect_schema().names()
+            if column.startswith("forward_return_")
+        ]
+    keys = [factor_column, "quantile"]
+    if by_date:
+        keys.insert(0, date_column)
+
+    return (
+        factor_quantiles(
+            factors, quantiles, date_column, fid_column, factor_column, value_column
+        )
+        .join(
+            forward_returns.select(date_column, fid_column, *return_columns),
+            on=[date_column, fid_column],
+            how="inner",
+        )
+        .group_by(keys)
+        .agg(pl.col(return_columns).mean(), pl.len().alias("count"))
+        .sort(keys)
+    )
+
+
+def information_coefficient(
+    factors: pl.LazyFrame | pl.DataFrame,
+    forward_returns: pl.LazyFrame | pl.DataFrame,
+    method: Literal["spearman", "pearson"] = "spearman",
+    horizons: Sequence[int | str] | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_column: str = "factor",
+    value_column: str = "value",
+) -> pl.LazyFrame:
+    """Per-date cross-sectional correlation between factor values and forward returns.
+
+    Factors are in long format (see ``factor_quantiles``) and ``forward_returns`` is the wide
+    output of ``PricingData.get_forward_returns``, with a ``forward_return_<horizon>`` column per
+    horizon. Both are joined once on ``[date_column, fid_column]``; rows missing the factor value
+    or any of the selected forward returns are dropped, so all horizons of a date share the same
+    cross-section. For the Spearman (rank) IC each cross-section is ranked once per column and
+    the ranks are reused for every factor and horizon pair.
+
+    Expected output takes the form of
+        date_column | factor_column | horizon | ic
+
+    Args:
+        factors (pl.LazyFrame | pl.DataFrame): Long-format factor values.
+        forward_returns (pl.LazyFrame | pl.DataFrame): Forward returns per date and instrument.
+        method (Literal["spearman", "pearson"], optional): Correlation method. Defaults to "spearman".
+        horizons (Sequence[int | str] | None, optional): Horizons to correlate against, as passed
+            to ``get_forward_returns``. Defaults to every ``forward_return_`` column.
+        date_column (str, optional): Name of the date column in both frames. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column in both frames.
+            Defaults to "fid".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+        value_column (str, optional): Name of the factor value column. Defaults to "value".
+
+    Raises:
+        ValueError: If method is not "spearman" or "pearson".
+
+    Returns:
+        pl.LazyFrame: One IC per date, factor and horizon, sorted by date, factor and horizon.
+            ``horizon`` is an Enum in the order of the horizons.
+    """
+    if method not in ("spearman", "pearson"):
+        raise ValueError(f"method must be 'spearman' or 'pearson', got {method!r}.")
+
+    forward_returns = forward_returns.lazy()
+    if horizons is None:
+        return_columns = [
+            column
+            for column in forward_returns.collect_schema().names()
+            if column.startswith("forward_return_")
+        ]
+    else:
+        return_columns = [f"forward_return_{horizon}" for horizon in horizons]
+    horizon_labels = [
+        column.removeprefix("forward_return_") for column in return_columns
+    ]
+    cross_section = [date_column, factor_column]
+
+    joined = (
+        factors.lazy()
+        .select(date_column, fid_column, factor_column, value_column)
+        .join(
+            forward_returns.select(date_column, fid_column, *return_columns),
+            on=[date_column, fid_column],
+            how="inner",
+        )
+        .drop_nulls([value_column, *return_columns])
+    )
+    if method == "spearman":
+        joined = joined.with_columns(
+            pl.col(value_column, *return_columns).rank("average").over(cross_section)
+        )
+
+    return (
+        joined.group_by(cross_section)
+        .agg(pl.corr(value_column, column).alias(column) for column in return_columns)
+        .unpivot(
+            index=cross_section,
+            on=return_columns,
+            variable_name="horizon",
+            value_name="ic",
+        )
+        .with_columns(
+            pl.col("horizon")
+            .str.strip_prefix("forward_return_")
+            .cast(pl.Enum(horizon_labels))
+        )
+        .sort(*cross_section, "horizon")
+    )
+
+
+def ic_decay(
+    ic: pl.LazyFrame | pl.DataFrame,
+    factor_column: str = "factor",
+) -> pl.LazyFrame:
+    """Summarise per-date ICs by factor and horizon, showing how predictive power decays.
+
+    Args:
+        ic (pl.LazyFrame | pl.DataFrame): Output of ``information_coefficient``.
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+
+    Returns:
+        pl.LazyFrame: Per factor and horizon the mean and standard deviation of the IC, the
+            information ratio ``ic_ir`` (mean / std), the t-statistic of the mean, the share of
+            dates with a positive IC and the number of dates, sorted by factor and horizon.
+    """
+    ic_value = pl.col("ic").fill_nan(None)
+    return (
+        ic.lazy()
+        .group_by(factor_column, "horizon")
+        .agg(
+            ic_value.mean().alias("ic_mean"),
+            ic_value.std().alias("ic_std"),
+            ic_value.gt(0).mean().alias("ic_hit_rate"),
+            ic_value.count().alias("count"),
+        )
+        .with_columns((pl.col("ic_mean") / pl.col("ic_std")).alias("ic_ir"))
+        .with_columns((pl.col("ic_ir") * pl.col("count").sqrt()).alias("ic_t_stat"))
+        .select(
+            factor_column,
+            "horizon",
+            "ic_mean",
+            "ic_std",
+            "ic_ir",
+            "ic_t_stat",
+            "ic_hit_rate",
+            "count",
+        )
+        .sort(factor_column, "horizon")
+    )
+
+
+def rolling_ic(
+    ic: pl.LazyFrame | pl.DataFrame,
+    window_size: int,
+    date_column: str = "date",
+    factor_column: str = "factor",
+) -> pl.LazyFrame:
+    """Rolling mean and information ratio of the per-date ICs of every factor and horizon.
+
+    Args:
+        ic (pl.LazyFrame | pl.DataFrame): Output of ``information_coefficient``.
+        window_size (int): Number of dates in the rolling window.
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+
+    Returns:
+        pl.LazyFrame: The ICs with ``rolling_ic_mean`` and ``rolling_ic_ir`` columns, null until
+            the window is full, sorted by factor, horizon and date.
+    """
+    ic_value = pl.col("ic").fill_nan(None)
+    series = [factor_column, "horizon"]
+    rolling_mean = ic_value.rolling_mean(window_size).over(series)
+    rolling_std = ic_value.rolling_std(window_size).over(series)
+    return (
+        ic.lazy()
+        .sort(*series, date_column)
+        .with_columns(
+            rolling_mean.alias("rolling_ic_mean"),
+            (rolling_mean / rolling_std).alias("rolling_ic_ir"),
+        )
+    )
+
+
+def quantile_turnover(
+    factors: pl.LazyFrame | pl.DataFrame,
+    quantiles: int,
+    lags: Sequence[int] = (1,),
+    since: date | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_column: str = "factor",
+    value_column: str = "value",
+) -> pl.LazyFrame:
+    """Share of the instruments in each factor quantile that were not in it ``lag`` dates earlier.
+
+    Quantiles are assigned per date cross-section (see ``factor_quantiles``). Dates are numbered
+    in order of occurrence and every cross-section is matched to the ones ``lag`` dates before it
+    with a single join on ``(fid, factor, date index)`` for all lags at once. Turnover is null for
+    the first ``lag`` dates, which have no earlier cross-section.
+
+    With ``since``, only dates from ``since`` onward are returned and only the cross-sections they
+    depend on are read, so appending a trading day costs one cross-section per lag rather than a
+    recompute of the full history.
+
+    Expected output takes the form of
+        date_column | factor_column | quantile | lag | turnover
+
+    Args:
+        factors (pl.LazyFrame | pl.DataFrame): Long-format factor values.
+        quantiles (int): Number of quantiles per cross-section.
+        lags (Sequence[int], optional): Lags, in dates, to compare against. Defaults to (1,).
+        since (date | None, optional): First date to calculate. Defaults to all dates.
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column. Defaults to "fid".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+        value_column (str, optional): Name of the factor value column. Defaults to "value".
+
+    Raises:
+        ValueError: If a lag is smaller than 1 or quantiles is smaller than 1.
+
+    Returns:
+        pl.LazyFrame: Turnover per date, factor, quantile and lag, sorted by those keys.
+    """
+    indexed = _with_date_index(factors, lags, since, date_column)
+    keys = [date_column, factor_column, "quantile", "lag"]
+    current = factor_quantiles(
+        indexed, quantiles, date_column, fid_column, factor_column, value_column
+    ).join(indexed.select(date_column, "_date_index").unique(), on=date_column)
+    previous = _lagged(current, lags, [fid_column, factor_column], "quantile").rename(
+        {"_previous_quantile": "quantile"}
+    )
+    # Joining on the quantile as well keeps only the instruments that stayed in their quantile.
+    stayed = (
+        current.join(
+            previous, on=[fid_column, factor_column, "_date_index", "quantile"]
+        )
+        .group_by(keys)
+        .agg(pl.len().alias("_stayed"))
+    )
+
+    return (
+        current.group_by(date_column, factor_column, "quantile", "_date_index")
+        .agg(pl.len().alias("_count"))
+        .join(pl.LazyFrame({"lag": list(lags)}, schema={"lag": pl.UInt32}), how="cross")
+        .join(stayed, on=keys, how="left")
+        .select(
+            *keys,
+            pl.when(pl.col("_date_index") >= pl.col("lag"))
+            .then(1.0 - pl.col("_stayed").fill_null(0) / pl.col("_count"))
+            .alias("turnover"),
+        )
+        .pipe(_since, since, date_column)
+        .sort(keys)
+    )
+
+
+def factor_rank_autocorrelation(
+    factors: pl.LazyFrame | pl.DataFrame,
+    lags: Sequence[int] = (1,),
+    since: date | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_column: str = "factor",
+    value_column: str = "value",
+) -> pl.LazyFrame:
+    """Spearman correlation between each factor cross-section and the one ``lag`` dates earlier.
+
+    Instruments present on both dates are matched with a single join on
+    ``(fid, factor, date index)`` for all lags and factors at once; a low autocorrelation means
+    the factor reshuffles its ranking quickly and trading it has a high turnover. ``since`` works
+    as in ``quantile_turnover``.
+
+    Expected output takes the form of
+        date_column | factor_column | lag | autocorrelation
+
+    Args:
+        factors (pl.LazyFrame | pl.DataFrame): Long-format factor values.
+        lags (Sequence[int], optional): Lags, in dates, to compare against. Defaults to (1,).
+        since (date | None, optional): First date to calculate. Defaults to all dates.
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column. Defaults to "fid".
+        factor_column (str, optional): Name of the factor name column. Defaults to "factor".
+        value_column (str, optional): Name of the factor value column. Defaults to "value".
+
+    Raises:
+        ValueError: If a lag is smaller than 1.
+
+    Returns:
+        pl.LazyFrame: Rank autocorrelation per date, factor and lag, sorted by those keys.
+    """
+    indexed = _with_date_index(factors, lags, since, date_column).drop_nulls(
+        value_column
+    )
+    keys = [date_column, factor_column, "lag"]
+    previous = _lagged(indexed, lags, [fid_column, factor_column], value_column)
+
+    return (
+        indexed.join(
+            previous, on=[fid_column, factor_column, "_date_index"], how="inner"
+        )
+        .group_by(keys)
+        .agg(
+            pl.corr(value_column, f"_previous_{value_column}", method="spearman").alias(
+                "autocorrelation"
+            )
+        )
+        .pipe(_since, since, date_column)
+        .sort(keys)
+    )
+
+
+def point_in_time_factors(
+    bars: pl.LazyFrame | pl.DataFrame,
+    factors: pl.LazyFrame | pl.DataFrame,
+    publication_lag: str | None = None,
+    max_staleness: str | None = None,
+    timestamp_column: str = "end_dtutc",
+    date_column: str = "date",
+    fid_column: str = "fid",
+    factor_columns: Sequence[str] | None = None,
+    presorted: bool = False,
+) -> pl.LazyFrame:
+    """Attach to every bar the latest factor values that were known at the bar's timestamp.
+
+    Factors are in wide format, one row per date and instrument:
+        date_column | fid_column | momentum | value | ...
+
+    A row becomes known at ``date_column`` shifted by ``publication_lag`` (a duration such as
+    '1d' or '18h', see ``pl.Expr.dt.offset_by``); dates are taken at midnight. Every bar is
+    matched to the last row of its instrument known at or before its timestamp with a single
+    backward as-of join, so no cross product of bars and factor dates is built and a bar never
+    sees a value published after it. Values known more than ``max_staleness`` before the bar
+    are null.
+
+    The as-of join needs both sides ordered by time. The factors are sorted on their
+    publication time; the bars are sorted by timestamp unless ``presorted`` is set, e.g. for
+    ``PricingData.get_bars()``, which is already in trade date and timestamp order.
+
+    Expected output takes the form of
+        bar columns | momentum | value | ...
+
+    Args:
+        bars (pl.LazyFrame | pl.DataFrame): The bars, with a timestamp and instrument column.
+        factors (pl.LazyFrame | pl.DataFrame): Wide-format factor values.
+        publication_lag (str | None, optional): Delay between a factor's date and the time it is
+            known. Defaults to none.
+        max_staleness (str | None, optional): Age after which a factor value is no longer used.
+            Defaults to no limit.
+        timestamp_column (str, optional): Name of the bar timestamp column. Defaults to
+            "end_dtutc".
+        date_column (str, optional): Name of the factor date column. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column in both frames.
+            Defaults to "fid".
+        factor_columns (Sequence[str] | None, optional): Factor columns to attach. Defaults to
+            every factor column other than the date and instrument.
+        presorted (bool, optional): Whether the bars are already ordered by timestamp. Defaults
+            to False.
+
+    Returns:
+        pl.LazyFrame: The bars in timestamp order with the point-in-time factor values.
+    """
+    bars = bars.lazy()
+    factors = factors.lazy()
+    bar_schema = bars.collect_schema()
+    if factor_columns is None:
+        factor_columns = [
+            column
+            for column in factors.collect_schema().names()
+            if column not in (date_column, fid_column)
+        ]
+
+    known_at = pl.col(date_column).cast(bar_schema[timestamp_column])
+    if publication_lag is not None:
+        known_at = known_at.dt.offset_by(publication_lag)
+    aligned = (bars if presorted else bars.sort(timestamp_column)).join_asof(
+        factors.select(
+            # Match the bars' instrument ID type, e.g. compact UInt32 IDs.
+            pl.col(fid_column).cast(bar_schema[fid_column]),
+            known_at.alias("_known_at"),
+            *factor_columns,
+        ).sort("_known_at"),
+        left_on=timestamp_column,
+        right_on="_known_at",
+        by=fid_column,
+        strategy="backward",
+        check_sortedness=False,
+    )
+    if max_staleness is not None:
+        fresh = pl.col(timestamp_column) <= pl.col("_known_at").dt.offset_by(
+            max_staleness
+        )
+        aligned = aligned.with_columns(
+            pl.when(fresh).then(pl.col(column)).alias(column)
+            for column in factor_columns
+        )
+    return aligned.drop("_known_at")
+
+
+def _with_date_index(
+    factors: pl.LazyFrame | pl.DataFrame,
+    lags: Sequence[int],
+    since: date | None,
+    date_column: str,
+) -> pl.LazyFrame:
+    """Number the dates in order and keep only those needed for dates from ``since`` onward."""
+    if not lags or min(lags) < 1:
+        raise ValueError(f"lags must be at least 1, got {list(lags)}.")
+
+    factors = factors.lazy()
+    dates = (
+        factors.select(date_column)
+        .unique()
+        .sort(date_column)
+        .with_row_index("_date_index")
+    )
+    if since is not None:
+        first_index = dates.filter(pl.col(date_column) >= since).select(
+            pl.col("_date_index").min().alias("_first_index")
+        )
+        dates = (
+            dates.join(first_index, how="cross")
+            .filter(pl.col("_date_index") + max(lags) >= pl.col("_first_index"))
+            .drop("_first_index")
+        )
+    return factors.join(dates, on=date_column, how="inner")
+
+
+def _lagged(
+    frame: pl.LazyFrame, lags: Sequence[int], keys: list[str], column: str
+) -> pl.LazyFrame:
+    """``column`` of every cross-section keyed by the date index it is ``lag`` dates behind."""
+    return pl.concat(
+        frame.select(
+            *keys,
+            (pl.col("_date_index") + lag).cast(pl.UInt32).alias("_date_index"),
+            pl.lit(lag, dtype=pl.UInt32).alias("lag"),
+            pl.col(column).alias(f"_previous_{column}"),
+        )
+        for lag in lags
+    )
+
+
+def _since(frame: pl.LazyFrame, since: date | None, date_column: str) -> pl.LazyFrame:
+    return frame if since is None else frame.filter(pl.col(date_column) >= since)
+
+
 def _get_factor_asset_permutations(
     factors: list[str], assets: list[str]
 ) -> list[FactorAssetPair]:
@@ -1,6 +1,11 @@
+from typing import Literal
+
+import numpy as np
 import polars as pl
 import polars.selectors as cs
 
+from pqf.research._numba import ROLLING_STATISTICS, rolling_statistics_kernel
+
 
 def sharpe_ratio(
     returns: pl.Series | pl.Expr, risk_free_rate: float
@@ -57,15 +62,128 @@ def estimate_market_returns(
     )
 
 
-def annualized_returns(returns: pl.Series | pl.Expr) -> pl.Series | pl.Expr | None:
+def market_returns(
+    returns: pl.LazyFrame | pl.DataFrame,
+    weighting: Literal["equal", "cap", "custom"] = "equal",
+    constituents: pl.LazyFrame | pl.DataFrame | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    return_column: str = "return",
+    weight_column: str = "market_cap",
+) -> pl.LazyFrame | pl.DataFrame:
+    """Estimate market returns from long-format constituent returns.
+
+    This is the long-format counterpart of ``estimate_market_returns``: returns are given as one
+    row per date and instrument, so instruments that are not listed on a date simply have no row
+    and no dense date by instrument matrix is built. The market return of a date is the weighted
+    mean of the simple returns of that date's constituents, computed in one grouped sum.
+
+    Weighting:
+        - "equal": every constituent with a return has the same weight.
+        - "cap": weights are ``weight_column`` (market capitalisation) of the instrument's
+          previous row, so that a return is weighted by the capitalisation it was earned on.
+        - "custom": weights are ``weight_column`` of the same row, as given.
+
+    Point-in-time membership is given by ``constituents``, one row per membership interval:
+        fid_column | start | end
+    where ``end`` is inclusive and null for current members. Intervals of the same instrument
+    must not overlap. Without ``constituents`` every instrument with a return is included.
+
+    Expected output takes the form of
+        date_column | market_return | constituents
+
+    Args:
+        returns (pl.LazyFrame | pl.DataFrame): Long-format simple returns (and weights).
+        weighting (Literal["equal", "cap", "custom"], optional): Weighting scheme. Defaults to "equal".
+        constituents (pl.LazyFrame | pl.DataFrame | None, optional): Membership intervals. Defaults
+            to every instrument.
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        fid_column (str, optional): Name of the financial instrument ID column. Defaults to "fid".
+        return_column (str, optional): Name of the return column. Defaults to "return".
+        weight_column (str, optional): Name of the weight column for "cap" and "custom"
+            weighting. Defaults to "market_cap".
+
+    Raises:
+        ValueError: If weighting is not "equal", "cap" or "custom".
+
+    Returns:
+        pl.LazyFrame | pl.DataFrame: The market return and number of weighted constituents per
+            date, sorted by date, of the same type as ``returns``.
+    """
+    if weighting not in ("equal", "cap", "custom"):
+        raise ValueError(
+            f"weighting must be 'equal', 'cap' or 'custom', got {weighting!r}."
+        )
+
+    constituent_returns = returns.lazy()
+    if weighting == "equal":
+        weight = pl.lit(1.0)
+    elif weighting == "cap":
+        constituent_returns = constituent_returns.sort(
+            fid_column, date_column
+        ).with_columns(pl.col(weight_column).shift(1).over(fid_column).alias("_weight"))
+        weight = pl.col("_weight")
+    else:
+        weight = pl.col(weight_column)
+
+    if constituents is not None:
+        schema = constituent_returns.collect_schema()
+        # Match every row to the membership interval of its instrument that started last, and
+        # keep it if that interval has not ended yet.
+        constituent_returns = (
+            constituent_returns.sort(date_column)
+            .join_asof(
+                constituents.lazy()
+                .select(
+                    pl.col(fid_column).cast(schema[fid_column]),
+                    pl.col("start").cast(schema[date_column]),
+                    pl.col("end").cast(schema[date_column]),
+                )
+                .sort("start"),
+                left_on=date_column,
+                right_on="start",
+                by=fid_column,
+                strategy="backward",
+                check_sortedness=False,
+            )
+            .filter(
+                pl.col("start").is_not_null(),
+                pl.col("end").is_null() | (pl.col(date_column) <= pl.col("end")),
+            )
+        )
+
+    simple_return = pl.col(return_column)
+    weight = pl.when(simple_return.is_not_null()).then(weight)
+    market = (
+        constituent_returns.group_by(date_column)
+        .agg(
+            ((weight * simple_return).sum() / weight.sum())
+            .fill_nan(None)
+            .alias("market_return"),
+            weight.count().alias("constituents"),
+        )
+        .sort(date_column)
+    )
+    return market if isinstance(returns, pl.LazyFrame) else market.collect()
+
+
+def annualized_returns(
+    returns: pl.Series | pl.Expr, expanding: bool = False
+) -> pl.Series | pl.Expr | None:
     """
     Calculate the annualized return from a series of daily log returns.
 
     The annualized return is calculated using the formula:
         e^(sum of log returns * 365 / period of days) - 1
 
+    By default every cumulative sum is annualized with the length of the whole series, so only
+    the last value is the annualized return of the series. With ``expanding``, each value is
+    annualized with the number of returns up to that point, giving the annualized return of
+    every expanding window.
+
     Args:
         returns (pl.Series | pl.Expr): Series or expression representing daily log returns.
+        expanding (bool, optional): Annualize each cumulative sum with its own period. Defaults to False.
 
     Returns:
         pl.Series | pl.Expr | None: A series of the cumulative annualized returns or None if not calculable.
@@ -78,13 +196,156 @@ def annualized_returns(returns: pl.Series | pl.Expr) -> pl.Series | pl.Expr | No
 
         cumulative_log_returns = returns.cum_sum()
 
-        annualization_factor = 365 / period
+        annualization_factor = 365 / (returns.cum_count() if expanding else period)
         annualized = (cumulative_log_returns * annualization_factor).exp() - 1
 
     else:
-        period_expr = returns.count()
+        period_expr = returns.cum_count() if expanding else returns.count()
         annualized = (
             returns.cum_sum().mul(pl.lit(365).truediv(period_expr)).exp().sub(1)
         )
 
     return annualized
+
+
+def rolling_statistics(
+    returns: pl.LazyFrame | pl.DataFrame,
+    window_size: int | None,
+    by: str = "strategy_id",
+    date_column: str = "date",
+    return_column: str = "return",
+    min_periods: int | None = None,
+    periods_per_year: float = 252,
+    risk_free_rate: float = 0.0,
+) -> pl.DataFrame:
+    """Rolling or expanding performance statistics of many return streams in one call.
+
+    Returns are periodic log returns in long format, one row per stream and date:
+        by | date_column | return_column
+
+    Every stream is processed in a single pass by a parallel Numba kernel that updates the
+    window's mean and variance with Welford's algorithm. The following columns are added:
+    ``annualized_return`` (``e^(mean * periods_per_year) - 1``), ``volatility`` (annualized
+    standard deviation), ``sharpe_ratio`` and ``sortino_ratio`` (annualized, of returns in excess
+    of ``risk_free_rate``), ``max_drawdown`` (largest fractional loss from a peak, measured from
+    the wealth at the start of the window) and ``calmar_ratio`` (annualized return over max
+    drawdown). Missing returns are skipped and leave wealth unchanged.
+
+    Args:
+        returns (pl.LazyFrame | pl.DataFrame): Long-format log returns of every stream.
+        window_size (int | None): Number of periods in the rolling window, or None for expanding
+            statistics over all periods so far.
+        by (str, optional): Name of the stream ID column. Defaults to "strategy_id".
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        return_column (str, optional): Name of the return column. Defaults to "return".
+        min_periods (int | None, optional): Number of returns required in the window for a
+            value. Defaults to the window size, or 2 for expanding statistics.
+        periods_per_year (float, optional): Number of periods per year. Defaults to 252.
+        risk_free_rate (float, optional): Risk-free log return per period. Defaults to 0.0.
+
+    Raises:
+        ValueError: If window_size or min_periods is smaller than 1.
+
+    Returns:
+        pl.DataFrame: The stream ID, date and return with the statistics, sorted by stream and
+            date. Statistics are null until ``min_periods`` returns are in the window, and where
+            undefined, e.g. the Sharpe ratio of constant returns.
+    """
+    if window_size is not None and window_size < 1:
+        raise ValueError(f"window_size must be at least 1, got {window_size}.")
+    if min_periods is None:
+        min_periods = 2 if window_size is None else window_size
+    if min_periods < 1:
+        raise ValueError(f"min_periods must be at least 1, got {min_periods}.")
+
+    frame = (
+        returns.lazy()
+        .select(by, date_column, pl.col(return_column).cast(pl.Float64))
+        .sort(by, date_column)
+        .collect()
+    )
+    values = frame[return_column].to_numpy()
+    stream_lengths = frame.group_by(by, maintain_order=True).len()["len"]
+    offsets = np.zeros(stream_lengths.len() + 1, dtype=np.int64)
+    offsets[1:] = stream_lengths.cum_sum().to_numpy()
+    statistics = rolling_statistics_kernel(
+        values,
+        offsets,
+        frame.height if window_size is None else window_size,
+        min_periods,
+        float(periods_per_year),
+        risk_free_rate,
+    )
+    return frame.with_columns(
+        pl.Series(name, column, nan_to_null=True)
+        for name, column in zip(ROLLING_STATISTICS, statistics, strict=True)
+    )
+
+
+def summary_stats(
+    returns: pl.LazyFrame | pl.DataFrame,
+    by: str = "strategy_id",
+    date_column: str = "date",
+    return_column: str = "return",
+    periods_per_year: float = 252,
+    risk_free_rate: float = 0.0,
+) -> pl.LazyFrame | pl.DataFrame:
+    """Tearsheet statistics of every return stream in one grouped query.
+
+    Returns are periodic log returns in long format, as for ``rolling_statistics``, whose
+    definitions the full-sample statistics follow:
+        by | date_column | return_column
+
+    The output has one row per stream with ``count`` (number of returns), ``annualized_return``,
+    ``volatility``, ``sharpe_ratio``, ``sortino_ratio``, ``skew``, ``kurtosis`` (excess),
+    ``max_drawdown`` (largest fractional loss from a peak) and ``max_drawdown_duration`` (longest
+    number of periods spent below a previous peak, including an unrecovered final drawdown).
+
+    Args:
+        returns (pl.LazyFrame | pl.DataFrame): Long-format log returns of every stream.
+        by (str, optional): Name of the stream ID column. Defaults to "strategy_id".
+        date_column (str, optional): Name of the date column. Defaults to "date".
+        return_column (str, optional): Name of the return column. Defaults to "return".
+        periods_per_year (float, optional): Number of periods per year. Defaults to 252.
+        risk_free_rate (float, optional): Risk-free log return per period. Defaults to 0.0.
+
+    Returns:
+        pl.LazyFrame | pl.DataFrame: One row of statistics per stream, sorted by stream ID, of
+            the same type as ``returns``.
+    """
+    log_return = pl.col(return_column).cast(pl.Float64)
+    excess = log_return - risk_free_rate
+    mean = excess.mean()
+    std = excess.std()
+    semi_deviation = excess.clip(upper_bound=0.0).pow(2).mean().sqrt()
+    annualization = periods_per_year**0.5
+
+    # Log wealth relative to the start, where the first peak is the initial wealth of zero.
+    wealth = log_return.fill_null(0.0).cum_sum()
+    drawdown = pl.max_horizontal(wealth.cum_max(), pl.lit(0.0)) - wealth
+    period = pl.int_range(pl.len())
+    last_peak = pl.when(drawdown <= 0).then(period).forward_fill().fill_null(-1)
+
+    summary = (
+        returns.lazy()
+        .sort(by, date_column)
+        .group_by(by, maintain_order=True)
+        .agg(
+            log_return.count().alias("count"),
+            ((mean + risk_free_rate) * periods_per_year)
+            .exp()
+            .sub(1.0)
+            .alias("annualized_return"),
+            (std * annualization).alias("volatility"),
+            pl.when(std > 0).then(mean / std * annualization).alias("sharpe_ratio"),
+            pl.when(semi_deviation > 0)
+            .then(mean / semi_deviation * annualization)
+            .alias("sortino_ratio"),
+            log_return.skew().alias("skew"),
+            log_return.kurtosis().alias("kurtosis"),
+            (1.0 - (-drawdown.max()).exp()).alias("max_drawdown"),
+            (period - last_peak).max().alias("max_drawdown_duration"),
+        )
+        .with_columns(cs.float().fill_nan(None))
+    )
+    return summary if isinstance(returns, pl.LazyFrame) else summary.collect()
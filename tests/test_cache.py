@@ -0,0 +1,144 @@
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.cache import CacheStats, ResultCache, fingerprint
+from pqf.pricing.core import PricingData
+
+BARS = pl.DataFrame(
+    {
+        "trade_date": [date(2025, 1, 1)] * 4,
+        "end_dtutc": pl.Series(
+            [datetime(2025, 1, 1, 0, minute) for minute in range(4)],
+            dtype=pl.Datetime("ns"),
+        ),
+        "fid": [1, 1, 1, 1],
+        "symbol": ["BTC"] * 4,
+        "open": [100.0, 101.0, 102.0, 103.0],
+        "high": [101.0, 102.0, 103.0, 104.0],
+        "low": [99.0, 100.0, 101.0, 102.0],
+        "close": [101.0, 102.0, 103.0, 104.0],
+        "volume": [10.0, 20.0, 30.0, 40.0],
+    }
+)
+
+
+class TestResultCache:
+    def setup_method(self):
+        self.calls = 0
+
+    def scale(self, frame: pl.DataFrame, factor: float = 2.0) -> pl.DataFrame:
+        self.calls += 1
+        return frame.select(pl.col("close") * factor)
+
+    def test_memoize_computes_each_result_once(self, tmp_path: Path):
+        cache = ResultCache(tmp_path)
+        scale = cache.memoize(self.scale)
+
+        first = scale(BARS)
+        second = scale(BARS, 2.0)
+
+        assert self.calls == 1
+        plt.assert_frame_equal(first, second)
+        assert cache.stats == CacheStats(hits=1, misses=1, evictions=0)
+        assert cache.stats.hit_rate == 0.5
+
+    def test_arguments_and_data_are_part_of_the_key(self, tmp_path: Path):
+        scale = ResultCache(tmp_path).memoize(self.scale)
+
+        scale(BARS)
+        scale(BARS, 3.0)
+        scale(BARS.with_columns(pl.col("close") + 1))
+
+        assert self.calls == 3
+
+    def test_results_persist_across_instances(self, tmp_path: Path):
+        ResultCache(tmp_path).memoize(self.scale)(BARS)
+        cache = ResultCache(tmp_path)
+
+        result = cache.memoize(self.scale)(BARS)
+
+        assert self.calls == 1
+        assert cache.stats.hits == 1
+        plt.assert_series_equal(result["close"], BARS["close"] * 2.0)
+
+    def test_lazy_results_are_returned_lazily(self, tmp_path: Path):
+        cache = ResultCache(tmp_path)
+        forward_returns = cache.memoize(PricingData.get_forward_returns)
+        pricing_data = PricingData(BARS)
+
+        computed = forward_returns(pricing_data, [1])
+        cached = forward_returns(PricingData(BARS), [1])
+
+        assert isinstance(computed, pl.LazyFrame)
+        assert isinstance(cached, pl.LazyFrame)
+        plt.assert_frame_equal(cached, pricing_data.get_forward_returns([1]))
+        assert cache.stats.hits == 1
+
+    def test_modified_parquet_source_invalidates(self, tmp_path: Path):
+        source = tmp_path / "bars.parquet"
+        BARS.write_parquet(source)
+        cache = ResultCache(tmp_path / "cache")
+        forward_returns = cache.memoize(PricingData.get_forward_returns)
+
+        forward_returns(PricingData.from_parquet(source), [1])
+        forward_returns(PricingData.from_parquet(source), [1])
+        BARS.with_columns(pl.col("close") * 2).write_parquet(source)
+        os.utime(source, ns=(0, 10**18))
+        forward_returns(PricingData.from_parquet(source), [1])
+
+        assert cache.stats == CacheStats(hits=1, misses=2, evictions=0)
+
+    def test_least_recently_used_results_are_evicted(self, tmp_path: Path):
+        cache = ResultCache(tmp_path)
+        frame = pl.DataFrame({"value": range(1_000)})
+        cache.put("a", frame)
+        entry_size = cache.size
+        cache.max_bytes = 2 * entry_size
+        cache.put("b", frame)
+        os.utime(tmp_path / "a.arrow", ns=(0, 0))
+        os.utime(tmp_path / "b.arrow", ns=(0, 1))
+        cache.get("a")
+
+        cache.put("c", frame)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats.evictions == 1
+        assert cache.size <= cache.max_bytes
+
+    def test_non_frame_results_raise(self, tmp_path: Path):
+        count = ResultCache(tmp_path).memoize(lambda frame: frame.height)
+        with pytest.raises(TypeError):
+            count(BARS)
+
+    def test_clear(self, tmp_path: Path):
+        cache = ResultCache(tmp_path)
+        cache.put("a", BARS)
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+
+class TestFingerprint:
+    def test_equal_content_gives_equal_fingerprints(self):
+        assert fingerprint(BARS) == fingerprint(BARS.clone())
+        assert fingerprint([1, "a", {"b": 2.0}]) == fingerprint([1, "a", {"b": 2.0}])
+        assert fingerprint(pl.col("close").rank()) == fingerprint(
+            pl.col("close").rank()
+        )
+
+    def test_different_content_gives_different_fingerprints(self):
+        assert fingerprint(BARS) != fingerprint(BARS.reverse())
+        assert fingerprint(BARS.lazy().head(2)) != fingerprint(BARS.lazy().head(3))
+        assert fingerprint(1) != fingerprint(1.0)
+        assert fingerprint((1, 2)) != fingerprint([1, 2])
+
+    def test_unsupported_values_raise(self):
+        with pytest.raises(TypeError):
+            fingerprint(object())
@@ -0,0 +1,266 @@
+from datetime import date, datetime, time, timedelta
+
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.pricing.calendar import (
+    align_to_calendar,
+    gap_statistics,
+    session_calendar,
+    sink_aligned_bars,
+)
+from pqf.pricing.core import PricingData
+
+
+def make_bars() -> pl.DataFrame:
+    """Five one-minute bars per session on two trade dates, with gaps and one off-grid bar.
+
+    fid 1 misses the first bar of Jan 3, fid 2 misses the 2nd and 3rd bars of Jan 2, and fid 1
+    has an extra bar at 14:31:30 on Jan 2.
+    """
+    rows = []
+    for day in (2, 3):
+        for minute in range(1, 6):
+            for fid in (1, 2):
+                if (fid == 1 and day == 3 and minute == 1) or (
+                    fid == 2 and day == 2 and minute in (2, 3)
+                ):
+                    continue
+                price = 10.0 * day + minute + fid
+                rows.append(
+                    (
+                        date(2025, 1, day),
+                        datetime(2025, 1, day, 14, 30 + minute),
+                        fid,
+                        f"S{fid}",
+                        price,
+                        price,
+                        price,
+                        price,
+                        100.0,
+                    )
+                )
+    rows.append(
+        (
+            date(2025, 1, 2),
+            datetime(2025, 1, 2, 14, 31, 30),
+            1,
+            "S1",
+            1.0,
+            1.0,
+            1.0,
+            1.0,
+            1.0,
+        )
+    )
+    schema = [
+        "trade_date",
+        "end_dtutc",
+        "fid",
+        "symbol",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+    ]
+    return pl.DataFrame(rows, schema=schema, orient="row").with_columns(
+        pl.col("end_dtutc").dt.cast_time_unit("ns")
+    )
+
+
+class TestAlignToCalendar:
+    def test_every_instrument_is_on_the_grid(self):
+        aligned = align_to_calendar(
+            PricingData(make_bars(), lazy=False), grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(aligned, pl.DataFrame)
+        assert aligned.height == 2 * 2 * 5
+        assert aligned.group_by("fid").len().sort("fid")["len"].to_list() == [10, 10]
+        assert aligned.filter(
+            pl.col("end_dtutc") == datetime(2025, 1, 2, 14, 31, 30)
+        ).is_empty()
+        gaps = aligned.filter("is_gap")
+        assert gaps.select("fid", pl.col("end_dtutc").dt.minute()).rows() == [
+            (2, 32),
+            (2, 33),
+            (1, 31),
+        ]
+
+    def test_forward_fill_repeats_the_last_close(self):
+        aligned = align_to_calendar(
+            PricingData(make_bars(), lazy=False), grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(aligned, pl.DataFrame)
+        gaps = aligned.filter("is_gap")
+        # fid 2 carries its 14:31 close of 23, fid 1 carries the previous session's last close of 26.
+        plt.assert_series_equal(gaps["open"], pl.Series("open", [23.0, 23.0, 26.0]))
+        plt.assert_series_equal(gaps["close"], pl.Series("close", [23.0, 23.0, 26.0]))
+        plt.assert_series_equal(gaps["volume"], pl.Series("volume", [0.0, 0.0, 0.0]))
+        assert gaps["symbol"].to_list() == ["S2", "S2", "S1"]
+
+    def test_null_fill_is_lazy(self):
+        aligned = align_to_calendar(
+            PricingData(make_bars().lazy()), fill="null", grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(aligned, pl.LazyFrame)
+        gaps = aligned.filter("is_gap").collect()
+        assert gaps.height == 3
+        assert gaps["close"].is_null().all()
+        assert gaps["symbol"].is_not_null().all()
+
+    def test_instruments_are_only_aligned_while_listed(self):
+        bars = make_bars().filter(
+            (pl.col("fid") == 1) | (pl.col("trade_date") == date(2025, 1, 3))
+        )
+
+        aligned = align_to_calendar(
+            PricingData(bars, lazy=False), grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(aligned, pl.DataFrame)
+        assert aligned.filter(pl.col("fid") == 2)["trade_date"].unique().to_list() == [
+            date(2025, 1, 3)
+        ]
+
+    def test_explicit_sessions(self):
+        sessions = session_calendar([date(2025, 1, 2)], time(14, 30), time(14, 37))
+
+        aligned = align_to_calendar(
+            PricingData(make_bars(), lazy=False),
+            sessions=sessions,
+            grain=timedelta(minutes=1),
+        )
+
+        assert isinstance(aligned, pl.DataFrame)
+        assert aligned.height == 2 * 7
+        assert aligned.filter("is_gap").height == 2 * 2 + 2
+
+    def test_compact_bars(self):
+        grain = timedelta(minutes=1)
+        compact = PricingData(
+            make_bars(), lazy=False, compact=True, volume_dtype=pl.Float32
+        )
+
+        aligned = align_to_calendar(compact, grain=grain)
+
+        assert aligned.collect_schema()["volume"] == pl.Float32
+        plt.assert_frame_equal(
+            aligned,
+            align_to_calendar(PricingData(make_bars(), lazy=False), grain=grain),
+            check_dtypes=False,
+        )
+
+    def test_invalid_fill_raises(self):
+        with pytest.raises(ValueError, match="fill"):
+            align_to_calendar(PricingData(make_bars(), lazy=False), fill="backward")  # type: ignore
+
+
+class TestGapStatistics:
+    def test_counts_missing_and_off_grid_bars(self):
+        statistics = gap_statistics(
+            PricingData(make_bars(), lazy=False), grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(statistics, pl.DataFrame)
+        assert statistics.columns == [
+            "fid",
+            "expected_bars",
+            "missing_bars",
+            "off_grid_bars",
+            "coverage",
+            "longest_gap",
+        ]
+        assert statistics.drop("coverage").rows() == [
+            (1, 10, 1, 1, 1),
+            (2, 10, 2, 0, 2),
+        ]
+        plt.assert_series_equal(
+            statistics["coverage"], pl.Series("coverage", [0.9, 0.8])
+        )
+
+    def test_gaps_do_not_span_sessions(self):
+        # fid 1 misses the last bar of Jan 2 and the first bar of Jan 3.
+        bars = make_bars().filter(
+            (pl.col("fid") != 1) | (pl.col("end_dtutc") != datetime(2025, 1, 2, 14, 35))
+        )
+
+        statistics = gap_statistics(
+            PricingData(bars.lazy()), grain=timedelta(minutes=1)
+        )
+
+        assert isinstance(statistics, pl.LazyFrame)
+        assert (
+            statistics.collect().filter(pl.col("fid") == 1)["longest_gap"].item() == 1
+        )
+
+
+class TestSinkAlignedBars:
+    @pytest.mark.parametrize("fill", ["forward", "null"])
+    def test_chunks_match_align_to_calendar(self, tmp_path, fill):
+        pricing_data = PricingData(make_bars(), lazy=False)
+
+        sunk = sink_aligned_bars(
+            pricing_data,
+            tmp_path,
+            fill=fill,
+            grain=timedelta(minutes=1),
+            trade_dates_per_chunk=1,
+        )
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "part-00000.parquet",
+            "part-00001.parquet",
+        ]
+        plt.assert_frame_equal(
+            sunk.collect().sort("trade_date", "end_dtutc", "fid"),
+            align_to_calendar(pricing_data, fill=fill, grain=timedelta(minutes=1)),
+        )
+
+    def test_refuses_a_non_empty_directory(self, tmp_path):
+        pricing_data = PricingData(make_bars(), lazy=False)
+        sink_aligned_bars(pricing_data, tmp_path, grain=timedelta(minutes=1))
+
+        with pytest.raises(ValueError, match="empty"):
+            sink_aligned_bars(pricing_data, tmp_path, grain=timedelta(minutes=1))
+
+    def test_empty_calendar_writes_an_empty_part(self, tmp_path):
+        pricing_data = PricingData(make_bars(), lazy=False)
+        sessions = session_calendar([], time(14, 30), time(14, 35))
+        expected = align_to_calendar(pricing_data, grain=timedelta(minutes=1))
+
+        sunk = sink_aligned_bars(
+            pricing_data, tmp_path, sessions=sessions, grain=timedelta(minutes=1)
+        ).collect()
+
+        assert sunk.is_empty()
+        assert sunk.schema == expected.collect_schema()
+
+    def test_invalid_chunk_size_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="trade_dates_per_chunk"):
+            sink_aligned_bars(
+                PricingData(make_bars(), lazy=False), tmp_path, trade_dates_per_chunk=0
+            )
+
+
+class TestSessionCalendar:
+    def test_converts_local_session_hours_to_utc(self):
+        calendar = session_calendar(
+            [date(2025, 1, 2), date(2025, 7, 2)],
+            time(9, 30),
+            time(16, 0),
+            "America/New_York",
+        )
+
+        assert calendar["session_open"].to_list() == [
+            datetime(2025, 1, 2, 14, 30),
+            datetime(2025, 7, 2, 13, 30),
+        ]
+        assert calendar["session_close"].to_list() == [
+            datetime(2025, 1, 2, 21),
+            datetime(2025, 7, 2, 20),
+        ]
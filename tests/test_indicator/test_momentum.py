@@ -1,5 +1,7 @@
+import numpy as np
 import polars as pl
 import polars.testing as plt
+import pytest
 
 from pqf.indicator.momentum import macd, rsi
 from pqf.indicator.util import apply_expr_to_series
@@ -106,3 +108,37 @@ class TestMacd:
         plt.assert_series_equal(
             result, pl.Series([0.0000, 0.0638, 0.1641, 0.2817, 0.4033]), atol=0.001
         )
+
+
+class TestNumbaBackend:
+    def setup_method(self):
+        rng = np.random.default_rng(7)
+        self.prices = pl.Series("close", 100 + rng.standard_normal(2000).cumsum())
+        self.prices_with_nulls = self.prices.scatter([0, 1, 500, 501, 1999], None)
+
+    def test_rsi_numba_matches_polars(self):
+        for prices in (self.prices, self.prices_with_nulls):
+            plt.assert_series_equal(
+                rsi(prices, 14, backend="numba"), rsi(prices, 14), rel_tol=1e-9
+            )
+
+    def test_rsi_numba_keeps_nan_for_flat_prices(self):
+        prices = pl.Series([1.0] * 10 + [2.0, 2.0, 1.0])
+        plt.assert_series_equal(rsi(prices, 5, backend="numba"), rsi(prices, 5))
+
+    def test_macd_numba_matches_polars(self):
+        for prices in (self.prices, self.prices_with_nulls):
+            plt.assert_series_equal(
+                macd(prices, backend="numba"), macd(prices), rel_tol=1e-9, abs_tol=1e-12
+            )
+
+    def test_numba_backend_over_expr(self):
+        frame = self.prices.to_frame()
+        result = frame.select(
+            rsi(pl.col("close"), 14, backend="numba"),
+        ).to_series()
+        plt.assert_series_equal(result, rsi(self.prices, 14), rel_tol=1e-9)
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            rsi(self.prices, 14, backend="cuda")
@@ -1,3 +1,4 @@
+import numpy as np
 import polars as pl
 import polars.testing as plt
 
@@ -46,3 +47,35 @@ class TestMovingAverage:
             result = prices.to_frame().select(expression).to_series()
 
             plt.assert_series_equal(result, expected_result)
+
+
+class TestNumbaBackend:
+    def setup_method(self):
+        rng = np.random.default_rng(11)
+        prices = pl.Series("close", 100 + rng.standard_normal(2000).cumsum())
+        self.prices = prices
+        self.prices_with_nulls = prices.scatter([0, 3, 4, 1000], None)
+
+    def test_simple_moving_average_numba_matches_polars(self):
+        for prices in (self.prices, self.prices_with_nulls):
+            plt.assert_series_equal(
+                simple_moving_average(prices, 20, backend="numba"),
+                simple_moving_average(prices, 20),
+                rel_tol=1e-9,
+            )
+
+    def test_exponential_moving_average_numba_matches_polars(self):
+        for prices in (self.prices, self.prices_with_nulls):
+            plt.assert_series_equal(
+                exponential_moving_average(prices, 20, backend="numba"),
+                exponential_moving_average(prices, 20),
+                rel_tol=1e-9,
+            )
+
+    def test_exponential_moving_average_numba_over_expr(self):
+        prices = pl.Series([1, 2, 3, 4, 5], dtype=pl.Float64)
+        expected_result = pl.Series([1, 1.5, 2.25, 3.125, 4.0625], dtype=pl.Float64)
+        expression = exponential_moving_average(pl.all(), 3, backend="numba")
+        result = prices.to_frame().select(expression).to_series()
+
+        plt.assert_series_equal(result, expected_result)
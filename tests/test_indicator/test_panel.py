@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import polars as pl
+import polars.testing as plt
+
+from pqf.indicator.momentum import macd, rsi
+from pqf.indicator.moving_average import simple_moving_average
+from pqf.indicator.panel import compute_indicators
+from pqf.pricing.core import PricingData
+
+
+def make_pricing_data(lazy: bool) -> PricingData:
+    rng = np.random.default_rng(3)
+    n_bars = 200
+    frames = []
+    for fid, start_price in ((1, 100.0), (2, 20.0), (3, 5.0)):
+        frames.append(
+            pl.DataFrame(
+                {
+                    "trade_date": [date(2025, 1, 2)] * n_bars,
+                    "end_dtutc": [
+                        datetime(2025, 1, 2, 14, 30) + timedelta(minutes=i)
+                        for i in range(n_bars)
+                    ],
+                    "fid": [fid] * n_bars,
+                    "symbol": [f"S{fid}"] * n_bars,
+                    "open": start_price + rng.standard_normal(n_bars).cumsum(),
+                    "volume": [1.0] * n_bars,
+                }
+            )
+        )
+    bars = (
+        pl.concat(frames)
+        .with_columns(
+            pl.col("end_dtutc").dt.cast_time_unit("ns"),
+            pl.col("open").alias("high"),
+            pl.col("open").alias("low"),
+            pl.col("open").alias("close"),
+        )
+        .sample(fraction=1.0, shuffle=True, seed=1)
+    )
+    return PricingData(bars.lazy() if lazy else bars, lazy=lazy)
+
+
+class TestComputeIndicators:
+    def test_indicators_match_per_instrument_loop(self):
+        pricing_data = make_pricing_data(lazy=False)
+        result = compute_indicators(
+            pricing_data,
+            {
+                "rsi_14": rsi(pl.col("close"), 14),
+                "macd": macd(pl.col("close")),
+                "sma_5": simple_moving_average(pl.col("close"), 5),
+            },
+        )
+
+        assert isinstance(result, pl.DataFrame)
+        all_bars = pricing_data.get_bars()
+        assert isinstance(all_bars, pl.DataFrame)
+        for (fid,), bars in all_bars.partition_by("fid", as_dict=True).items():
+            close = bars.sort("end_dtutc")["close"]
+            expected = result.filter(pl.col("fid") == fid)
+            plt.assert_series_equal(
+                expected["rsi_14"], rsi(close, 14), check_names=False
+            )
+            plt.assert_series_equal(expected["macd"], macd(close), check_names=False)
+            plt.assert_series_equal(
+                expected["sma_5"], simple_moving_average(close, 5), check_names=False
+            )
+
+    def test_numba_backend_respects_instrument_boundaries(self):
+        pricing_data = make_pricing_data(lazy=True)
+        result = compute_indicators(
+            pricing_data,
+            {
+                "polars": macd(pl.col("close")),
+                "numba": macd(pl.col("close"), backend="numba"),
+            },
+        )
+
+        assert isinstance(result, pl.LazyFrame)
+        collected = result.collect()
+        plt.assert_series_equal(
+            collected["numba"], collected["polars"], check_names=False, abs_tol=1e-12
+        )
+
+    def test_warmup_masks_leading_bars_per_instrument(self):
+        pricing_data = make_pricing_data(lazy=False)
+        result = compute_indicators(
+            pricing_data,
+            {
+                "rsi_14": rsi(pl.col("close"), 14),
+                "sma_5": simple_moving_average(pl.col("close"), 5),
+            },
+            warmup={"rsi_14": 14},
+        )
+
+        assert isinstance(result, pl.DataFrame)
+        leading = result.group_by("fid").head(14)
+        assert leading["rsi_14"].null_count() == leading.height
+        assert leading["sma_5"].null_count() == 3 * 4
+        assert result["rsi_14"].null_count() == 3 * 14
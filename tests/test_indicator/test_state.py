@@ -0,0 +1,94 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from pqf.indicator.momentum import macd, rsi
+from pqf.indicator.moving_average import (
+    exponential_moving_average,
+    simple_moving_average,
+)
+from pqf.indicator.state import EMAState, MACDState, RSIState, SMAState
+
+STATES = {
+    "ema": (
+        lambda: EMAState(20),
+        lambda history: EMAState.from_history(history, 20),
+        lambda prices: exponential_moving_average(prices, 20, backend="numba"),
+    ),
+    "sma": (
+        lambda: SMAState(20),
+        lambda history: SMAState.from_history(history, 20),
+        lambda prices: simple_moving_average(prices, 20, backend="numba"),
+    ),
+    "rsi": (
+        lambda: RSIState(14),
+        lambda history: RSIState.from_history(history, 14),
+        lambda prices: rsi(prices, 14, backend="numba"),
+    ),
+    "macd": (
+        lambda: MACDState(),
+        lambda history: MACDState.from_history(history),
+        lambda prices: macd(prices, backend="numba"),
+    ),
+}
+
+
+def batch_values(series: pl.Series) -> np.ndarray:
+    return series.fill_null(np.nan).to_numpy()
+
+
+class TestIncrementalState:
+    def setup_method(self):
+        rng = np.random.default_rng(5)
+        prices = 100 + rng.standard_normal(600).cumsum()
+        prices[[0, 1, 250, 251]] = np.nan
+        self.prices = pl.Series("close", prices, nan_to_null=True)
+
+    @pytest.mark.parametrize("name", list(STATES))
+    def test_updates_are_bit_identical_to_batch(self, name):
+        new_state, _, batch = STATES[name]
+        state = new_state()
+
+        updates = np.array(
+            [
+                np.nan if value is None else value
+                for value in (state.update(price) for price in self.prices)
+            ]
+        )
+
+        np.testing.assert_array_equal(updates, batch_values(batch(self.prices)))
+
+    @pytest.mark.parametrize("name", list(STATES))
+    def test_seeded_state_continues_the_batch(self, name):
+        _, from_history, batch = STATES[name]
+        state = from_history(self.prices.head(400))
+
+        updates = [
+            state.update_batch(np.array([price]))[0]
+            for price in self.prices.tail(200).fill_null(np.nan)
+        ]
+
+        np.testing.assert_array_equal(
+            np.array(updates), batch_values(batch(self.prices))[400:]
+        )
+
+    @pytest.mark.parametrize("name", list(STATES))
+    def test_update_batch_is_vectorized_across_instruments(self, name):
+        _, from_history, batch = STATES[name]
+        rng = np.random.default_rng(9)
+        history = 50 + rng.standard_normal((300, 4)).cumsum(axis=0)
+
+        state = from_history(history[:299])
+        last = state.update_batch(history[299])
+
+        expected = [batch_values(batch(pl.Series(history[:, j])))[-1] for j in range(4)]
+        np.testing.assert_array_equal(last, np.array(expected))
+
+    def test_update_batch_rejects_wrong_width(self):
+        state = EMAState(10, n_instruments=3)
+        with pytest.raises(ValueError):
+            state.update_batch(np.array([1.0, 2.0]))
+
+    def test_states_use_slots(self):
+        with pytest.raises(AttributeError):
+            EMAState(10).unexpected = 1  # type: ignore
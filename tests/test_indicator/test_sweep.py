@@ -0,0 +1,123 @@
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.indicator.momentum import macd, rsi
+from pqf.indicator.moving_average import (
+    exponential_moving_average,
+    simple_moving_average,
+)
+from pqf.indicator.panel import compute_indicators
+from pqf.indicator.sweep import sweep_indicator
+
+from .test_panel import make_pricing_data
+
+
+def read_column(manifest: pl.DataFrame, column: str) -> pl.DataFrame:
+    path = manifest.filter(pl.col("column") == column)["path"].item()
+    return pl.read_parquet(path).select("end_dtutc", "fid", column)
+
+
+class TestSweepIndicator:
+    def test_macd_grid_matches_per_instrument_indicators(self, tmp_path):
+        pricing_data = make_pricing_data(lazy=False)
+        manifest = sweep_indicator(
+            pricing_data,
+            "macd",
+            {"slow_period": [26, 20], "fast_period": [12, 8], "signal_period": [9]},
+            tmp_path,
+            chunk_size=3,
+        )
+
+        assert manifest["column"].to_list() == [
+            "macd_20_8_9",
+            "macd_20_12_9",
+            "macd_26_8_9",
+            "macd_26_12_9",
+        ]
+        assert manifest["path"].n_unique() == 2
+        for slow_period, fast_period, signal_period, column, _ in manifest.iter_rows():
+            expected = compute_indicators(
+                pricing_data,
+                {
+                    column: macd(
+                        pl.col("close"), slow_period, fast_period, signal_period
+                    )
+                },
+            )
+            plt.assert_frame_equal(
+                read_column(manifest, column),
+                expected.drop("trade_date"),
+                check_exact=False,
+                abs_tol=1e-12,
+            )
+
+    def test_single_parameter_indicators(self, tmp_path):
+        pricing_data = make_pricing_data(lazy=True)
+        expected = compute_indicators(
+            pricing_data,
+            {
+                "rsi_14": rsi(pl.col("close"), 14),
+                "simple_moving_average_5": simple_moving_average(pl.col("close"), 5),
+                "exponential_moving_average_5": exponential_moving_average(
+                    pl.col("close"), 5
+                ),
+            },
+        )
+
+        assert isinstance(expected, pl.LazyFrame)
+        expected = expected.collect()
+        for indicator, parameter, column in (
+            ("rsi", "period", "rsi_14"),
+            ("simple_moving_average", "window_size", "simple_moving_average_5"),
+            (
+                "exponential_moving_average",
+                "window_size",
+                "exponential_moving_average_5",
+            ),
+        ):
+            manifest = sweep_indicator(
+                pricing_data, indicator, {parameter: [5, 14]}, tmp_path / indicator
+            )
+            plt.assert_series_equal(
+                read_column(manifest, column)[column],
+                expected[column],
+                check_exact=False,
+                abs_tol=1e-12,
+            )
+
+    def test_duplicate_grid_points_are_evaluated_once(self, tmp_path):
+        manifest = sweep_indicator(
+            make_pricing_data(lazy=False), "rsi", {"period": [14, 7, 14]}, tmp_path
+        )
+
+        assert manifest["column"].to_list() == ["rsi_7", "rsi_14"]
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "part-00000.parquet"
+        ]
+
+    def test_processes_write_identical_results(self, tmp_path):
+        pricing_data = make_pricing_data(lazy=False)
+        grid = {"slow_period": [26], "fast_period": [12, 8], "signal_period": [9, 5]}
+        single = sweep_indicator(
+            pricing_data, "macd", grid, tmp_path / "single", chunk_size=1
+        )
+        pooled = sweep_indicator(
+            pricing_data, "macd", grid, tmp_path / "pooled", chunk_size=1, processes=2
+        )
+
+        for column in single["column"]:
+            plt.assert_frame_equal(
+                read_column(pooled, column), read_column(single, column)
+            )
+
+    def test_invalid_arguments_raise(self, tmp_path):
+        pricing_data = make_pricing_data(lazy=False)
+        with pytest.raises(ValueError, match="indicator"):
+            sweep_indicator(pricing_data, "stochastic", {"period": [14]}, tmp_path)
+        with pytest.raises(ValueError, match="grid"):
+            sweep_indicator(pricing_data, "macd", {"slow_period": [26]}, tmp_path)
+        with pytest.raises(ValueError, match="processes"):
+            sweep_indicator(
+                pricing_data, "rsi", {"period": [14]}, tmp_path, processes=0
+            )
@@ -0,0 +1,217 @@
+import math
+from datetime import date, datetime, timedelta
+
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.order.fill import simulate_fills
+from pqf.pricing.core import PricingData
+
+
+def make_pricing_data(lazy: bool = False, **kwargs) -> PricingData:
+    start = datetime(2025, 1, 2, 14, 31)
+    bars = pl.DataFrame(
+        {
+            "trade_date": [date(2025, 1, 2)] * 6,
+            "end_dtutc": [start + timedelta(minutes=i) for i in range(3)] * 2,
+            "fid": [1, 1, 1, 2, 2, 2],
+            "symbol": ["A", "A", "A", "B", "B", "B"],
+            "open": [10.0, 11.0, 12.0, 50.0, 51.0, 52.0],
+            "high": [10.5, 11.5, 12.5, 50.5, 51.5, 52.5],
+            "low": [9.5, 10.5, 11.5, 49.5, 50.5, 51.5],
+            "close": [10.2, 11.2, 12.2, 50.2, 51.2, 52.2],
+            "volume": [100.0, 200.0, 300.0, 1_000.0, 1_000.0, 1_000.0],
+        }
+    ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+    return PricingData(bars.lazy() if lazy else bars, lazy=lazy, **kwargs)
+
+
+ORDERS = pl.DataFrame(
+    {
+        "timestamp": [
+            datetime(2025, 1, 2, 14, 32),
+            datetime(2025, 1, 2, 14, 31, 30),
+            datetime(2025, 1, 2, 14, 33),
+        ],
+        "fid": [2, 1, 1],
+        "quantity": [-500.0, 150.0, 10.0],
+    }
+)
+
+
+class TestSimulateFills:
+    def test_fills_at_next_bar_open_in_order_sequence(self):
+        result = simulate_fills(ORDERS, make_pricing_data())
+
+        assert isinstance(result, pl.DataFrame)
+        assert result.columns == [
+            "timestamp",
+            "fid",
+            "quantity",
+            "fill_timestamp",
+            "reference_price",
+            "filled_quantity",
+            "unfilled_quantity",
+            "execution_price",
+            "slippage_cost",
+        ]
+        # An order at a bar's timestamp fills in the following bar, never the same one.
+        plt.assert_series_equal(
+            result["fill_timestamp"],
+            pl.Series(
+                "fill_timestamp",
+                [datetime(2025, 1, 2, 14, 33), datetime(2025, 1, 2, 14, 32), None],
+            ),
+            check_dtypes=False,
+        )
+        plt.assert_series_equal(
+            result["reference_price"], pl.Series("reference_price", [52.0, 11.0, None])
+        )
+        plt.assert_series_equal(
+            result["filled_quantity"],
+            pl.Series("filled_quantity", [-500.0, 150.0, 0.0]),
+        )
+        plt.assert_series_equal(
+            result["unfilled_quantity"],
+            pl.Series("unfilled_quantity", [0.0, 0.0, 10.0]),
+        )
+        plt.assert_series_equal(
+            result["slippage_cost"], pl.Series("slippage_cost", [0.0, 0.0, None])
+        )
+
+    def test_vwap_uses_typical_price(self):
+        result = simulate_fills(ORDERS, make_pricing_data(), fill_price="vwap")
+
+        assert isinstance(result, pl.DataFrame)
+        expected = [(52.5 + 51.5 + 52.2) / 3, (11.5 + 10.5 + 11.2) / 3, None]
+        plt.assert_series_equal(
+            result["reference_price"], pl.Series("reference_price", expected)
+        )
+
+    def test_participation_rate_caps_fills_at_bar_volume(self):
+        result = simulate_fills(ORDERS, make_pricing_data(), participation_rate=0.1)
+
+        assert isinstance(result, pl.DataFrame)
+        plt.assert_series_equal(
+            result["filled_quantity"], pl.Series("filled_quantity", [-100.0, 20.0, 0.0])
+        )
+        plt.assert_series_equal(
+            result["unfilled_quantity"],
+            pl.Series("unfilled_quantity", [-400.0, 130.0, 10.0]),
+        )
+
+    def test_participation_rate_does_not_fill_bars_without_volume(self):
+        # No volume is reported for fid 2.
+        bars = (
+            make_pricing_data()
+            .get_bars()
+            .with_columns(
+                pl.when(pl.col("fid") == 2)
+                .then(None)
+                .otherwise(pl.col("volume"))
+                .alias("volume")
+            )
+        )
+        pricing_data = PricingData(bars, lazy=False)
+
+        result = simulate_fills(ORDERS, pricing_data, participation_rate=0.1)
+
+        assert isinstance(result, pl.DataFrame)
+        plt.assert_series_equal(
+            result["filled_quantity"], pl.Series("filled_quantity", [0.0, 20.0, 0.0])
+        )
+        plt.assert_series_equal(
+            result["unfilled_quantity"],
+            pl.Series("unfilled_quantity", [-500.0, 130.0, 10.0]),
+        )
+
+    def test_spread_cost_is_paid_on_both_sides(self):
+        result = simulate_fills(ORDERS, make_pricing_data(), spread_bps=20)
+
+        assert isinstance(result, pl.DataFrame)
+        plt.assert_series_equal(
+            result["execution_price"],
+            pl.Series("execution_price", [52.0 * 0.999, 11.0 * 1.001, None]),
+        )
+        expected_cost = [52.0 * 0.001 * 500, 11.0 * 0.001 * 150, None]
+        plt.assert_series_equal(
+            result["slippage_cost"], pl.Series("slippage_cost", expected_cost)
+        )
+
+    def test_impact_uses_only_bars_before_the_fill(self):
+        closes = [10.0, 11.0, 10.0, 12.0]
+        bars = pl.DataFrame(
+            {
+                "trade_date": [date(2025, 1, 2)] * 4,
+                "end_dtutc": [
+                    datetime(2025, 1, 2, 14, 31) + timedelta(minutes=i)
+                    for i in range(4)
+                ],
+                "fid": [1] * 4,
+                "symbol": ["A"] * 4,
+                "open": closes,
+                "high": closes,
+                "low": closes,
+                "close": closes,
+                "volume": [100.0, 200.0, 300.0, 10_000.0],
+            }
+        ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+        orders = pl.DataFrame(
+            {
+                "timestamp": [datetime(2025, 1, 2, 14, 33)],
+                "fid": [1],
+                "quantity": [-100.0],
+            }
+        )
+        result = simulate_fills(
+            orders,
+            PricingData(bars, lazy=False),
+            impact_coefficient=0.5,
+            impact_window=2,
+        )
+
+        # The order fills at the 14:34 open; the window ends with the 14:33 bar before it.
+        volatility = pl.Series([math.log(11.0 / 10.0), math.log(10.0 / 11.0)]).std()
+        assert isinstance(volatility, float)
+        impact = 0.5 * volatility * (100.0 / 250.0) ** 0.5 * 12.0
+        assert isinstance(result, pl.DataFrame)
+        assert result["impact_estimated"][0]
+        assert result["execution_price"][0] == pytest.approx(12.0 - impact)
+        assert result["slippage_cost"][0] == pytest.approx(impact * 100.0)
+
+    def test_impact_warm_up_charges_only_the_spread(self):
+        result = simulate_fills(
+            ORDERS, make_pricing_data(), spread_bps=20, impact_coefficient=0.5
+        )
+
+        assert isinstance(result, pl.DataFrame)
+        # Both orders fill within the first three bars of their instrument.
+        assert result["impact_estimated"].to_list() == [False, False, False]
+        plt.assert_series_equal(
+            result["execution_price"],
+            pl.Series("execution_price", [52.0 * 0.999, 11.0 * 1.001, None]),
+        )
+
+    def test_lazy_inputs_return_lazy_frame(self):
+        result = simulate_fills(ORDERS.lazy(), make_pricing_data(lazy=True))
+
+        assert isinstance(result, pl.LazyFrame)
+        plt.assert_frame_equal(
+            result.collect(), simulate_fills(ORDERS, make_pricing_data())
+        )
+
+    def test_compact_bars_fill_int64_orders(self):
+        result = simulate_fills(
+            ORDERS, make_pricing_data(compact=True, volume_dtype=pl.Float32)
+        )
+
+        assert isinstance(result, pl.DataFrame)
+        assert result.schema["fid"] == pl.Int64
+        plt.assert_frame_equal(result, simulate_fills(ORDERS, make_pricing_data()))
+
+    def test_invalid_arguments_raise(self):
+        with pytest.raises(ValueError, match="fill_price"):
+            simulate_fills(ORDERS, make_pricing_data(), fill_price="close")  # type: ignore
+        with pytest.raises(ValueError, match="participation_rate"):
+            simulate_fills(ORDERS, make_pricing_data(), participation_rate=0.0)
@@ -1,7 +1,7 @@
 import polars as pl
 import polars.testing as plt
 from pqf.indicator.util import apply_expr_to_series
-from pqf.order.slippage import simple_slippage
+from pqf.order.slippage import simple_slippage, spread_slippage, square_root_impact
 
 
 class TestSlippage:
@@ -16,3 +16,32 @@ class TestSlippage:
         expr = simple_slippage(pl.col("*"), slippage_rate=0.001)
         result = apply_expr_to_series(prices, expr)
         plt.assert_series_equal(result, prices / 1000)
+
+    def test_spread_slippage_crosses_half_the_spread(self):
+        prices = pl.Series([100.0, 100.0, 50.0])
+        side = pl.Series([1, -1, 1])
+        result = spread_slippage(prices, side, spread_bps=10)
+
+        plt.assert_series_equal(
+            result, pl.Series([0.05, -0.05, 0.025]), check_names=False
+        )
+
+    def test_spread_slippage_as_expr(self):
+        frame = pl.DataFrame({"price": [100.0, 100.0], "side": [1, -1]})
+        result = frame.select(
+            spread_slippage(pl.col("price"), pl.col("side"), spread_bps=10)
+        ).to_series()
+
+        plt.assert_series_equal(result, pl.Series("price", [0.05, -0.05]))
+
+    def test_square_root_impact_follows_order_direction(self):
+        prices = pl.Series([100.0, 100.0])
+        quantity = pl.Series([400.0, -100.0])
+        volume = pl.Series([10_000.0, 10_000.0])
+        volatility = pl.Series([0.02, 0.02])
+        result = square_root_impact(
+            prices, quantity, volume, volatility, impact_coefficient=0.5
+        )
+
+        # 0.5 * 0.02 * sqrt(0.04) * 100 = 0.2 and 0.5 * 0.02 * sqrt(0.01) * 100 = 0.1
+        plt.assert_series_equal(result, pl.Series([0.2, -0.1]), check_names=False)
@@ -1,9 +1,42 @@
-from pqf.pricing.utils import estimate_time_grain
+from collections.abc import Sequence
+from pathlib import Path
+
+from pqf.pricing.utils import (
+    Frequency,
+    estimate_time_grain,
+    frequency_nests,
+    infer_time_grain,
+    parquet_time_grain,
+    parse_frequency,
+)
 from pqf.pricing.core import PricingData
 import polars as pl
 import polars.testing as plt
+import pytest
 from datetime import date, timedelta, datetime
 
+EXAMPLE_BARS = (
+    Path(__file__).parent.parent / "example" / "data" / "btc_bars_example.parquet"
+)
+
+
+@pytest.fixture
+def partitioned_store(tmp_path: Path) -> Path:
+    """Write the BTC example bars as a two-instrument trade_date=/fid= hive store."""
+    btc = pl.read_parquet(EXAMPLE_BARS).head(3 * 1440)
+    bars = btc.select(
+        pl.col("close_time").dt.date().alias("trade_date"),
+        pl.col("close_time").dt.cast_time_unit("ns").alias("end_dtutc"),
+        pl.col("symbol"),
+        pl.col("open", "high", "low", "close", "volume"),
+    )
+    panel = pl.concat(
+        [bars.with_columns(pl.lit(fid, dtype=pl.Int64).alias("fid")) for fid in (1, 2)]
+    )
+    store = tmp_path / "bars"
+    panel.write_parquet(store, partition_by=["trade_date", "fid"])
+    return store
+
 
 class TestTimeGrainEstimation:
     def test_daily_accepts_time_series(self):
@@ -50,6 +83,164 @@ class TestTimeGrainEstimation:
         time_grain = estimate_time_grain(dates)
         assert time_grain == timedelta(minutes=30)
 
+    def test_ties_resolve_to_smallest_difference(self):
+        dates = pl.Series(
+            "dates",
+            [
+                datetime(2023, 1, 1, 0, 0),
+                datetime(2023, 1, 1, 0, 1),
+                datetime(2023, 1, 1, 0, 3),
+            ],
+        )
+
+        assert estimate_time_grain(dates) == timedelta(minutes=1)
+
+    def test_repeated_timestamps_are_ignored(self):
+        dates = pl.Series(
+            "dates", [datetime(2023, 1, 1, 0, minute) for minute in (0, 0, 5, 5, 10)]
+        )
+
+        assert estimate_time_grain(dates) == timedelta(minutes=5)
+
+
+class TestInferTimeGrain:
+    @staticmethod
+    def make_bars(grains: dict[int, int]) -> pl.DataFrame:
+        """Two 30-bar sessions per instrument, interleaved in time order."""
+        frames = []
+        for fid, minutes in grains.items():
+            for day in (2, 3):
+                start = datetime(2025, 1, day, 14, 30)
+                frames.append(
+                    pl.DataFrame(
+                        {
+                            "end_dtutc": [
+                                start + timedelta(minutes=minutes * i)
+                                for i in range(30)
+                            ],
+                            "fid": [fid] * 30,
+                        }
+                    )
+                )
+        return pl.concat(frames).sort("end_dtutc", "fid")
+
+    def test_interleaved_instruments_with_session_gaps(self):
+        estimate = infer_time_grain(self.make_bars({1: 1, 2: 1, 3: 1}))
+
+        assert estimate.grain == timedelta(minutes=1)
+        # One overnight gap among the 59 spacings of each instrument.
+        assert estimate.confidence == pytest.approx(58 / 59)
+        assert estimate.by_instrument == {
+            1: timedelta(minutes=1),
+            2: timedelta(minutes=1),
+            3: timedelta(minutes=1),
+        }
+        assert not estimate.irregular
+
+    def test_mixed_grains_are_flagged(self):
+        estimate = infer_time_grain(self.make_bars({1: 1, 2: 5}).lazy())
+
+        assert estimate.grain == timedelta(minutes=1)
+        assert estimate.by_instrument == {
+            1: timedelta(minutes=1),
+            2: timedelta(minutes=5),
+        }
+        assert estimate.irregular
+
+    def test_sample_is_bounded(self):
+        bars = self.make_bars({1: 1}).with_columns(
+            pl.when(pl.int_range(pl.len()) >= 10)
+            .then(pl.col("end_dtutc") + pl.duration(hours=pl.int_range(pl.len())))
+            .otherwise(pl.col("end_dtutc"))
+        )
+
+        assert infer_time_grain(bars, sample_size=10).grain == timedelta(minutes=1)
+        assert infer_time_grain(bars, sample_size=None).grain == timedelta(minutes=61)
+
+    def test_parquet_metadata_of_partitioned_store(self, partitioned_store: Path):
+        estimate = parquet_time_grain(partitioned_store)
+
+        assert estimate is not None
+        assert estimate.grain == timedelta(minutes=1)
+        assert estimate.confidence == 1.0
+        assert set(estimate.by_instrument) == {1, 2}
+        assert not estimate.irregular
+
+    def test_parquet_metadata_skips_multi_instrument_files(self, tmp_path: Path):
+        self.make_bars({1: 1, 2: 1}).write_parquet(tmp_path / "bars.parquet")
+
+        assert parquet_time_grain(tmp_path) is None
+
+    @staticmethod
+    def write_instrument_files(
+        directory: Path, days: Sequence[int] = range(2, 7), gap_minutes: int = 0
+    ) -> None:
+        """One file per instrument of 390-bar sessions, with an optional midday gap."""
+        for fid in (1, 2, 3):
+            frames = []
+            for day in days:
+                start = datetime(2025, 1, day, 14, 30)
+                minutes = [m + 1 + (gap_minutes if m >= 195 else 0) for m in range(390)]
+                frames.append(
+                    pl.DataFrame(
+                        {
+                            "trade_date": [date(2025, 1, day)] * 390,
+                            "end_dtutc": [
+                                start + timedelta(minutes=m) for m in minutes
+                            ],
+                            "fid": [fid] * 390,
+                        }
+                    )
+                )
+            pl.concat(frames).with_columns(
+                pl.col("end_dtutc").dt.cast_time_unit("ns"),
+                symbol=pl.lit("S"),
+                open=pl.lit(1.0),
+                high=pl.lit(1.0),
+                low=pl.lit(1.0),
+                close=pl.lit(1.0),
+                volume=pl.lit(1.0),
+            ).write_parquet(directory / f"fid-{fid}.parquet")
+
+    def test_parquet_metadata_skips_multi_session_row_groups(self, tmp_path: Path):
+        self.write_instrument_files(tmp_path)
+
+        assert parquet_time_grain(tmp_path) is None
+        assert PricingData.from_parquet(tmp_path).time_grain == timedelta(minutes=1)
+
+    def test_pricing_data_checks_parquet_metadata_against_bars(self, tmp_path: Path):
+        for day in range(2, 4):
+            session = tmp_path / f"trade_date=2025-01-0{day}"
+            session.mkdir()
+            self.write_instrument_files(session, days=[day], gap_minutes=60)
+
+        # The midday gap stretches the spacing read from the metadata of every session.
+        estimate = parquet_time_grain(tmp_path)
+        assert estimate is not None
+        assert estimate.grain > timedelta(minutes=1)
+        assert PricingData.from_parquet(tmp_path).time_grain == timedelta(minutes=1)
+
+    def test_hive_instruments_are_integers(self, tmp_path: Path):
+        bars = self.make_bars({1: 1, 2: 1})
+        for (fid, day), group in bars.group_by("fid", pl.col("end_dtutc").dt.date()):
+            partition = tmp_path / f"trade_date={day}" / f"fid={fid}"
+            partition.mkdir(parents=True)
+            group.drop("fid").write_parquet(partition / "bars.parquet")
+
+        estimate = parquet_time_grain(tmp_path)
+
+        assert estimate is not None
+        assert estimate.by_instrument == {
+            1: timedelta(minutes=1),
+            2: timedelta(minutes=1),
+        }
+
+    def test_pricing_data_uses_parquet_metadata(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store)
+
+        assert pricing_data.time_grain_estimate.by_instrument.keys() == {1, 2}
+        assert pricing_data.time_grain == timedelta(minutes=1)
+
 
 class TestPricingDataAggregation:
     def setup_method(self):
@@ -77,6 +268,8 @@ class TestPricingDataAggregation:
         """Test aggregation to 5-minute bars."""
         pricing_data = PricingData(self.test_data)
         aggregated = pricing_data.get_aggregated_bars("5m")
+        assert isinstance(aggregated, pl.LazyFrame)
+        aggregated = aggregated.collect()
 
         # Should aggregate 6 minutes of data into 2 bars:
         # Bar 1: minutes 0-4 (first 5 minutes)
@@ -97,6 +290,8 @@ class TestPricingDataAggregation:
         """Test aggregation to hourly bars."""
         pricing_data = PricingData(self.test_data)
         aggregated = pricing_data.get_aggregated_bars("1h")
+        assert isinstance(aggregated, pl.LazyFrame)
+        aggregated = aggregated.collect()
 
         # All 6 minutes should aggregate into 1 hour bar
         assert aggregated.height == 1
@@ -112,6 +307,8 @@ class TestPricingDataAggregation:
         """Test aggregation works with LazyFrame input."""
         pricing_data = PricingData(self.test_data.lazy(), lazy=True)
         aggregated = pricing_data.get_aggregated_bars("5m")
+        assert isinstance(aggregated, pl.LazyFrame)
+        aggregated = aggregated.collect()
 
         # Should work the same as DataFrame input
         assert aggregated.height == 2
@@ -125,6 +322,8 @@ class TestPricingDataAggregation:
         """Test that aggregated bars preserve expected data types."""
         pricing_data = PricingData(self.test_data)
         aggregated = pricing_data.get_aggregated_bars("5m")
+        assert isinstance(aggregated, pl.LazyFrame)
+        aggregated = aggregated.collect()
 
         # Check that schema matches expectations
         schema = aggregated.schema
@@ -157,6 +356,8 @@ class TestPricingDataAggregation:
 
         pricing_data = PricingData(multi_fid_data)
         aggregated = pricing_data.get_aggregated_bars("5m")
+        assert isinstance(aggregated, pl.LazyFrame)
+        aggregated = aggregated.collect()
 
         # Should have one bar per fid (financial instrument)
         assert aggregated.height == 2
@@ -198,3 +399,410 @@ class TestPricingDataAggregation:
             returns['forward_return_1'], expected_returns_1)
         plt.assert_series_equal(
             returns['forward_return_5'], expected_returns_5)
+
+
+class TestCompactSchema:
+    def setup_method(self):
+        self.bars = pl.DataFrame(
+            {
+                "trade_date": [date(2025, 1, 1)] * 6,
+                "end_dtutc": [datetime(2025, 1, 1, 0, minute) for minute in range(3)]
+                * 2,
+                "fid": [7, 7, 7, 9, 9, 9],
+                "symbol": ["AAA"] * 3 + ["BBB"] * 3,
+                "open": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "high": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "low": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "volume": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+            }
+        ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+
+    def test_compact_types(self):
+        pricing_data = PricingData(
+            self.bars, lazy=False, compact=True, volume_dtype=pl.UInt64
+        )
+
+        bars = pricing_data.get_bars()
+        assert bars.schema == pricing_data.output_schema
+        assert bars.schema["fid"] == pl.UInt32
+        assert bars.schema["symbol"] == pl.Categorical
+        assert bars.schema["volume"] == pl.UInt64
+        plt.assert_frame_equal(
+            bars.cast({"fid": pl.Int64, "symbol": pl.Utf8, "volume": pl.Float64}),
+            PricingData(self.bars, lazy=False).get_bars(),
+        )
+
+    def test_compact_columns_halve_in_size(self):
+        compact = PricingData(
+            self.bars, lazy=False, compact=True, volume_dtype=pl.Float32
+        ).get_bars()
+        default = PricingData(self.bars, lazy=False).get_bars()
+
+        assert isinstance(compact, pl.DataFrame)
+        assert isinstance(default, pl.DataFrame)
+        for column in ("fid", "volume"):
+            assert (
+                2 * compact[column].estimated_size() == default[column].estimated_size()
+            )
+        # Symbols are held as 4-byte indices into the shared dictionary of categories.
+        assert compact["symbol"].to_physical().dtype == pl.UInt32
+
+    def test_compact_results_match(self):
+        compact = PricingData(self.bars.lazy(), compact=True, volume_dtype=pl.Float32)
+        default = PricingData(self.bars.lazy())
+
+        plt.assert_frame_equal(
+            compact.get_aggregated_bars("2m"),
+            default.get_aggregated_bars("2m"),
+            check_dtypes=False,
+        )
+        plt.assert_frame_equal(
+            compact.get_forward_returns([1, "1m"]),
+            default.get_forward_returns([1, "1m"]),
+            check_dtypes=False,
+        )
+
+    def test_instrument_ids_outside_uint32_raise(self):
+        bars = self.bars.with_columns(pl.col("fid") - 8)
+
+        with pytest.raises(pl.exceptions.InvalidOperationError):
+            PricingData(bars, lazy=False, compact=True)
+        compact = PricingData(bars.lazy(), compact=True).get_bars()
+        assert isinstance(compact, pl.LazyFrame)
+        with pytest.raises(pl.exceptions.InvalidOperationError):
+            compact.collect()
+
+
+class TestPricingDataFromParquet:
+    def test_from_parquet_reads_whole_store(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store)
+        bars = pricing_data.get_bars()
+
+        assert isinstance(bars, pl.LazyFrame)
+        bars = bars.collect()
+        assert bars.height == 2 * 3 * 1440
+        assert bars.schema == pricing_data.output_schema
+        assert pricing_data.time_grain == timedelta(minutes=1)
+
+    def test_from_parquet_prunes_fids_and_dates(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(
+            partitioned_store,
+            fids=[2],
+            start=date(2022, 5, 2),
+            end=date(2022, 5, 2),
+        )
+        bars = pricing_data.get_bars()
+
+        assert isinstance(bars, pl.LazyFrame)
+        bars = bars.collect()
+        assert bars["fid"].unique().to_list() == [2]
+        assert bars["trade_date"].unique().to_list() == [date(2022, 5, 2)]
+        assert bars.height == 1440
+
+    def test_from_parquet_pushes_filters_into_scan(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(
+            partitioned_store, fids=[1], start=date(2022, 5, 2)
+        )
+        bars = pricing_data.get_bars()
+        assert isinstance(bars, pl.LazyFrame)
+        plan = bars.explain()
+        scan_section = plan[plan.index("Parquet SCAN") :]
+
+        assert "SELECTION" in scan_section
+        assert 'col("fid")' in scan_section
+        assert 'col("trade_date")' in scan_section
+
+    def test_sink_aggregated_bars_matches_in_memory(
+        self, partitioned_store: Path, tmp_path: Path
+    ):
+        pricing_data = PricingData.from_parquet(partitioned_store)
+        expected = pricing_data.get_aggregated_bars("15m")
+        assert isinstance(expected, pl.LazyFrame)
+
+        sunk = pricing_data.sink_aggregated_bars(
+            "15m", tmp_path / "agg", trade_dates_per_chunk=2
+        ).collect()
+
+        assert len(list((tmp_path / "agg").glob("part-*.parquet"))) == 2
+        plt.assert_frame_equal(sunk, expected.collect())
+
+    def test_sink_aggregated_bars_refuses_a_non_empty_directory(
+        self, partitioned_store: Path, tmp_path: Path
+    ):
+        pricing_data = PricingData.from_parquet(partitioned_store)
+        pricing_data.sink_aggregated_bars("15m", tmp_path / "agg")
+
+        with pytest.raises(ValueError, match="empty"):
+            pricing_data.sink_aggregated_bars("15m", tmp_path / "agg")
+
+    def test_sink_aggregated_bars_without_bars(
+        self, partitioned_store: Path, tmp_path: Path
+    ):
+        pricing_data = PricingData.from_parquet(
+            partitioned_store, start=date(2030, 1, 1)
+        )
+
+        sunk = pricing_data.sink_aggregated_bars("15m", tmp_path / "agg").collect()
+
+        assert sunk.is_empty()
+        assert sunk.schema == pricing_data.get_aggregated_bars("15m").collect_schema()
+
+    def test_from_parquet_eager(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store, fids=[1], lazy=False)
+
+        bars = pricing_data.get_bars()
+
+        assert isinstance(bars, pl.DataFrame)
+        assert bars.height == 3 * 1440
+
+
+class TestPricingDataLaziness:
+    def setup_method(self):
+        self.test_data = pl.DataFrame(
+            {
+                "trade_date": [date(2025, 1, 1)] * 6,
+                "end_dtutc": [datetime(2025, 1, 1, 0, minute) for minute in range(6)],
+                "fid": [1] * 6,
+                "symbol": ["A"] * 6,
+                "open": [100.0, 101.0, 102.0, 101.5, 103.0, 102.0],
+                "high": [101.5, 102.5, 103.0, 102.0, 104.0, 103.0],
+                "low": [99.5, 100.5, 101.0, 100.5, 102.5, 101.0],
+                "close": [101.0, 102.0, 101.5, 103.0, 102.0, 102.5],
+                "volume": [1000.0, 1200.0, 800.0, 1500.0, 900.0, 1100.0],
+            }
+        ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+
+    def test_construction_defers_time_grain(self):
+        pricing_data = PricingData(self.test_data.lazy())
+
+        assert pricing_data._time_grain is None
+        assert pricing_data.time_grain == timedelta(minutes=1)
+        assert pricing_data._time_grain == timedelta(minutes=1)
+
+    def test_time_grain_uses_bounded_sample(self):
+        irregular_tail = self.test_data.with_columns(
+            pl.when(pl.int_range(pl.len()) >= 3)
+            .then(pl.col("end_dtutc") + pl.duration(hours=pl.int_range(pl.len())))
+            .otherwise(pl.col("end_dtutc"))
+            .dt.cast_time_unit("ns")
+            .alias("end_dtutc")
+        )
+        pricing_data = PricingData(irregular_tail.lazy(), time_grain_sample_size=3)
+
+        assert pricing_data.time_grain == timedelta(minutes=1)
+
+    def test_lazy_outputs_stay_lazy(self):
+        pricing_data = PricingData(self.test_data.lazy())
+
+        aggregated = pricing_data.get_aggregated_bars("5m")
+        forward_returns = pricing_data.get_forward_returns([1])
+
+        assert isinstance(aggregated, pl.LazyFrame)
+        assert isinstance(forward_returns, pl.LazyFrame)
+        combined = aggregated.join(
+            forward_returns, on=["trade_date", "end_dtutc", "fid"], how="left"
+        ).collect()
+        assert combined.height == 2
+
+    def test_eager_outputs_stay_eager(self):
+        pricing_data = PricingData(self.test_data, lazy=False)
+
+        aggregated = pricing_data.get_aggregated_bars("5m")
+
+        assert isinstance(aggregated, pl.DataFrame)
+        assert aggregated["volume"].to_list() == [5400.0, 1100.0]
+
+
+class TestFrequencyNesting:
+    def test_parse_compound_frequency(self):
+        assert parse_frequency("1h30m") == Frequency(0, 0, 90 * 60 * 10**9)
+        assert parse_frequency("1q") == Frequency(3, 0, 0)
+
+    def test_parse_rejects_invalid_frequency(self):
+        with pytest.raises(ValueError):
+            parse_frequency("5x")
+
+    def test_fixed_frequencies_nest_when_divisible(self):
+        assert frequency_nests("5m", "15m")
+        assert frequency_nests("1h", "1d")
+        assert not frequency_nests("7m", "1h")
+
+    def test_calendar_frequencies_nest_in_whole_days(self):
+        assert frequency_nests("1d", "1w")
+        assert frequency_nests("1h", "1mo")
+        assert frequency_nests("1mo", "1q")
+        assert not frequency_nests("1w", "1mo")
+
+
+class TestPricingDataMultiFrequency:
+    FREQS = ("1d", "5m", "15m", "1h", "7m")
+
+    def test_multi_matches_single_frequency_eager(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store, lazy=False)
+
+        multi = pricing_data.get_aggregated_bars_multi(self.FREQS)
+
+        assert tuple(multi) == self.FREQS
+        for freq in self.FREQS:
+            plt.assert_frame_equal(multi[freq], pricing_data.get_aggregated_bars(freq))
+
+    def test_multi_matches_single_frequency_lazy(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store)
+
+        multi = pricing_data.get_aggregated_bars_multi(self.FREQS)
+        assert all(isinstance(bars, pl.LazyFrame) for bars in multi.values())
+        collected = pl.collect_all(bars.lazy() for bars in multi.values())
+
+        for freq, bars in zip(self.FREQS, collected):
+            expected = pricing_data.get_aggregated_bars(freq)
+            assert isinstance(expected, pl.LazyFrame)
+            plt.assert_frame_equal(bars, expected.collect())
+
+
+class TestPricingDataSortState:
+    def test_instrument_ordering_is_cached(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store, lazy=False)
+
+        first = pricing_data.get_bars_by_instrument()
+        second = pricing_data.get_bars_by_instrument()
+
+        assert first is second
+        assert isinstance(first, pl.DataFrame)
+        assert first["fid"].flags["SORTED_ASC"]
+        assert first.select((pl.col("end_dtutc").diff().over("fid") > 0).all()).item()
+
+    def test_sort_cache_respects_memory_budget(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(
+            partitioned_store, lazy=False, sort_cache_bytes=0
+        )
+
+        first = pricing_data.get_bars_by_instrument()
+        second = pricing_data.get_bars_by_instrument()
+
+        assert first is not second
+        plt.assert_frame_equal(first, second)
+        assert len(pricing_data._sort_cache) == 0
+
+    def test_replacing_data_invalidates_sort_state(self, partitioned_store: Path):
+        pricing_data = PricingData.from_parquet(partitioned_store, lazy=False)
+        pricing_data.get_bars_by_instrument()
+
+        pricing_data.data = pricing_data.get_bars().filter(pl.col("fid") == 2)
+
+        assert pricing_data._sort_keys is None
+        assert len(pricing_data._sort_cache) == 0
+        bars = pricing_data.get_bars_by_instrument()
+        assert isinstance(bars, pl.DataFrame)
+        assert bars["fid"].unique().to_list() == [2]
+
+    def test_forward_returns_do_not_leak_across_instruments(
+        self, partitioned_store: Path
+    ):
+        pricing_data = PricingData.from_parquet(partitioned_store, lazy=False)
+        bars = pricing_data.get_bars()
+
+        returns = pricing_data.get_forward_returns([1, 5], log=False)
+        expected = bars.select(
+            "trade_date",
+            "end_dtutc",
+            "fid",
+            pl.col("close")
+            .pct_change(1)
+            .shift(-1)
+            .over("fid")
+            .alias("forward_return_1"),
+            pl.col("close")
+            .pct_change(5)
+            .shift(-5)
+            .over("fid")
+            .alias("forward_return_5"),
+        ).sort("fid", "end_dtutc")
+
+        assert isinstance(returns, pl.DataFrame)
+        plt.assert_frame_equal(returns, expected)
+        assert returns.filter(pl.col("forward_return_5").is_null()).height == 2 * 5
+
+
+class TestForwardReturnHorizons:
+    def setup_method(self):
+        # fid 1 is missing the 00:02 and 00:03 bars; fid 2 is regular.
+        minutes = {1: [0, 1, 4, 5, 6], 2: [0, 1, 2, 3, 4]}
+        closes = {
+            1: [100.0, 101.0, 102.0, 104.0, 103.0],
+            2: [10.0, 11.0, 12.0, 13.0, 14.0],
+        }
+        self.bars = pl.DataFrame(
+            {
+                "trade_date": [date(2025, 1, 1)] * 10,
+                "end_dtutc": [
+                    datetime(2025, 1, 1, 0, minute)
+                    for fid in (1, 2)
+                    for minute in minutes[fid]
+                ],
+                "fid": [fid for fid in (1, 2) for _ in minutes[fid]],
+                "symbol": [str(fid) for fid in (1, 2) for _ in minutes[fid]],
+                "open": closes[1] + closes[2],
+                "high": closes[1] + closes[2],
+                "low": closes[1] + closes[2],
+                "close": closes[1] + closes[2],
+                "volume": [1.0] * 10,
+            }
+        ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+
+    def test_wall_clock_horizon_uses_last_bar_within_horizon(self):
+        pricing_data = PricingData(self.bars, lazy=False)
+
+        returns = pricing_data.get_forward_returns(["3m"], log=False)
+
+        assert isinstance(returns, pl.DataFrame)
+        plt.assert_series_equal(
+            returns["forward_return_3m"],
+            pl.Series(
+                "forward_return_3m",
+                [
+                    101 / 100 - 1,
+                    102 / 101 - 1,
+                    None,
+                    None,
+                    None,
+                    13 / 10 - 1,
+                    14 / 11 - 1,
+                    None,
+                    None,
+                    None,
+                ],
+            ),
+        )
+
+    def test_bar_and_wall_clock_horizons_agree_on_regular_bars(self):
+        pricing_data = PricingData(self.bars, lazy=False)
+
+        returns = pricing_data.get_forward_returns([2, "2m"]).filter(pl.col("fid") == 2)
+
+        assert isinstance(returns, pl.DataFrame)
+        plt.assert_series_equal(
+            returns["forward_return_2m"], returns["forward_return_2"], check_names=False
+        )
+
+    def test_long_layout(self):
+        pricing_data = PricingData(self.bars.lazy())
+
+        wide = pricing_data.get_forward_returns([1, "1m"])
+        long = pricing_data.get_forward_returns([1, "1m"], layout="long")
+
+        assert isinstance(wide, pl.LazyFrame) and isinstance(long, pl.LazyFrame)
+        wide, long = wide.collect(), long.collect()
+        assert long.columns == ["trade_date", "end_dtutc", "fid", "horizon", "return"]
+        assert long.height == 2 * wide.height
+        plt.assert_series_equal(
+            long.filter(pl.col("horizon") == "1m")["return"],
+            wide["forward_return_1m"],
+            check_names=False,
+        )
+
+    def test_invalid_layout_raises(self):
+        pricing_data = PricingData(self.bars, lazy=False)
+
+        with pytest.raises(ValueError):
+            pricing_data.get_forward_returns([1], layout="tall")  # type: ignore
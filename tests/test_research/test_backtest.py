@@ -0,0 +1,148 @@
+from datetime import date, datetime
+
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.pricing.core import PricingData
+from pqf.research.backtest import backtest
+
+
+def make_pricing_data() -> PricingData:
+    closes = {1: [10.0, 11.0, 12.0, 12.0], 2: [20.0, 20.0, 10.0, 10.0]}
+    bars = pl.DataFrame(
+        {
+            "trade_date": [date(2025, 1, 2 + day) for day in range(4)] * 2,
+            "end_dtutc": [datetime(2025, 1, 2 + day, 21) for day in range(4)] * 2,
+            "fid": [1] * 4 + [2] * 4,
+            "symbol": ["A"] * 4 + ["B"] * 4,
+            "open": closes[1] + closes[2],
+            "high": closes[1] + closes[2],
+            "low": closes[1] + closes[2],
+            "close": closes[1] + closes[2],
+            "volume": [1.0] * 8,
+        }
+    ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+    return PricingData(bars, lazy=False)
+
+
+def make_targets() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "strategy_id": ["equal", "equal", "equal", "single"],
+            "timestamp": [
+                datetime(2025, 1, 2, 21),
+                datetime(2025, 1, 2, 21),
+                datetime(2025, 1, 4, 12),
+                datetime(2025, 1, 3, 9),
+            ],
+            "fid": [1, 2, 1, 2],
+            "weight": [0.5, 0.5, 1.0, 1.0],
+        }
+    )
+
+
+class TestBacktest:
+    def test_positions_drift_between_rebalances(self):
+        result = backtest(make_targets(), make_pricing_data(), initial_capital=100.0)
+
+        equal = result.equity.filter(pl.col("strategy_id") == "equal")
+        # 5 shares at 10 and 2.5 shares at 20, then all in fid 1 from the close of Jan 4.
+        plt.assert_series_equal(
+            equal["equity"], pl.Series("equity", [100.0, 105.0, 85.0, 85.0])
+        )
+        plt.assert_series_equal(
+            equal["turnover"], pl.Series("turnover", [1.0, 0.0, 50.0 / 85.0, 0.0])
+        )
+        single = result.equity.filter(pl.col("strategy_id") == "single")
+        # A rebalance between bars is executed at the close of the next bar.
+        plt.assert_series_equal(
+            single["equity"], pl.Series("equity", [100.0, 100.0, 50.0, 50.0])
+        )
+
+    def test_trades_and_positions(self):
+        result = backtest(make_targets(), make_pricing_data(), initial_capital=100.0)
+
+        trades = result.trades.filter(pl.col("strategy_id") == "equal")
+        assert trades["end_dtutc"].dt.day().to_list() == [2, 2, 4, 4]
+        assert trades["fid"].to_list() == [1, 2, 2, 1]
+        plt.assert_series_equal(
+            trades["quantity"], pl.Series("quantity", [5.0, 2.5, -2.5, 25.0 / 12.0])
+        )
+        positions = result.positions.filter(pl.col("strategy_id") == "equal")
+        plt.assert_series_equal(
+            positions["position"],
+            pl.Series("position", [5.0, 2.5, 0.0, 5.0 + 25.0 / 12.0]),
+        )
+
+    def test_costs_are_paid_within_cash(self):
+        result = backtest(
+            make_targets(), make_pricing_data(), initial_capital=100.0, cost_bps=10
+        )
+
+        first = result.equity.filter(pl.col("strategy_id") == "equal").row(
+            0, named=True
+        )
+        # Buys are scaled so that their value and costs use up exactly the starting cash.
+        assert first["cost"] == pytest.approx(100.0 * 0.001 / 1.001)
+        assert first["equity"] == pytest.approx(100.0 - first["cost"])
+        assert first["cash"] == pytest.approx(0.0)
+        assert (result.equity["cash"] > -1e-9).all()
+
+    def test_borrowing_buys_the_full_target(self):
+        result = backtest(
+            make_targets(),
+            make_pricing_data(),
+            initial_capital=100.0,
+            cost_bps=10,
+            allow_borrowing=True,
+        )
+
+        first = result.equity.filter(pl.col("strategy_id") == "equal").row(
+            0, named=True
+        )
+        assert first["cost"] == pytest.approx(0.1)
+        assert first["cash"] == pytest.approx(-0.1)
+
+    def test_rebalance_threshold_skips_small_deviations(self):
+        targets = pl.DataFrame(
+            {
+                "strategy_id": [0, 0, 0, 0],
+                "timestamp": [datetime(2025, 1, 2, 21)] * 2
+                + [datetime(2025, 1, 3, 21)] * 2,
+                "fid": [1, 2, 1, 2],
+                "weight": [0.5, 0.5, 0.5, 0.5],
+            }
+        )
+        # On Jan 3 the weights have drifted to 55/105 and 50/105, within 0.05 of 0.5.
+        result = backtest(
+            targets,
+            make_pricing_data(),
+            initial_capital=100.0,
+            rebalance_threshold=0.05,
+        )
+        assert result.trades.height == 2
+
+        result = backtest(
+            targets,
+            make_pricing_data(),
+            initial_capital=100.0,
+            rebalance_threshold=0.01,
+        )
+        assert result.trades.height == 4
+
+    def test_processes_give_identical_results(self):
+        single = backtest(make_targets(), make_pricing_data(), cost_bps=5)
+        pooled = backtest(make_targets(), make_pricing_data(), cost_bps=5, processes=2)
+
+        plt.assert_frame_equal(pooled.equity, single.equity)
+        plt.assert_frame_equal(pooled.trades, single.trades)
+        plt.assert_frame_equal(pooled.positions, single.positions)
+
+    def test_invalid_arguments_raise(self):
+        with pytest.raises(ValueError, match="initial_capital"):
+            backtest(make_targets(), make_pricing_data(), initial_capital=0.0)
+        with pytest.raises(ValueError, match="cost_bps"):
+            backtest(make_targets(), make_pricing_data(), cost_bps=-1.0)
+        with pytest.raises(ValueError, match="processes"):
+            backtest(make_targets(), make_pricing_data(), processes=0)
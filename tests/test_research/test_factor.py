@@ -1,10 +1,20 @@
-from datetime import datetime
+from datetime import date, datetime
 
+import numpy as np
 import polars as pl
 import polars.testing as plt
+import pytest
 
 from pqf.research.factor import (
+    factor_quantile_returns,
+    factor_quantiles,
+    factor_rank_autocorrelation,
+    ic_decay,
+    information_coefficient,
     mean_factor_returns_by_quantile,
+    point_in_time_factors,
+    quantile_turnover,
+    rolling_ic,
     simple_factor_long_short_returns,
 )
 
@@ -203,3 +213,345 @@ class TestFactorReturns:
             plt.assert_frame_equal(
                 quantile_returns, expected_quantile_returns, check_row_order=False
             )
+
+
+class TestLongFormatFactorQuantiles:
+    def setup_method(self):
+        dates = [datetime(2021, 1, 1)] * 4 + [datetime(2021, 1, 2)] * 4
+        fids = [1, 2, 3, 4] * 2
+        self.factors = pl.concat(
+            [
+                pl.DataFrame(
+                    {
+                        "date": dates,
+                        "fid": fids,
+                        "factor": "momentum",
+                        "value": [0.4, 0.1, 0.3, 0.2, -1.0, None, 2.0, 1.0],
+                    }
+                ),
+                pl.DataFrame(
+                    {
+                        "date": dates,
+                        "fid": fids,
+                        "factor": "value",
+                        "value": [1.0, 1.0, 2.0, 2.0, 4.0, 3.0, 2.0, 1.0],
+                    }
+                ),
+            ]
+        )
+        self.forward_returns = pl.DataFrame(
+            {
+                "date": dates,
+                "fid": fids,
+                "forward_return_1": [0.01, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08],
+                "forward_return_5": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8],
+            }
+        )
+
+    def test_quantiles_are_assigned_per_date_cross_section(self):
+        quantiles = (
+            factor_quantiles(self.factors, 2).sort("factor", "date", "fid").collect()
+        )
+
+        plt.assert_series_equal(
+            quantiles["quantile"],
+            pl.Series(
+                "quantile",
+                [1, 0, 1, 0, 0, 1, 0, 0, 0, 1, 1, 1, 1, 0, 0],
+                dtype=pl.UInt32,
+            ),
+        )
+
+    def test_ties_share_a_quantile(self):
+        quantiles = factor_quantiles(
+            self.factors.filter(pl.col("factor") == "value"), 4
+        ).collect()
+
+        first_date = quantiles.filter(pl.col("date") == datetime(2021, 1, 1)).sort(
+            "fid"
+        )
+        assert first_date["quantile"].to_list() == [0, 0, 2, 2]
+
+    def test_mean_forward_returns_per_factor_quantile(self):
+        result = factor_quantile_returns(
+            self.factors, self.forward_returns, 2
+        ).collect()
+
+        expected = pl.DataFrame(
+            {
+                "factor": ["momentum", "momentum", "value", "value"],
+                "quantile": pl.Series([0, 1, 0, 1], dtype=pl.UInt32),
+                "forward_return_1": [
+                    (0.02 + 0.04 + 0.05 + 0.08) / 4,
+                    (0.01 + 0.03 + 0.07) / 3,
+                    (0.01 + 0.02 + 0.07 + 0.08) / 4,
+                    (0.03 + 0.04 + 0.05 + 0.06) / 4,
+                ],
+                "forward_return_5": [
+                    (0.2 + 0.4 + 0.5 + 0.8) / 4,
+                    (0.1 + 0.3 + 0.7) / 3,
+                    (0.1 + 0.2 + 0.7 + 0.8) / 4,
+                    (0.3 + 0.4 + 0.5 + 0.6) / 4,
+                ],
+                "count": pl.Series([4, 3, 4, 4], dtype=pl.UInt32),
+            }
+        )
+        plt.assert_frame_equal(result, expected)
+
+    def test_mean_forward_returns_by_date(self):
+        result = factor_quantile_returns(
+            self.factors,
+            self.forward_returns,
+            2,
+            return_columns=["forward_return_1"],
+            by_date=True,
+        ).collect()
+
+        assert result.columns == [
+            "date",
+            "factor",
+            "quantile",
+            "forward_return_1",
+            "count",
+        ]
+        assert result.height == 8
+
+    def test_invalid_quantiles_raise(self):
+        with pytest.raises(ValueError):
+            factor_quantiles(self.factors, 0)
+
+
+class TestInformationCoefficient:
+    def setup_method(self):
+        rng = np.random.default_rng(3)
+        n_dates, n_assets = 6, 25
+        dates = np.repeat(np.arange(n_dates), n_assets)
+        fids = np.tile(np.arange(n_assets), n_dates)
+        values = rng.standard_normal(n_dates * n_assets)
+        self.forward_returns = pl.DataFrame(
+            {
+                "date": dates,
+                "fid": fids,
+                "forward_return_1": values * 0.5
+                + rng.standard_normal(n_dates * n_assets),
+                "forward_return_5": rng.standard_normal(n_dates * n_assets),
+                "forward_return_30m": -values,
+            }
+        )
+        self.factors = pl.concat(
+            [
+                pl.DataFrame(
+                    {"date": dates, "fid": fids, "factor": "signal", "value": values}
+                ),
+                pl.DataFrame(
+                    {
+                        "date": dates,
+                        "fid": fids,
+                        "factor": "noise",
+                        "value": rng.standard_normal(n_dates * n_assets),
+                    }
+                ),
+            ]
+        )
+
+    @pytest.mark.parametrize("method", ["spearman", "pearson"])
+    def test_ic_matches_per_cross_section_correlation(self, method):
+        ic = information_coefficient(
+            self.factors, self.forward_returns, method=method, horizons=[1, 5]
+        ).collect()
+
+        expected = (
+            self.factors.join(self.forward_returns, on=["date", "fid"])
+            .group_by("date", "factor")
+            .agg(
+                pl.corr("value", "forward_return_1", method=method).alias("1"),
+                pl.corr("value", "forward_return_5", method=method).alias("5"),
+            )
+            .unpivot(index=["date", "factor"], variable_name="horizon", value_name="ic")
+            .sort("date", "factor", "horizon")
+        )
+        assert ic.columns == ["date", "factor", "horizon", "ic"]
+        assert ic.height == 6 * 2 * 2
+        np.testing.assert_allclose(ic["ic"].to_numpy(), expected["ic"].to_numpy())
+
+    def test_horizons_default_to_all_forward_return_columns_in_order(self):
+        ic = information_coefficient(self.factors, self.forward_returns).collect()
+
+        assert ic["horizon"].dtype == pl.Enum(["1", "5", "30m"])
+        perfect = ic.filter(pl.col("factor") == "signal", pl.col("horizon") == "30m")
+        np.testing.assert_allclose(perfect["ic"].to_numpy(), -1.0)
+
+    def test_invalid_method_raises(self):
+        with pytest.raises(ValueError):
+            information_coefficient(
+                self.factors,
+                self.forward_returns,
+                method="kendall",  # type: ignore
+            )
+
+    def test_ic_decay_summarises_each_factor_and_horizon(self):
+        ic = pl.DataFrame(
+            {
+                "date": [1, 2, 3, 4] * 2,
+                "factor": "signal",
+                "horizon": pl.Series(["1"] * 4 + ["5"] * 4, dtype=pl.Enum(["1", "5"])),
+                "ic": [0.1, 0.3, -0.1, 0.1, 0.05, float("nan"), 0.05, -0.05],
+            }
+        )
+
+        decay = ic_decay(ic).collect()
+
+        assert decay["horizon"].to_list() == ["1", "5"]
+        np.testing.assert_allclose(decay["ic_mean"].to_numpy(), [0.1, 0.05 / 3])
+        np.testing.assert_allclose(
+            decay["ic_ir"].to_numpy(), decay["ic_mean"] / decay["ic_std"]
+        )
+        np.testing.assert_allclose(
+            decay["ic_t_stat"].to_numpy(), decay["ic_ir"] * np.sqrt([4, 3])
+        )
+        np.testing.assert_allclose(decay["ic_hit_rate"].to_numpy(), [0.75, 2 / 3])
+        assert decay["count"].to_list() == [4, 3]
+
+    def test_rolling_ic(self):
+        ic = information_coefficient(
+            self.factors, self.forward_returns, horizons=[1]
+        ).collect()
+
+        rolling = rolling_ic(ic, 3).collect()
+
+        signal = rolling.filter(pl.col("factor") == "signal")
+        expected = signal["ic"].rolling_mean(3)
+        plt.assert_series_equal(signal["rolling_ic_mean"], expected, check_names=False)
+        assert signal["rolling_ic_ir"].null_count() == 2
+
+
+class TestFactorTurnover:
+    def setup_method(self):
+        self.factors = pl.DataFrame(
+            {
+                "date": [datetime(2021, 1, day) for day in (4, 5, 6) for _ in range(4)],
+                "fid": [1, 2, 3, 4] * 3,
+                "factor": "momentum",
+                "value": [1.0, 2.0, 3.0, 4.0, 4.0, 3.0, 2.0, 1.0, 1.0, 3.0, 2.0, 4.0],
+            }
+        )
+
+    def test_quantile_turnover(self):
+        turnover = quantile_turnover(self.factors, 2, lags=[1, 2]).collect()
+
+        assert turnover.columns == ["date", "factor", "quantile", "lag", "turnover"]
+        assert turnover.height == 3 * 2 * 2
+        assert turnover.filter(pl.col("lag") == 1)["turnover"].to_list() == [
+            None,
+            None,
+            1.0,
+            1.0,
+            0.5,
+            0.5,
+        ]
+        assert turnover.filter(pl.col("lag") == 2)["turnover"].to_list() == [
+            None,
+            None,
+            None,
+            None,
+            0.5,
+            0.5,
+        ]
+
+    def test_factor_rank_autocorrelation(self):
+        autocorrelation = factor_rank_autocorrelation(
+            self.factors, lags=[1, 2]
+        ).collect()
+
+        assert autocorrelation.columns == ["date", "factor", "lag", "autocorrelation"]
+        assert autocorrelation["date"].to_list() == [
+            datetime(2021, 1, 5),
+            datetime(2021, 1, 6),
+            datetime(2021, 1, 6),
+        ]
+        assert autocorrelation["lag"].to_list() == [1, 1, 2]
+        np.testing.assert_allclose(
+            autocorrelation["autocorrelation"].to_numpy(), [-1.0, -0.8, 0.8]
+        )
+
+    def test_since_only_calculates_new_dates(self):
+        since = datetime(2021, 1, 6)
+
+        turnover = quantile_turnover(
+            self.factors, 2, lags=[1, 2], since=since
+        ).collect()
+        autocorrelation = factor_rank_autocorrelation(
+            self.factors, lags=[1, 2], since=since
+        ).collect()
+
+        plt.assert_frame_equal(
+            turnover,
+            quantile_turnover(self.factors, 2, lags=[1, 2])
+            .collect()
+            .filter(pl.col("date") >= since),
+        )
+        plt.assert_frame_equal(
+            autocorrelation,
+            factor_rank_autocorrelation(self.factors, lags=[1, 2])
+            .collect()
+            .filter(pl.col("date") >= since),
+        )
+
+    def test_invalid_lag_raises(self):
+        with pytest.raises(ValueError):
+            factor_rank_autocorrelation(self.factors, lags=[0])
+
+
+class TestPointInTimeFactors:
+    def setup_method(self):
+        # Two instruments with bars at 10:00 and 16:00 on three days, listed in instrument order.
+        self.bars = pl.DataFrame(
+            {
+                "end_dtutc": [
+                    datetime(2024, 1, day, hour)
+                    for day in (2, 3, 4)
+                    for hour in (10, 16)
+                ]
+                * 2,
+                "fid": [1] * 6 + [2] * 6,
+                "close": [float(price) for price in range(12)],
+            }
+        )
+        self.factors = pl.DataFrame(
+            {
+                "date": [date(2024, 1, 1), date(2024, 1, 3), date(2024, 1, 2)],
+                "fid": [1, 1, 2],
+                "value": [10.0, 30.0, 20.0],
+            }
+        )
+
+    def values(self, aligned: pl.LazyFrame, fid: int) -> list[float | None]:
+        return aligned.filter(pl.col("fid") == fid).collect()["value"].to_list()
+
+    def test_values_are_known_from_their_date(self):
+        aligned = point_in_time_factors(self.bars, self.factors)
+
+        assert aligned.collect().columns == ["end_dtutc", "fid", "close", "value"]
+        assert self.values(aligned, 1) == [10.0, 10.0, 30.0, 30.0, 30.0, 30.0]
+        assert self.values(aligned, 2) == [20.0, 20.0, 20.0, 20.0, 20.0, 20.0]
+
+    def test_publication_lag_delays_values(self):
+        aligned = point_in_time_factors(
+            self.bars.lazy(), self.factors.lazy(), publication_lag="1d12h"
+        )
+
+        assert self.values(aligned, 1) == [None, 10.0, 10.0, 10.0, 10.0, 30.0]
+        assert self.values(aligned, 2) == [None, None, None, 20.0, 20.0, 20.0]
+
+    def test_stale_values_are_null(self):
+        aligned = point_in_time_factors(self.bars, self.factors, max_staleness="1d12h")
+
+        assert self.values(aligned, 1) == [10.0, None, 30.0, 30.0, 30.0, None]
+        assert self.values(aligned, 2) == [20.0, 20.0, 20.0, None, None, None]
+
+    def test_matches_compact_instrument_ids(self):
+        bars = self.bars.cast({"fid": pl.UInt32}).sort("end_dtutc")
+
+        aligned = point_in_time_factors(bars, self.factors, presorted=True)
+
+        assert self.values(aligned, 1) == [10.0, 10.0, 30.0, 30.0, 30.0, 30.0]
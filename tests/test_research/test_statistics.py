@@ -1,10 +1,18 @@
-from datetime import datetime
+from datetime import date, datetime
 
+import numpy as np
 import polars as pl
 import polars.selectors as cs
 import polars.testing as plt
+import pytest
 
-from pqf.research.statistics import estimate_market_returns
+from pqf.research.statistics import (
+    annualized_returns,
+    estimate_market_returns,
+    market_returns,
+    rolling_statistics,
+    summary_stats,
+)
 
 
 class TestEstimatedMarketReturn:
@@ -55,3 +63,310 @@ class TestEstimatedMarketReturn:
             ]
         )
         plt.assert_frame_equal(expected, market_returns)
+
+
+def naive_rolling_statistics(
+    returns: np.ndarray, window_size: int, periods_per_year: float
+) -> dict:
+    """Recompute every window from scratch."""
+    statistics = {
+        name: []
+        for name in (
+            "annualized_return",
+            "volatility",
+            "sharpe_ratio",
+            "sortino_ratio",
+            "max_drawdown",
+            "calmar_ratio",
+        )
+    }
+    for end in range(1, len(returns) + 1):
+        window = returns[max(0, end - window_size) : end]
+        if len(window) < window_size:
+            for values in statistics.values():
+                values.append(None)
+            continue
+        wealth = np.concatenate(([0.0], window.cumsum()))
+        drawdown = 1 - np.exp(-(np.maximum.accumulate(wealth) - wealth).max())
+        annualized = np.exp(window.mean() * periods_per_year) - 1
+        scale = np.sqrt(periods_per_year)
+        statistics["annualized_return"].append(annualized)
+        statistics["volatility"].append(window.std(ddof=1) * scale)
+        statistics["sharpe_ratio"].append(window.mean() / window.std(ddof=1) * scale)
+        statistics["sortino_ratio"].append(
+            window.mean() / np.sqrt((np.minimum(window, 0) ** 2).mean()) * scale
+        )
+        statistics["max_drawdown"].append(drawdown)
+        statistics["calmar_ratio"].append(annualized / drawdown)
+    return statistics
+
+
+class TestRollingStatistics:
+    def setup_method(self):
+        rng = np.random.default_rng(11)
+        self.streams = {
+            strategy: rng.normal(0.0005, 0.01, 120) for strategy in ("a", "b", "c")
+        }
+        self.returns = pl.concat(
+            [
+                pl.DataFrame(
+                    {
+                        "strategy_id": strategy,
+                        "date": pl.date_range(
+                            date(2024, 1, 1), date(2024, 4, 29), eager=True
+                        ),
+                        "return": values,
+                    }
+                )
+                for strategy, values in self.streams.items()
+            ]
+        ).sample(fraction=1.0, shuffle=True, seed=1)
+
+    def test_rolling_statistics_match_a_full_recompute_per_window(self):
+        result = rolling_statistics(self.returns, 20, periods_per_year=252)
+
+        assert result["strategy_id"].unique(maintain_order=True).to_list() == [
+            "a",
+            "b",
+            "c",
+        ]
+        for strategy, values in self.streams.items():
+            stream = result.filter(pl.col("strategy_id") == strategy)
+            for name, expected in naive_rolling_statistics(values, 20, 252).items():
+                np.testing.assert_allclose(
+                    stream[name].to_numpy().astype(float),
+                    np.array(expected, dtype=float),
+                    rtol=1e-9,
+                    err_msg=name,
+                )
+
+    def test_expanding_statistics(self):
+        result = rolling_statistics(self.returns, None, periods_per_year=252)
+
+        stream = result.filter(pl.col("strategy_id") == "b")
+        expected = naive_rolling_statistics(self.streams["b"], 120, 252)
+        values = self.streams["b"]
+        assert stream["volatility"][0] is None
+        np.testing.assert_allclose(
+            stream["volatility"][-1], values.std(ddof=1) * np.sqrt(252)
+        )
+        np.testing.assert_allclose(
+            stream["max_drawdown"][-1], expected["max_drawdown"][-1]
+        )
+        np.testing.assert_allclose(
+            stream["sharpe_ratio"][-1], expected["sharpe_ratio"][-1]
+        )
+
+    def test_missing_returns_are_skipped(self):
+        returns = pl.DataFrame(
+            {
+                "strategy_id": ["a"] * 5,
+                "date": list(range(5)),
+                "return": [0.01, None, -0.02, 0.03, None],
+            }
+        )
+
+        result = rolling_statistics(returns, 3, min_periods=2)
+
+        expected_volatility = [
+            None,
+            None,
+            np.std([0.01, -0.02], ddof=1),
+            np.std([-0.02, 0.03], ddof=1),
+            np.std([-0.02, 0.03], ddof=1),
+        ]
+        np.testing.assert_allclose(
+            result["volatility"].to_numpy().astype(float) / np.sqrt(252),
+            np.array(expected_volatility, dtype=float),
+        )
+
+    def test_rolling_statistics_are_stable_for_large_offsets(self):
+        returns = pl.DataFrame(
+            {
+                "strategy_id": "a",
+                "date": list(range(10_000)),
+                "return": 1e6 + np.tile([0.001, -0.001], 5_000),
+            }
+        )
+
+        result = rolling_statistics(returns, 4, periods_per_year=1)
+
+        np.testing.assert_allclose(
+            result["volatility"][-1], np.std([0.001, -0.001] * 2, ddof=1), rtol=1e-6
+        )
+
+    def test_invalid_window_raises(self):
+        with pytest.raises(ValueError):
+            rolling_statistics(self.returns, 0)
+
+
+class TestExpandingAnnualizedReturns:
+    def test_each_value_is_annualized_with_its_own_period(self):
+        returns = pl.Series([0.001, 0.002, -0.001, 0.003])
+
+        result = annualized_returns(returns, expanding=True)
+
+        assert result is not None
+        expected = np.exp(np.cumsum(returns.to_numpy()) * 365 / np.arange(1, 5)) - 1
+        np.testing.assert_allclose(result.to_numpy(), expected)
+        result_expr = pl.select(
+            annualized_returns(pl.lit(returns), expanding=True)
+        ).to_series()
+        np.testing.assert_allclose(result_expr.to_numpy(), expected)
+
+
+class TestSummaryStats:
+    def test_summary_matches_the_last_expanding_statistics(self):
+        rng = np.random.default_rng(4)
+        returns = pl.DataFrame(
+            {
+                "strategy_id": np.repeat([3, 1, 2], 250),
+                "date": np.tile(np.arange(250), 3),
+                "return": rng.normal(0.0003, 0.01, 750),
+            }
+        ).sample(fraction=1.0, shuffle=True, seed=2)
+
+        summary = summary_stats(returns, risk_free_rate=0.0001)
+
+        expanding = (
+            rolling_statistics(returns, None, risk_free_rate=0.0001)
+            .group_by("strategy_id", maintain_order=True)
+            .last()
+        )
+        assert summary["strategy_id"].to_list() == [1, 2, 3]
+        assert summary["count"].to_list() == [250, 250, 250]
+        for name in (
+            "annualized_return",
+            "volatility",
+            "sharpe_ratio",
+            "sortino_ratio",
+            "max_drawdown",
+        ):
+            np.testing.assert_allclose(
+                summary[name].to_numpy(), expanding[name].to_numpy(), err_msg=name
+            )
+        stream = returns.filter(pl.col("strategy_id") == 1)["return"]
+        skew, kurtosis = stream.skew(), stream.kurtosis()
+        assert skew is not None and kurtosis is not None
+        np.testing.assert_allclose(summary["skew"][0], skew)
+        np.testing.assert_allclose(summary["kurtosis"][0], kurtosis)
+
+    def test_drawdown_duration_and_depth(self):
+        returns = pl.LazyFrame(
+            {
+                "strategy_id": ["a"] * 8 + ["b"] * 3,
+                "date": list(range(8)) + list(range(3)),
+                "return": [
+                    0.1,
+                    -0.1,
+                    -0.1,
+                    0.15,
+                    0.1,
+                    -0.05,
+                    0.01,
+                    0.01,
+                    -0.1,
+                    0.05,
+                    None,
+                ],
+            }
+        )
+
+        summary = summary_stats(returns)
+
+        assert isinstance(summary, pl.LazyFrame)
+        summary = summary.collect()
+        assert summary["max_drawdown_duration"].to_list() == [3, 3]
+        np.testing.assert_allclose(
+            summary["max_drawdown"].to_numpy(), 1 - np.exp([-0.2, -0.1])
+        )
+        assert summary["count"].to_list() == [8, 2]
+
+    def test_constant_returns_have_no_ratios(self):
+        returns = pl.DataFrame(
+            {"strategy_id": "a", "date": [1, 2, 3], "return": [0.01, 0.01, 0.01]}
+        )
+
+        summary = summary_stats(returns)
+
+        assert summary["sharpe_ratio"][0] is None
+        assert summary["sortino_ratio"][0] is None
+        assert summary["max_drawdown"][0] == 0.0
+        assert summary["max_drawdown_duration"][0] == 0
+
+
+class TestLongFormatMarketReturns:
+    def setup_method(self):
+        self.returns = pl.DataFrame(
+            {
+                "date": [date(2024, 1, day) for day in (1, 1, 2, 2, 2, 3, 3)],
+                "fid": [1, 2, 1, 2, 3, 2, 3],
+                "return": [0.01, 0.03, 0.02, None, -0.01, 0.04, 0.02],
+                "market_cap": [100.0, 300.0, 110.0, 290.0, 50.0, 300.0, 60.0],
+            }
+        )
+
+    def test_equal_weighting_matches_wide_estimate(self):
+        market = market_returns(self.returns)
+
+        wide = self.returns.pivot("fid", index="date", values="return")
+        expected = estimate_market_returns(wide, "date")
+        assert isinstance(expected, pl.DataFrame)
+        np.testing.assert_allclose(
+            market["market_return"].to_numpy(), expected["market_return"].to_numpy()
+        )
+        assert market["constituents"].to_list() == [2, 2, 2]
+
+    def test_cap_weighting_uses_previous_market_cap(self):
+        market = market_returns(self.returns.lazy(), weighting="cap").collect()
+
+        assert market["market_return"][0] is None
+        np.testing.assert_allclose(
+            market["market_return"].to_list()[1:],
+            [0.02, (0.04 * 290.0 + 0.02 * 50.0) / 340.0],
+        )
+        assert market["constituents"].to_list() == [0, 1, 2]
+
+    def test_custom_weighting(self):
+        market = market_returns(self.returns, weighting="custom")
+
+        np.testing.assert_allclose(
+            market["market_return"][0], (0.01 * 100 + 0.03 * 300) / 400
+        )
+
+    def test_point_in_time_constituents(self):
+        constituents = pl.DataFrame(
+            {
+                "fid": [1, 2, 3, 3],
+                "start": [
+                    date(2024, 1, 1),
+                    date(2024, 1, 1),
+                    date(2023, 1, 1),
+                    date(2024, 1, 3),
+                ],
+                "end": [date(2024, 1, 1), None, date(2023, 12, 31), None],
+            }
+        )
+
+        market = market_returns(self.returns, constituents=constituents)
+
+        assert market["market_return"][1] is None
+        np.testing.assert_allclose(
+            market["market_return"].drop_nulls().to_numpy(), [0.02, 0.03]
+        )
+        assert market["constituents"].to_list() == [2, 0, 2]
+
+    def test_constituents_match_compact_instrument_ids(self):
+        constituents = pl.DataFrame(
+            {"fid": [1, 2], "start": [date(2024, 1, 1)] * 2, "end": [None, None]}
+        )
+
+        market = market_returns(
+            self.returns.cast({"fid": pl.UInt32}), constituents=constituents
+        )
+
+        assert market["constituents"].to_list() == [2, 1, 1]
+
+    def test_invalid_weighting_raises(self):
+        with pytest.raises(ValueError):
+            market_returns(self.returns, weighting="price")  # type: ignore
@@ -0,0 +1,146 @@
+import operator
+from datetime import date, datetime
+
+import polars as pl
+import polars.testing as plt
+import pytest
+
+from pqf.pricing.core import PricingData
+from pqf.pricing.sharding import run_sharded, write_shards
+
+FORWARD_RETURNS = operator.methodcaller("get_forward_returns", [1, 2])
+
+
+def make_bars() -> pl.DataFrame:
+    """Three one-minute bars on each of two trade dates for eight instruments."""
+    fids = range(1, 9)
+    return pl.DataFrame(
+        {
+            "trade_date": [
+                date(2025, 1, day) for fid in fids for day in (2, 3) for _ in range(3)
+            ],
+            "end_dtutc": [
+                datetime(2025, 1, day, 0, minute)
+                for fid in fids
+                for day in (2, 3)
+                for minute in range(3)
+            ],
+            "fid": [fid for fid in fids for _ in range(6)],
+            "symbol": [f"S{fid}" for fid in fids for _ in range(6)],
+            "open": [float(fid + step) for fid in fids for step in range(6)],
+            "high": [float(fid + step) for fid in fids for step in range(6)],
+            "low": [float(fid + step) for fid in fids for step in range(6)],
+            "close": [float(fid + step) for fid in fids for step in range(6)],
+            "volume": [1.0] * 48,
+        }
+    ).with_columns(pl.col("end_dtutc").dt.cast_time_unit("ns"))
+
+
+class TestWriteShards:
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_instruments_are_not_split_across_shards(self, tmp_path, lazy):
+        bars = make_bars()
+        pricing_data = PricingData(bars.lazy() if lazy else bars, lazy=lazy)
+
+        shard_dirs = write_shards(pricing_data, tmp_path, 3, trade_dates_per_chunk=1)
+
+        assert [shard_dir.name for shard_dir in shard_dirs] == sorted(
+            shard_dir.name for shard_dir in shard_dirs
+        )
+        shards = [pl.read_parquet(shard_dir) for shard_dir in shard_dirs]
+        fids = [set(shard["fid"]) for shard in shards]
+        assert set.union(*fids) == set(range(1, 9))
+        assert sum(len(shard_fids) for shard_fids in fids) == 8
+        assert sum(shard.height for shard in shards) == bars.height
+
+    def test_invalid_shards_raise(self, tmp_path):
+        with pytest.raises(ValueError, match="shards"):
+            write_shards(PricingData(make_bars(), lazy=False), tmp_path, 0)
+
+    def test_non_empty_path_raises(self, tmp_path):
+        pricing_data = PricingData(make_bars(), lazy=False)
+        write_shards(pricing_data, tmp_path, 3)
+
+        with pytest.raises(ValueError, match="empty"):
+            write_shards(pricing_data, tmp_path, 2)
+
+
+class TestRunSharded:
+    def test_matches_unsharded_pipeline(self):
+        pricing_data = PricingData(make_bars(), lazy=False)
+
+        result = run_sharded(
+            pricing_data, FORWARD_RETURNS, shards=3, sort_by=["fid", "end_dtutc"]
+        )
+
+        plt.assert_frame_equal(result, pricing_data.get_forward_returns([1, 2]))
+
+    def test_output_does_not_depend_on_processes(self):
+        pricing_data = PricingData(make_bars().lazy())
+
+        single = run_sharded(pricing_data, FORWARD_RETURNS, shards=4)
+        pooled = run_sharded(pricing_data, FORWARD_RETURNS, shards=4, processes=2)
+
+        plt.assert_frame_equal(pooled, single)
+
+    def test_sinks_results_to_output(self, tmp_path):
+        pricing_data = PricingData(make_bars(), lazy=False)
+
+        result = run_sharded(
+            pricing_data,
+            FORWARD_RETURNS,
+            shards=3,
+            output=tmp_path / "returns",
+            sort_by=["fid", "end_dtutc"],
+        )
+
+        assert isinstance(result, pl.LazyFrame)
+        assert sorted(path.name for path in (tmp_path / "returns").iterdir()) == [
+            f"part-{index:05d}.parquet" for index in range(3)
+        ]
+        plt.assert_frame_equal(
+            result.collect(), pricing_data.get_forward_returns([1, 2])
+        )
+
+    def test_shards_keep_the_compact_schema(self, tmp_path):
+        pricing_data = PricingData(
+            make_bars(), lazy=False, compact=True, volume_dtype=pl.Float32
+        )
+
+        result = run_sharded(
+            pricing_data,
+            operator.methodcaller("get_bars"),
+            shards=2,
+            shard_path=tmp_path,
+        )
+
+        assert result.schema == pricing_data.output_schema
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "shard-00000",
+            "shard-00001",
+        ]
+
+    @pytest.mark.parametrize("output", [False, True])
+    def test_no_bars_give_an_empty_result(self, tmp_path, output):
+        pricing_data = PricingData(make_bars().clear(), lazy=False)
+
+        result = run_sharded(
+            pricing_data, FORWARD_RETURNS, shards=3, output=tmp_path if output else None
+        )
+
+        if isinstance(result, pl.LazyFrame):
+            result = result.collect()
+        plt.assert_frame_equal(result, pricing_data.get_forward_returns([1, 2]))
+
+    def test_non_empty_output_raises(self, tmp_path):
+        pricing_data = PricingData(make_bars(), lazy=False)
+        run_sharded(pricing_data, FORWARD_RETURNS, shards=3, output=tmp_path)
+
+        with pytest.raises(ValueError, match="output"):
+            run_sharded(pricing_data, FORWARD_RETURNS, shards=2, output=tmp_path)
+
+    def test_invalid_processes_raise(self):
+        with pytest.raises(ValueError, match="processes"):
+            run_sharded(
+                PricingData(make_bars(), lazy=False), FORWARD_RETURNS, processes=0
+            )
@@ -4,17 +4,22 @@ if TYPE_CHECKING:
     import polars as pl
 
 @overload
-def rsi(data: pl.Expr, period: int) -> pl.Expr: ...
+def rsi(data: pl.Expr, period: int, backend: str = "polars") -> pl.Expr: ...
 @overload
-def rsi(data: pl.Series, period: int) -> pl.Series: ...
+def rsi(data: pl.Series, period: int, backend: str = "polars") -> pl.Series: ...
 @overload
 def macd(
     data: pl.Series,
     slow_period: int = 26,
     fast_period: int = 12,
     signal_period: int = 9,
+    backend: str = "polars",
 ) -> pl.Series: ...
 @overload
 def macd(
-    data: pl.Expr, slow_period: int = 26, fast_period: int = 12, signal_period: int = 9
+    data: pl.Expr,
+    slow_period: int = 26,
+    fast_period: int = 12,
+    signal_period: int = 9,
+    backend: str = "polars",
 ) -> pl.Expr: ...
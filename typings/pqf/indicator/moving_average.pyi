@@ -4,10 +4,18 @@ if TYPE_CHECKING:
     import polars as pl
 
 @overload
-def simple_moving_average(prices: pl.Series, window_size: int) -> pl.Series: ...
+def simple_moving_average(
+    prices: pl.Series, window_size: int, backend: str = "polars"
+) -> pl.Series: ...
 @overload
-def simple_moving_average(prices: pl.Expr, window_size: int) -> pl.Expr: ...
+def simple_moving_average(
+    prices: pl.Expr, window_size: int, backend: str = "polars"
+) -> pl.Expr: ...
 @overload
-def exponential_moving_average(prices: pl.Series, window_size: int) -> pl.Series: ...
+def exponential_moving_average(
+    prices: pl.Series, window_size: int, backend: str = "polars"
+) -> pl.Series: ...
 @overload
-def exponential_moving_average(prices: pl.Expr, window_size: int) -> pl.Expr: ...
+def exponential_moving_average(
+    prices: pl.Expr, window_size: int, backend: str = "polars"
+) -> pl.Expr: ...
@@ -0,0 +1,33 @@
+from typing import TYPE_CHECKING, Literal, overload
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from pqf.pricing.core import PricingData
+
+FILL_PRICES: tuple[str, ...]
+
+@overload
+def simulate_fills(
+    orders: pl.LazyFrame,
+    pricing_data: PricingData,
+    fill_price: Literal["next_open", "vwap"] = "next_open",
+    participation_rate: float | None = None,
+    spread_bps: float = 0.0,
+    impact_coefficient: float = 0.0,
+    impact_window: int = 20,
+    timestamp_column: str = "timestamp",
+    quantity_column: str = "quantity",
+) -> pl.LazyFrame: ...
+@overload
+def simulate_fills(
+    orders: pl.DataFrame,
+    pricing_data: PricingData,
+    fill_price: Literal["next_open", "vwap"] = "next_open",
+    participation_rate: float | None = None,
+    spread_bps: float = 0.0,
+    impact_coefficient: float = 0.0,
+    impact_window: int = 20,
+    timestamp_column: str = "timestamp",
+    quantity_column: str = "quantity",
+) -> pl.LazyFrame | pl.DataFrame: ...
@@ -7,3 +7,25 @@ if TYPE_CHECKING:
 def simple_slippage(prices: pl.Series, slippage_rate: float) -> pl.Series: ...
 @overload
 def simple_slippage(prices: pl.Expr, slippage_rate: float) -> pl.Expr: ...
+@overload
+def spread_slippage(
+    prices: pl.Series, side: pl.Series, spread_bps: float
+) -> pl.Series: ...
+@overload
+def spread_slippage(prices: pl.Expr, side: pl.Expr, spread_bps: float) -> pl.Expr: ...
+@overload
+def square_root_impact(
+    prices: pl.Series,
+    quantity: pl.Series,
+    volume: pl.Series,
+    volatility: pl.Series,
+    impact_coefficient: float = 1.0,
+) -> pl.Series: ...
+@overload
+def square_root_impact(
+    prices: pl.Expr,
+    quantity: pl.Expr,
+    volume: pl.Expr,
+    volatility: pl.Expr,
+    impact_coefficient: float = 1.0,
+) -> pl.Expr: ...
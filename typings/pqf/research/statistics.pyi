@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, overload
+from typing import TYPE_CHECKING, Literal, overload
 
 if TYPE_CHECKING:
     import polars as pl
@@ -11,6 +11,56 @@ def estimate_market_returns(
     market_constituent_returns: pl.LazyFrame | pl.DataFrame, date_column: str
 ) -> pl.LazyFrame | pl.DataFrame: ...
 @overload
-def annualized_returns(returns: pl.Series) -> pl.Series | None: ...
+def market_returns(
+    returns: pl.LazyFrame,
+    weighting: Literal["equal", "cap", "custom"] = "equal",
+    constituents: pl.LazyFrame | pl.DataFrame | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    return_column: str = "return",
+    weight_column: str = "market_cap",
+) -> pl.LazyFrame: ...
 @overload
-def annualized_returns(returns: pl.Expr) -> pl.Expr: ...
+def market_returns(
+    returns: pl.DataFrame,
+    weighting: Literal["equal", "cap", "custom"] = "equal",
+    constituents: pl.LazyFrame | pl.DataFrame | None = None,
+    date_column: str = "date",
+    fid_column: str = "fid",
+    return_column: str = "return",
+    weight_column: str = "market_cap",
+) -> pl.DataFrame: ...
+@overload
+def annualized_returns(
+    returns: pl.Series, expanding: bool = False
+) -> pl.Series | None: ...
+@overload
+def annualized_returns(returns: pl.Expr, expanding: bool = False) -> pl.Expr: ...
+def rolling_statistics(
+    returns: pl.LazyFrame | pl.DataFrame,
+    window_size: int | None,
+    by: str = "strategy_id",
+    date_column: str = "date",
+    return_column: str = "return",
+    min_periods: int | None = None,
+    periods_per_year: float = 252,
+    risk_free_rate: float = 0.0,
+) -> pl.DataFrame: ...
+@overload
+def summary_stats(
+    returns: pl.LazyFrame,
+    by: str = "strategy_id",
+    date_column: str = "date",
+    return_column: str = "return",
+    periods_per_year: float = 252,
+    risk_free_rate: float = 0.0,
+) -> pl.LazyFrame: ...
+@overload
+def summary_stats(
+    returns: pl.DataFrame,
+    by: str = "strategy_id",
+    date_column: str = "date",
+    return_column: str = "return",
+    periods_per_year: float = 252,
+    risk_free_rate: float = 0.0,
+) -> pl.DataFrame: ...